@@ -1,11 +1,14 @@
 """
 Bot Telegram untuk Short Link dan QR Code Generator
 """
+import asyncio
 import logging
 import time
 from datetime import datetime
+from typing import Callable, Dict, Optional
 from telegram.ext import (
     Application,
+    BaseUpdateProcessor,
     CommandHandler,
     MessageHandler,
     CallbackQueryHandler,
@@ -43,11 +46,59 @@ logging.getLogger('httpx').setLevel(logging.WARNING)
 logging.getLogger('telegram').setLevel(logging.WARNING)
 logging.getLogger('telegram.ext').setLevel(logging.WARNING)
 
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Proses update bersamaan, tetapi update dari user yang sama satu per satu
+
+    Handler pesan adalah state machine per user (context.user_data['state'],
+    pending_url), jadi update kedua dari user yang sama harus menunggu
+    update pertamanya selesai. Update tanpa user diproses langsung.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._waiting: Dict[int, int] = {}
+
+    async def do_process_update(self, update, coroutine):
+        user = getattr(update, 'effective_user', None)
+        if user is None:
+            await coroutine
+            return
+
+        user_id = user.id
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        self._waiting[user_id] = self._waiting.get(user_id, 0) + 1
+        try:
+            async with lock:
+                await coroutine
+        finally:
+            # Lock dibuang setelah update terakhir user ini selesai
+            self._waiting[user_id] -= 1
+            if not self._waiting[user_id]:
+                del self._waiting[user_id]
+                del self._locks[user_id]
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+
 class TelegramBot:
     """Kelas utama untuk Bot Telegram"""
     
-    def __init__(self):
-        """Initialize bot"""
+    def __init__(self, on_ready: Optional[Callable[[], None]] = None):
+        """
+        Initialize bot
+
+        Args:
+            on_ready: Dipanggil sekali setelah Application.initialize()
+                berhasil (token valid, get_me OK), sebelum polling dimulai
+        """
+        self._on_ready = on_ready
+        
         # Validate config
         Config.validate()
         
@@ -76,16 +127,25 @@ class TelegramBot:
             )
         
         # Create application with request config
-        self.application = Application.builder()\
+        builder = Application.builder()\
             .token(Config.BOT_TOKEN)\
             .request(request)\
-            .build()
+            .post_init(self._post_init)
+        if Config.BOT_CONCURRENT_UPDATES > 1:
+            builder = builder.concurrent_updates(PerUserUpdateProcessor(Config.BOT_CONCURRENT_UPDATES))
+        self.application = builder.build()
         
         # Setup handlers
         self._setup_handlers()
         
         print(f"✅ {Config.BOT_NAME} v{Config.BOT_VERSION} initialized!")
     
+    async def _post_init(self, application: Application):
+        """Kirim sinyal ready (sekali saja, run_polling bisa diulang saat reconnect)"""
+        on_ready, self._on_ready = self._on_ready, None
+        if on_ready is not None:
+            on_ready()
+    
     def _setup_handlers(self):
         """Setup semua handlers untuk bot"""
         
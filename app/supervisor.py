@@ -0,0 +1,280 @@
+"""
+Supervisor multi-process: N web worker + 1 proses bot
+
+Parent membuka socket listen sekali lalu fork worker yang memakai socket
+yang sama (kernel membagi koneksi antar worker). Setiap worker membuat
+koneksi database dan cache sendiri. Bot berjalan di prosesnya sendiri,
+jadi redirect tidak berbagi GIL dengan handler Telegram.
+"""
+import multiprocessing
+import multiprocessing.connection
+import signal
+import socket
+import time
+from typing import Dict, List, Optional
+
+from config.config import Config
+
+# Fork (bukan spawn): worker mewarisi socket listen dan module yang sudah di-import
+_ctx = multiprocessing.get_context('fork')
+
+# Worker yang mati lebih cepat dari ini dianggap crash loop (restart dengan backoff)
+MIN_UPTIME = 5.0
+MAX_BACKOFF = 30.0
+
+
+def create_listen_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """Buat socket TCP yang dibagi semua web worker"""
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _raise_exit(signum, frame):
+    """SIGTERM -> SystemExit supaya blok finally (flush klik) tetap jalan"""
+    raise SystemExit(0)
+
+
+def _web_worker(ready, sock: socket.socket, worker_id: int):
+    """Entry point proses web worker"""
+    # Ctrl+C ditangani supervisor, worker dihentikan dengan SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, _raise_exit)
+
+    # Import di sini: DatabaseManager, pool dan cache dibuat di proses worker
+    from web.server import app, db
+
+    warm_host = f"{Config.DEFAULT_SUBDOMAIN}.{Config.DEFAULT_DOMAIN}" if Config.DEFAULT_DOMAIN else None
+    warmed = db.warm_link_cache(warm_host, Config.WEB_CACHE_WARM)
+    print(f"✅ Web worker {worker_id} ready (cache warmed: {warmed})")
+
+    try:
+        if Config.WEB_SERVER_MODE == 'asgi':
+            from web.asgi import run_asgi_server
+            run_asgi_server(
+                host=Config.WEB_HOST, port=Config.WEB_PORT, sock=sock,
+                on_ready=lambda: ready.send('ready')
+            )
+        else:
+            from werkzeug.serving import make_server
+            server = make_server(
+                Config.WEB_HOST, Config.WEB_PORT, app,
+                threaded=True, fd=sock.fileno()
+            )
+            ready.send('ready')
+            server.serve_forever()
+    finally:
+        db.flush_clicks()
+        db.release_code_block()
+        # Proses multiprocessing keluar lewat os._exit (atexit tidak jalan)
+        from web.request_log import request_log
+        request_log.stop()
+
+
+def _bot_worker(ready):
+    """Entry point proses bot (SIGINT/SIGTERM ditangani run_polling)"""
+    from app.bot import TelegramBot
+
+    # Ready dikirim dari post_init: initialize()/get_me yang gagal tidak
+    # dilaporkan sebagai ready
+    bot = TelegramBot(on_ready=lambda: ready.send('ready'))
+    try:
+        bot.run()
+    finally:
+        # Proses multiprocessing keluar lewat os._exit (atexit tidak jalan)
+        from src.handlers.commands import db
+        db.sync.release_code_block()
+
+
+class ManagedProcess:
+    """Satu proses anak yang di-restart jika mati"""
+
+    def __init__(self, name: str, target, args: tuple = ()):
+        """
+        Args:
+            name: Nama proses (untuk log)
+            target: Fungsi entry point, argumen pertama adalah pipe readiness
+            args: Argumen tambahan untuk target
+        """
+        self.name = name
+        self.target = target
+        self.args = args
+        self.process: Optional[multiprocessing.Process] = None
+        self.ready_conn = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.backoff = 1.0
+        self.restart_at: Optional[float] = None
+
+    def start(self):
+        """Start (atau restart) proses"""
+        parent_conn, child_conn = _ctx.Pipe(duplex=False)
+        self.process = _ctx.Process(
+            target=self.target,
+            args=(child_conn,) + self.args,
+            name=self.name
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready_conn = parent_conn
+        self.started_at = time.monotonic()
+        self.restart_at = None
+
+    def is_ready(self) -> bool:
+        """True jika proses sudah mengirim sinyal ready"""
+        try:
+            return self.ready_conn.poll() and self.ready_conn.recv() == 'ready'
+        except (EOFError, OSError):
+            return False
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+
+class Supervisor:
+    """Menjalankan dan mengawasi web worker + proses bot"""
+
+    def __init__(self, workers: int, run_bot: bool = True, ready_timeout: float = 60.0):
+        """
+        Initialize supervisor
+
+        Args:
+            workers: Jumlah proses web worker
+            run_bot: Jalankan bot Telegram di proses sendiri
+            ready_timeout: Waktu tunggu maksimal semua proses siap (detik)
+        """
+        self.num_workers = max(1, workers)
+        self.run_bot = run_bot
+        self.ready_timeout = ready_timeout
+        self.sock: Optional[socket.socket] = None
+        self.workers: List[ManagedProcess] = []
+        self.bot: Optional[ManagedProcess] = None
+        self._stopping = False
+
+    @property
+    def processes(self) -> List[ManagedProcess]:
+        return self.workers + ([self.bot] if self.bot else [])
+
+    def _prepare_database(self):
+        """Jalankan migrasi sekali di parent, lalu tutup koneksi sebelum fork"""
+        from database.db_manager import DatabaseManager
+
+        db = DatabaseManager()
+        db.pool.close_all()
+
+    def _wait_ready(self, processes: List[ManagedProcess]) -> bool:
+        """Readiness handshake: tunggu semua proses mengirim 'ready'"""
+        pending = {p.ready_conn: p for p in processes}
+        all_ready = True
+        deadline = time.monotonic() + self.ready_timeout
+        while pending and not self._stopping:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                names = ', '.join(p.name for p in pending.values())
+                print(f"⚠️  Not ready after {self.ready_timeout}s: {names}")
+                return False
+            for conn in multiprocessing.connection.wait(list(pending), timeout=min(remaining, 1.0)):
+                proc = pending.pop(conn)
+                if not proc.is_ready():
+                    proc.process.join(1.0)
+                    print(f"❌ {proc.name} exited before ready (exit code {proc.process.exitcode})")
+                    all_ready = False
+        return all_ready and not pending
+
+    def start(self):
+        """Buka socket, start semua worker lalu bot"""
+        self._prepare_database()
+
+        self.sock = create_listen_socket(Config.WEB_HOST, Config.WEB_PORT, Config.WEB_BACKLOG)
+        print(f"📡 Listening on {Config.WEB_HOST}:{Config.WEB_PORT} with {self.num_workers} workers ({Config.WEB_SERVER_MODE})")
+
+        for i in range(self.num_workers):
+            worker = ManagedProcess(f'web-{i + 1}', _web_worker, (self.sock, i + 1))
+            worker.start()
+            self.workers.append(worker)
+
+        if self._wait_ready(self.workers):
+            print(f"✅ {self.num_workers} web workers ready")
+
+        if self.run_bot:
+            self.bot = ManagedProcess('bot', _bot_worker)
+            self.bot.start()
+            if self._wait_ready([self.bot]):
+                print("✅ Bot process ready")
+
+    def _check(self):
+        """Restart proses yang mati (dengan backoff jika crash berulang)"""
+        now = time.monotonic()
+        for proc in self.processes:
+            if proc.alive or self._stopping:
+                continue
+
+            if proc.restart_at is None:
+                uptime = now - proc.started_at
+                if uptime < MIN_UPTIME:
+                    proc.backoff = min(proc.backoff * 2, MAX_BACKOFF)
+                else:
+                    proc.backoff = 1.0
+                proc.restart_at = now + proc.backoff
+                print(
+                    f"⚠️  {proc.name} exited (exit code {proc.process.exitcode}, "
+                    f"uptime {uptime:.0f}s), restarting in {proc.backoff:.0f}s"
+                )
+            elif now >= proc.restart_at:
+                proc.restarts += 1
+                proc.start()
+
+    def run(self):
+        """Start lalu awasi proses sampai dihentikan (Ctrl+C / SIGTERM)"""
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+        try:
+            self.start()
+            while not self._stopping:
+                sentinels = [p.process.sentinel for p in self.processes if p.alive]
+                multiprocessing.connection.wait(sentinels, timeout=1.0)
+                self._check()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def stop(self):
+        """Minta supervisor berhenti"""
+        self._stopping = True
+
+    def shutdown(self, timeout: float = 10.0):
+        """Hentikan semua proses anak (SIGTERM, lalu SIGKILL jika perlu)"""
+        self._stopping = True
+        for proc in self.processes:
+            if proc.alive:
+                proc.process.terminate()
+
+        deadline = time.monotonic() + timeout
+        for proc in self.processes:
+            if proc.process is None:
+                continue
+            proc.process.join(max(0.0, deadline - time.monotonic()))
+            if proc.process.is_alive():
+                print(f"⚠️  {proc.name} did not stop, killing")
+                proc.process.kill()
+                proc.process.join()
+
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def stats(self) -> Dict:
+        """Status semua proses"""
+        return {
+            proc.name: {
+                'pid': proc.process.pid if proc.process else None,
+                'alive': proc.alive,
+                'restarts': proc.restarts
+            }
+            for proc in self.processes
+        }
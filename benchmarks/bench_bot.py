@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+"""
+Benchmark throughput update bot saat ada write lain ke database
+
+Handler bot disimulasikan tanpa Telegram: setiap "update" memanggil
+method database seperti handler asli (create_short_link, get_user_links,
+get_stats) lalu menunggu I/O jaringan balasan (--reply-ms). Update
+diproses bersamaan sebanyak --concurrency (seperti BOT_CONCURRENT_UPDATES).
+
+Selama pengukuran, proses --writers lain memegang write lock SQLite secara
+berkala (--hold-ms), seperti flush klik dari web worker atau import batch.
+Dua mode dibandingkan:
+
+    sync   handler memanggil DatabaseManager langsung (event loop ikut menunggu)
+    async  handler memakai AsyncDatabaseManager (query di thread pool)
+
+Hasil: update/s, latency per update, dan lag event loop maksimal (berapa
+lama loop tidak bisa menjalankan apa pun).
+
+Usage:
+    python benchmarks/bench_bot.py
+    python benchmarks/bench_bot.py --writers 2 --hold-ms 100 --concurrency 32 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks import dataset
+
+MODES = ('sync', 'async')
+# Campuran update: (bobot, method)
+UPDATE_MIX = ((0.3, 'create_short_link'), (0.4, 'get_user_links'), (0.3, 'get_stats'))
+
+
+def _writer(db_path: str, hold: float, gap: float, stop):
+    """Proses lain yang berkala memegang write lock (BEGIN IMMEDIATE ... COMMIT)"""
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.execute('PRAGMA journal_mode = WAL')
+    rnd = random.Random(os.getpid())
+    while not stop.is_set():
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute(
+            'UPDATE short_links SET clicks = clicks + 1 WHERE id = ?',
+            (rnd.randrange(1, 1000),)
+        )
+        time.sleep(hold)
+        conn.execute('COMMIT')
+        time.sleep(gap)
+    conn.close()
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _handle(db, mode: str, method: str, user_id: str, index: int, reply: float):
+    """Satu update: query database lalu 'kirim balasan'"""
+    if method == 'create_short_link':
+        args = (f'https://example.com/bot/{user_id}/{index}',)
+        kwargs = {'user_id': user_id}
+    elif method == 'get_user_links':
+        args, kwargs = (user_id,), {'limit': 10}
+    else:
+        args, kwargs = (), {'user_id': user_id}
+
+    if mode == 'async':
+        await getattr(db, method)(*args, **kwargs)
+    else:
+        getattr(db, method)(*args, **kwargs)
+    await asyncio.sleep(reply)
+
+
+async def _monitor_lag(stop: asyncio.Event, lags: List[float], interval: float = 0.005):
+    """Ukur seberapa telat loop bangun dari sleep (= loop sedang ter-block)"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def run_mode(db, mode: str, concurrency: int, duration: float, reply: float,
+                   users: int, seed: int) -> Dict:
+    """Proses update sebanyak mungkin selama duration detik"""
+    rnd = random.Random(seed)
+    weights = [w for w, _ in UPDATE_MIX]
+    methods = [m for _, m in UPDATE_MIX]
+    latencies: Dict[str, List[float]] = {m: [] for m in methods}
+    lags: List[float] = []
+    counter = iter(range(10 ** 9))
+    deadline = time.perf_counter() + duration
+    stop = asyncio.Event()
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            index = next(counter)
+            method = rnd.choices(methods, weights=weights)[0]
+            user_id = str(rnd.randrange(users))
+            started = time.perf_counter()
+            try:
+                await _handle(db, mode, method, user_id, index, reply)
+            except Exception:
+                errors += 1
+            latencies[method].append(time.perf_counter() - started)
+
+    monitor = asyncio.create_task(_monitor_lag(stop, lags))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+
+    every = [value for values in latencies.values() for value in values]
+    return {
+        'updates': len(every),
+        'updates_per_s': round(len(every) / elapsed, 1),
+        'errors': errors,
+        'p50_ms': round(_percentile(every, 50) * 1000, 2),
+        'p95_ms': round(_percentile(every, 95) * 1000, 2),
+        'p99_ms': round(_percentile(every, 99) * 1000, 2),
+        'max_loop_lag_ms': round(max(lags, default=0) * 1000, 2),
+        'p99_loop_lag_ms': round(_percentile(lags, 99) * 1000, 2),
+        'by_method': {
+            method: {
+                'count': len(values),
+                'p50_ms': round(_percentile(values, 50) * 1000, 2),
+                'p95_ms': round(_percentile(values, 95) * 1000, 2),
+            }
+            for method, values in latencies.items()
+        }
+    }
+
+
+def run(db_path: str, modes: List[str], writers: int, hold: float, gap: float,
+        concurrency: int, duration: float, reply: float, users: int, seed: int) -> Dict:
+    from database.async_db import AsyncDatabaseManager
+    from database.db_manager import DatabaseManager
+
+    sync_db = DatabaseManager(db_path)
+    async_db = AsyncDatabaseManager(sync_db)
+    results = {}
+
+    for mode in modes:
+        stop = multiprocessing.Event()
+        procs = [
+            multiprocessing.Process(target=_writer, args=(db_path, hold, gap, stop), daemon=True)
+            for _ in range(writers)
+        ]
+        for proc in procs:
+            proc.start()
+        try:
+            time.sleep(0.2)
+            print(f"🚀 {mode}: {concurrency} concurrent updates, {writers} writers, {duration}s")
+            db = async_db if mode == 'async' else sync_db
+            results[mode] = asyncio.run(
+                run_mode(db, mode, concurrency, duration, reply, users, seed)
+            )
+        finally:
+            stop.set()
+            for proc in procs:
+                proc.join(10)
+
+    sync_db.release_code_block()
+    sync_db.pool.close_all()
+    return results
+
+
+def print_report(results: Dict):
+    print("")
+    print(f"{'mode':<6} {'upd/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max lag ms':>11} {'errors':>7}")
+    for mode, r in results.items():
+        print(
+            f"{mode:<6} {r['updates_per_s']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} "
+            f"{r['p99_ms']:>8} {r['max_loop_lag_ms']:>11} {r['errors']:>7}"
+        )
+    print("")
+    print(f"{'mode':<6} {'method':<18} {'count':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for mode, r in results.items():
+        for method, stats in r['by_method'].items():
+            print(f"{mode:<6} {method:<18} {stats['count']:>7} {stats['p50_ms']:>8} {stats['p95_ms']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark throughput update bot saat ada write lain')
+    parser.add_argument('--modes', default=','.join(MODES), help='Mode yang di-test (koma): sync, async')
+    parser.add_argument('--links', type=int, default=20000, help='Jumlah link di database')
+    parser.add_argument('--users', type=int, default=1000, help='Jumlah user')
+    parser.add_argument('--writers', type=int, default=1, help='Proses lain yang memegang write lock')
+    parser.add_argument('--hold-ms', type=float, default=50, help='Lama write lock dipegang per transaksi (ms)')
+    parser.add_argument('--gap-ms', type=float, default=50, help='Jeda antar transaksi writer (ms)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Update yang diproses bersamaan')
+    parser.add_argument('--reply-ms', type=float, default=20, help='Simulasi waktu kirim balasan ke Telegram (ms)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Durasi per mode (detik)')
+    parser.add_argument('--seed', type=int, default=1, help='Seed random')
+    parser.add_argument('--json', help='Simpan hasil ke file JSON')
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(',')]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench_bot.db')
+        print(f"📦 Building database: {args.links} links, {args.users} users...")
+        dataset.generate(db_path, args.links, users=args.users, domains=0, verbose=False)
+        results = run(
+            db_path, modes, args.writers, args.hold_ms / 1000, args.gap_ms / 1000,
+            args.concurrency, args.duration, args.reply_ms / 1000, args.users, args.seed
+        )
+
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+        print(f"\n💾 Saved to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
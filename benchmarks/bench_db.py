@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark method DatabaseManager pada beberapa ukuran data
+
+Database dibesarkan bertahap dengan benchmarks/dataset.py (mis. 10k ->
+100k -> 1M link). Di setiap ukuran setiap method dijalankan berulang
+dengan argumen acak (kode, user, domain yang ada) dan cache redirect
+dikosongkan, jadi yang diukur adalah query-nya. Hasil: latency median
+per ukuran, exponent pertumbuhan (0 = konstan, 1 = O(n)) dan query plan
+dari SQL yang benar-benar dijalankan setiap method.
+
+Usage:
+    python benchmarks/bench_db.py
+    python benchmarks/bench_db.py --sizes 10000,100000,1000000 --json db.json
+    python benchmarks/bench_db.py --db /tmp/big.db --sizes 1000000 --methods get_user_links,get_stats
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks import dataset
+
+# Exponent pertumbuhan di atas ini ditandai (mendekati O(n))
+GROWTH_WARNING = 0.5
+
+# Table yang ukurannya ikut bertambah (stats_counters selalu 4 baris)
+GROWING_TABLES = ('short_links', 'link_keys', 'click_logs', 'custom_domains', 'user_link_counts')
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+class Case(NamedTuple):
+    """Satu method yang di-benchmark"""
+    name: str
+    call: Callable  # call(db, rnd, sample) -> hasil method
+    writes: bool = False
+
+
+class Sample:
+    """Nilai acak yang valid untuk database saat ini"""
+
+    def __init__(self, rnd: random.Random, size: int, users: int, domains: int):
+        self.rnd = rnd
+        self.size = size
+        self.users = users
+        self.domains = domains
+        self.created: List[tuple] = []  # (short_code, user_id) dari create_short_link
+
+    def link_id(self) -> int:
+        return self.rnd.randint(1, self.size)
+
+    def code(self) -> str:
+        link_id = self.link_id()
+        return dataset.alias_for_id(link_id, dataset.ALIAS_RATIO) or dataset.code_for_id(link_id)
+
+    def user(self) -> str:
+        # Ambil user populer (banyak link) maupun user biasa
+        return str(min(self.rnd.randrange(self.users), int(self.rnd.paretovariate(1.0))))
+
+    def domain(self) -> str:
+        return dataset.domain_name(self.rnd.randrange(self.domains)) if self.domains else 'default'
+
+
+def _click_batch(db, sample: Sample, size: int = 100):
+    from database.click_queue import ClickEvent
+
+    events = [
+        ClickEvent(sample.link_id(), sample.code(), '2024-01-01 00:00:00', '10.0.0.1', 'bench', None)
+        for _ in range(size)
+    ]
+    return db.write_click_batch(events)
+
+
+def _create(db, sample: Sample):
+    user = sample.user()
+    result = db.create_short_link('https://example.com/bench', user_id=user)
+    if result.get('success'):
+        sample.created.append((result['short_code'], user))
+    return result
+
+
+def _delete(db, sample: Sample):
+    if not sample.created:
+        _create(db, sample)
+    code, user = sample.created.pop()
+    return db.delete_link(code, user)
+
+
+CASES = [
+    Case('get_link_by_code', lambda db, s: db.get_link_by_code(s.code())),
+    Case('resolve_link', lambda db, s: db.resolve_link(s.code(), s.domain())),
+    Case('find_link_for_host', lambda db, s: db.find_link_for_host(s.code(), s.domain())),
+    Case('generate_short_code', lambda db, s: db.generate_short_code()),
+    Case('get_user_links', lambda db, s: db.get_user_links(s.user())),
+    Case('get_stats', lambda db, s: db.get_stats()),
+    Case('get_stats_user', lambda db, s: db.get_stats(s.user())),
+    Case('get_counters', lambda db, s: db.get_counters()),
+    Case('get_total_links', lambda db, s: db.get_total_links()),
+    Case('get_recent_links', lambda db, s: db.get_recent_links()),
+    Case('get_active_users', lambda db, s: db.get_active_users()),
+    Case('get_all_domains', lambda db, s: db.get_all_domains()),
+    Case('check_subdomain_exists', lambda db, s: db.check_subdomain_exists(f'links{s.rnd.randrange(1000)}')),
+    Case('create_short_link', _create, writes=True),
+    Case('delete_link', _delete, writes=True),
+    Case('increment_click', lambda db, s: db.increment_click(s.code()), writes=True),
+    Case('write_click_batch', _click_batch, writes=True),
+    Case('load_code_filter', lambda db, s: db.load_code_filter()),
+]
+
+
+class SqlTrace:
+    """Kumpulkan SQL yang dijalankan lewat koneksi pool (untuk query plan)"""
+
+    SKIP = ('BEGIN', 'COMMIT', 'ROLLBACK', 'PRAGMA', 'SAVEPOINT', 'RELEASE', '--')
+
+    def __init__(self, db):
+        self.db = db
+        self.statements: List[str] = []
+        self._shapes = set()
+        self._on_connect = None
+
+    def _trace(self, sql: str):
+        statement = ' '.join(sql.split())
+        if statement.upper().startswith(self.SKIP):
+            return
+        # Satu contoh per bentuk query (executemany menghasilkan banyak statement)
+        shape = _LITERAL.sub('?', statement)
+        if shape not in self._shapes:
+            self._shapes.add(shape)
+            self.statements.append(statement)
+
+    def __enter__(self):
+        # Koneksi baru dibuat dengan trace callback
+        pool = self.db.pool
+        pool.close_all()
+        self._on_connect = pool.on_connect
+
+        def on_connect(conn):
+            self._on_connect(conn)
+            conn.set_trace_callback(self._trace)
+
+        pool.on_connect = on_connect
+        return self
+
+    def __exit__(self, *exc):
+        pool = self.db.pool
+        pool.close_all()
+        pool.on_connect = self._on_connect
+
+
+def query_plans(db, statements: List[str]) -> Dict[str, List[str]]:
+    """EXPLAIN QUERY PLAN untuk setiap statement (tanpa menjalankannya)"""
+    plans = {}
+    with db.connection() as conn:
+        for sql in statements:
+            try:
+                rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}').fetchall()
+                plans[sql] = [row[3] for row in rows]
+            except sqlite3.Error as e:
+                plans[sql] = [f'(error: {e})']
+    return plans
+
+
+def is_full_scan(plan_line: str) -> bool:
+    """
+    SCAN seluruh table (atau seluruh covering index) yang ikut membesar
+
+    SCAN ... USING INDEX (urut index + LIMIT) tidak dihitung.
+    """
+    parts = plan_line.split()
+    return (
+        len(parts) >= 2 and parts[0] == 'SCAN' and parts[1] in GROWING_TABLES
+        and 'USING INDEX' not in plan_line and 'USING INTEGER PRIMARY KEY' not in plan_line
+    )
+
+
+def reset_caches(db):
+    db.link_cache.clear()
+    db.negative_cache.clear()
+
+
+def time_case(db, case: Case, sample: Sample, iterations: int, min_time: float) -> Dict:
+    """Jalankan satu method berulang; return statistik latency (ms)"""
+    timings = []
+    error = None
+    deadline = time.perf_counter() + min_time
+    while len(timings) < iterations or (time.perf_counter() < deadline and len(timings) < iterations * 10):
+        reset_caches(db)
+        started = time.perf_counter()
+        try:
+            case.call(db, sample)
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+            break
+        timings.append(time.perf_counter() - started)
+
+    if not timings:
+        return {'error': error}
+    timings.sort()
+    return {
+        'calls': len(timings),
+        'median_ms': round(statistics.median(timings) * 1000, 4),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 4),
+        'error': error
+    }
+
+
+def growth_exponent(points: List[tuple]) -> Optional[float]:
+    """Slope log(latency) terhadap log(ukuran) (least squares)"""
+    points = [(math.log(n), math.log(t)) for n, t in points if t and t > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    if var == 0:
+        return None
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in points) / var, 2)
+
+
+def run(db_path: str, sizes: List[int], cases: List[Case], users: int, domains: int,
+        iterations: int, min_time: float, seed: int) -> Dict:
+    """Benchmark semua case di setiap ukuran"""
+    from database.db_manager import DatabaseManager
+
+    results = {'sizes': sizes, 'methods': {}, 'plans': {}}
+    for size in sizes:
+        print(f"📦 Growing database to {size:,} links...")
+        dataset.generate(db_path, size, users=users, domains=domains, seed=seed, verbose=False)
+
+        db = DatabaseManager(db_path)
+        db.load_code_filter()
+        rnd = random.Random(seed)
+        sample = Sample(rnd, size, users, domains)
+        print(f"⏱️  {size:,} links")
+
+        for case in cases:
+            # Query plan diambil dari call pertama, lalu diukur tanpa trace
+            with SqlTrace(db) as trace:
+                try:
+                    case.call(db, sample)
+                except Exception:
+                    pass
+            plans = query_plans(db, trace.statements)
+            results['plans'][case.name] = plans
+
+            stats = time_case(db, case, sample, iterations, min_time)
+            stats['full_scans'] = sorted({
+                line for plan in plans.values() for line in plan if is_full_scan(line)
+            })
+            results['methods'].setdefault(case.name, {})[str(size)] = stats
+            print(f"   {case.name:<24} {stats.get('median_ms')!s:>10} ms")
+
+        db.flush_clicks()
+        db.pool.close_all()
+
+    for name, per_size in results['methods'].items():
+        points = [(int(size), stats.get('median_ms')) for size, stats in per_size.items()]
+        per_size['growth'] = growth_exponent(points)
+    return results
+
+
+def print_report(results: Dict):
+    sizes = results['sizes']
+    print("")
+    header = f"{'method':<24}" + ''.join(f"{f'{n:,}':>12}" for n in sizes) + f"{'growth':>9}"
+    print(header)
+    print('-' * len(header))
+    for name, per_size in results['methods'].items():
+        cells = []
+        for size in sizes:
+            stats = per_size[str(size)]
+            cells.append(f"{'error' if stats.get('median_ms') is None else stats['median_ms']:>12}")
+        growth = per_size['growth']
+        mark = ' ⚠️' if growth is not None and growth > GROWTH_WARNING else ''
+        print(f"{name:<24}" + ''.join(cells) + f"{growth!s:>9}{mark}")
+    print("(median ms per call; growth = exponent latency vs ukuran, 1.0 = O(n))")
+
+    print("\n🔎 Query plans (ukuran terbesar)")
+    largest = str(sizes[-1])
+    for name, plans in results['plans'].items():
+        stats = results['methods'][name][largest]
+        flag = ' ⚠️  full scan' if stats['full_scans'] else ''
+        print(f"\n{name}{flag}")
+        if stats.get('error'):
+            print(f"   error: {stats['error']}")
+        for sql, plan in plans.items():
+            print(f"   {sql[:110]}")
+            for line in plan:
+                print(f"      {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmark DatabaseManager')
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='Ukuran database (jumlah link, koma)')
+    parser.add_argument('--db', help='Database yang dipakai/dibesarkan (default file sementara)')
+    parser.add_argument('--users', type=int, default=10000, help='Jumlah user di dataset')
+    parser.add_argument('--domains', type=int, default=100, help='Jumlah custom domain di dataset')
+    parser.add_argument('--methods', help='Hanya method ini (koma)')
+    parser.add_argument('--iterations', type=int, default=50, help='Minimal call per method per ukuran')
+    parser.add_argument('--min-time', type=float, default=0.5, help='Minimal waktu per method (detik)')
+    parser.add_argument('--seed', type=int, default=1, help='Seed random')
+    parser.add_argument('--json', help='Simpan hasil ke file JSON')
+    args = parser.parse_args()
+
+    sizes = sorted(int(s) for s in args.sizes.split(','))
+    cases = CASES
+    if args.methods:
+        wanted = {m.strip() for m in args.methods.split(',')}
+        cases = [c for c in CASES if c.name in wanted]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, 'bench_db.db')
+        results = run(db_path, sizes, cases, args.users, args.domains,
+                      args.iterations, args.min_time, args.seed)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+        print(f"\n💾 Saved to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
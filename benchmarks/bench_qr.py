@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""
+Benchmark render QR Code: qrcode + PIL vs rasterizer matrix (qr_raster)
+
+Setiap mode me-render data yang sama berulang kali (tanpa cache) dan
+mencatat waktu median serta ukuran output. Ada dua waktu: "total" (data
+sampai bytes) dan "draw" (dari QRCode yang sudah di-encode sampai bytes).
+Encode data ke matrix (pilih versi + mask) sama untuk semua mode, jadi
+perbedaan renderer terlihat jelas di kolom draw.
+
+    matrix         hanya encode data ke matrix (baseline)
+    pil            qr.make_image() (gambar per module) + PNG
+    raster         block replication + PNG palette 1-bit (numpy jika ada)
+    raster-python  sama seperti raster, tanpa numpy
+    raster-numpy   sama seperti raster, wajib numpy (dilewati jika tidak terpasang)
+    svg            satu <path> per QR Code
+
+Usage:
+    python benchmarks/bench_qr.py
+    python benchmarks/bench_qr.py --lengths 30,300,1000 --box-size 10 --repeat 50 --json qr.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from src.utils import qr_raster
+from src.utils.qr_generator import QRCodeGenerator
+
+MODES = ('matrix', 'pil', 'raster', 'raster-python', 'raster-numpy', 'svg')
+
+
+def make_data(length: int) -> str:
+    """Data sintetis: URL dengan panjang tertentu"""
+    base = 'https://s.jhopan.id/'
+    return (base + 'abcdefghijklmnopqrstuvwxyz0123456789' * (length // 36 + 1))[:max(length, len(base))]
+
+
+def _drawer(mode: str, box_size: int, fill: str, back: str) -> Callable[[object], object]:
+    """Fungsi QRCode (sudah di-encode) -> output untuk satu mode"""
+    if mode == 'matrix':
+        return lambda qr: qr.get_matrix()
+    if mode == 'pil':
+        return lambda qr: qr_raster.save_png(qr.make_image(fill_color=fill, back_color=back).get_image())
+    if mode == 'svg':
+        return lambda qr: qr_raster.to_svg(qr.get_matrix(), box_size, fill, back)
+    backend = {'raster': 'auto', 'raster-python': 'python', 'raster-numpy': 'numpy'}[mode]
+    return lambda qr: qr_raster.to_png(qr.get_matrix(), box_size, fill, back, backend)
+
+
+def _median_ms(func: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 3)
+
+
+def run(modes: List[str], lengths: List[int], box_size: int, level: str, repeat: int,
+        fill: str, back: str) -> Dict:
+    gen = QRCodeGenerator(box_size=box_size, error_correction=level)
+    results = {}
+    for length in lengths:
+        data = make_data(length)
+        encoded = gen._make_qr(data)
+        modules = len(encoded.get_matrix())
+        row = {'modules': modules, 'pixels': modules * box_size, 'modes': {}}
+        for mode in modes:
+            if mode == 'raster-numpy' and qr_raster.numpy is None:
+                print(f"⏭️  {mode}: numpy tidak terpasang, dilewati")
+                continue
+            draw = _drawer(mode, box_size, fill, back)
+            output = draw(encoded)  # warm-up
+            row['modes'][mode] = {
+                'total_ms': _median_ms(lambda: draw(gen._make_qr(data)), repeat),
+                'draw_ms': _median_ms(lambda: draw(encoded), repeat),
+                'bytes': len(output) if isinstance(output, (bytes, str)) else None
+            }
+        results[str(length)] = row
+        print(f"✅ {length} chars: {modules}x{modules} modules")
+    return results
+
+
+def print_report(results: Dict):
+    print("")
+    print(f"{'chars':>6} {'px':>6} {'mode':<14} {'total ms':>9} {'draw ms':>8} {'bytes':>8} {'draw vs pil':>12}")
+    for length, row in results.items():
+        pil = row['modes'].get('pil')
+        for mode, r in row['modes'].items():
+            speedup = ''
+            if pil and mode not in ('matrix', 'pil') and r['draw_ms']:
+                speedup = f"{pil['draw_ms'] / r['draw_ms']:.1f}x"
+            size = r['bytes'] if r['bytes'] is not None else '-'
+            print(f"{length:>6} {row['pixels']:>6} {mode:<14} {r['total_ms']:>9} {r['draw_ms']:>8} {size:>8} {speedup:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark render QR Code (PIL vs raster vs SVG)')
+    parser.add_argument('--modes', default=','.join(MODES), help='Mode yang di-test (koma)')
+    parser.add_argument('--lengths', default='30,120,500,1000', help='Panjang data (koma, maks ~1200 untuk level H)')
+    parser.add_argument('--box-size', type=int, default=10, help='Pixel per module')
+    parser.add_argument('--level', default='H', choices=['L', 'M', 'Q', 'H'], help='Error correction')
+    parser.add_argument('--repeat', type=int, default=30, help='Render per mode per panjang data')
+    parser.add_argument('--fill', default='black', help='Warna module')
+    parser.add_argument('--back', default='white', help='Warna background')
+    parser.add_argument('--json', help='Simpan hasil ke file JSON')
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(',')]
+    lengths = [int(n) for n in args.lengths.split(',')]
+    print(f"🚀 QR render: box_size={args.box_size}, level={args.level}, repeat={args.repeat}")
+    results = run(modes, lengths, args.box_size, args.level, args.repeat, args.fill, args.back)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+        print(f"\n💾 Saved to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
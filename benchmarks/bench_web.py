@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+"""
+Benchmark redirect server: Flask (Werkzeug) vs ASGI (uvicorn)
+
+Setiap mode dijalankan sebagai subprocess dengan database sintetis yang
+sama, lalu di-load dengan N koneksi keep-alive (asyncio) yang meminta
+short code acak. Hasil: requests/second dan latency p50/p95/p99.
+
+Usage:
+    python benchmarks/bench_web.py
+    python benchmarks/bench_web.py --modes flask,asgi --connections 64 --duration 10
+    python benchmarks/bench_web.py --json results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+BENCH_HOST = 'bench.local'
+
+
+def build_database(db_path: str, num_links: int) -> list:
+    """
+    Buat database sintetis
+
+    Returns:
+        List short code yang ada di database
+    """
+    from database.db_manager import DatabaseManager
+
+    db = DatabaseManager(db_path)
+    codes = [f'b{i:07d}' for i in range(num_links)]
+    with db.connection() as conn:
+        conn.executemany(
+            'INSERT INTO short_links (short_code, original_url, domain, created_by) VALUES (?, ?, ?, ?)',
+            [(code, f'https://example.com/{code}', 'default', str(i % 100)) for i, code in enumerate(codes)]
+        )
+        conn.execute('''
+            INSERT OR IGNORE INTO link_keys (domain, key, link_id)
+            SELECT domain, short_code, id FROM short_links
+        ''')
+        conn.commit()
+    db.pool.close_all()
+    return codes
+
+
+def free_port() -> int:
+    """Cari port TCP yang kosong"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve(mode: str, port: int):
+    """Jalankan server (dipanggil di subprocess)"""
+    if mode == 'asgi':
+        from web.asgi import run_asgi_server
+        run_asgi_server(host='127.0.0.1', port=port)
+    else:
+        import logging
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        from web.server import app
+        app.run(host='127.0.0.1', port=port, debug=False, use_reloader=False, threaded=True)
+
+
+def start_server(mode: str, db_path: str) -> tuple:
+    """Start server subprocess dan tunggu sampai /api/health menjawab"""
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}', WEB_SERVER_MODE=mode)
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve', mode, '--port', str(port)],
+        cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'{mode} server exited: {proc.stderr.read().decode(errors="replace")}')
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/api/health', timeout=1).read()
+            return proc, port
+        except OSError:
+            time.sleep(0.2)
+
+    proc.kill()
+    raise RuntimeError(f'{mode} server did not start')
+
+
+async def _read_response(reader) -> tuple:
+    """Baca satu response HTTP; return (status, keep_alive)"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    version, status = lines[0].split(' ', 2)[:2]
+    length = 0
+    keep_alive = version == 'HTTP/1.1'
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        name = name.lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection':
+            keep_alive = value.strip().lower() == 'keep-alive'
+    if length:
+        await reader.readexactly(length)
+    return int(status), keep_alive
+
+
+async def _worker(port: int, requests: list, offset: int, stop_at: float, warmup_until: float,
+                  samples: list, errors: list):
+    """
+    Satu koneksi keep-alive yang mengirim request berurutan
+
+    Request diambil dari daftar yang sama mulai dari offset masing-masing
+    koneksi, jadi urutan request bisa diulang (reproducible).
+    """
+    reader = writer = None
+    index = offset
+    while time.monotonic() < stop_at:
+        kind, host, path = requests[index % len(requests)]
+        index += 1
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            request = f'GET {path} HTTP/1.1\r\nHost: {host}\r\nUser-Agent: bench\r\n\r\n'
+            started = time.perf_counter()
+            writer.write(request.encode('latin-1'))
+            status, keep_alive = await _read_response(reader)
+            elapsed = time.perf_counter() - started
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            errors.append(type(e).__name__)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.01)
+            continue
+
+        if time.monotonic() >= warmup_until:
+            samples.append((kind, elapsed, status))
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+
+    if writer is not None:
+        writer.close()
+
+
+def summarize(latencies: list, duration: float) -> dict:
+    """Hitung rps dan percentile dari list latency (detik)"""
+    latencies = sorted(latencies)
+
+    def percentile(p):
+        if not latencies:
+            return None
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 3)
+
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / duration, 1),
+        'p50_ms': percentile(0.50),
+        'p90_ms': percentile(0.90),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': round(latencies[-1] * 1000, 3) if latencies else None,
+    }
+
+
+async def run_load(port: int, requests: list, connections: int, duration: float, warmup: float) -> dict:
+    """
+    Jalankan load test dan hitung statistik
+
+    Args:
+        port: Port server
+        requests: List (kind, host, path)
+        connections: Jumlah koneksi paralel
+        duration: Durasi pengukuran (detik)
+        warmup: Durasi warmup yang tidak dihitung (detik)
+    """
+    samples, errors = [], []
+    started = time.monotonic()
+    warmup_until = started + warmup
+    stop_at = warmup_until + duration
+    step = max(1, len(requests) // connections)
+    await asyncio.gather(*[
+        _worker(port, requests, i * step, stop_at, warmup_until, samples, errors)
+        for i in range(connections)
+    ])
+
+    statuses, latencies_by_kind, statuses_by_kind = {}, {}, {}
+    for kind, elapsed, status in samples:
+        statuses[status] = statuses.get(status, 0) + 1
+        latencies_by_kind.setdefault(kind, []).append(elapsed)
+        kind_statuses = statuses_by_kind.setdefault(kind, {})
+        kind_statuses[status] = kind_statuses.get(status, 0) + 1
+
+    result = summarize([elapsed for _, elapsed, _ in samples], duration)
+    result['statuses'] = {str(k): v for k, v in sorted(statuses.items())}
+    result['errors'] = len(errors)
+    result['by_kind'] = {}
+    for kind, values in sorted(latencies_by_kind.items()):
+        result['by_kind'][kind] = summarize(values, duration)
+        result['by_kind'][kind]['statuses'] = {str(k): v for k, v in sorted(statuses_by_kind[kind].items())}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark redirect server Flask vs ASGI')
+    parser.add_argument('--modes', default='flask,asgi', help='Mode yang dibandingkan (koma)')
+    parser.add_argument('--links', type=int, default=10000, help='Jumlah link di database sintetis')
+    parser.add_argument('--connections', type=int, default=32, help='Jumlah koneksi paralel')
+    parser.add_argument('--duration', type=float, default=10.0, help='Durasi pengukuran (detik)')
+    parser.add_argument('--warmup', type=float, default=2.0, help='Durasi warmup (detik)')
+    parser.add_argument('--not-found-ratio', type=float, default=0.1, help='Proporsi request ke kode yang tidak ada')
+    parser.add_argument('--json', help='Simpan hasil ke file JSON')
+    parser.add_argument('--serve', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        print(f"📦 Building database with {args.links} links...")
+        codes = build_database(db_path, args.links)
+
+        misses = max(1, int(len(codes) * args.not_found_ratio))
+        requests = [('hit', BENCH_HOST, f'/{code}') for code in codes]
+        requests += [('miss', BENCH_HOST, f'/missing{i}') for i in range(misses)]
+        random.Random(0).shuffle(requests)
+
+        for mode in args.modes.split(','):
+            mode = mode.strip()
+            print(f"🚀 {mode}: {args.connections} connections, {args.duration}s")
+            proc, port = start_server(mode, db_path)
+            try:
+                results[mode] = asyncio.run(
+                    run_load(port, requests, args.connections, args.duration, args.warmup)
+                )
+            finally:
+                proc.terminate()
+                try:
+                    proc.wait(10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+
+    print("")
+    print(f"{'mode':<8} {'rps':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'errors':>8}")
+    for mode, result in results.items():
+        print(
+            f"{mode:<8} {result['rps']:>10} {result['p50_ms']!s:>10} "
+            f"{result['p95_ms']!s:>10} {result['p99_ms']!s:>10} {result['errors']:>8}"
+        )
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+        print(f"\n💾 Saved to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
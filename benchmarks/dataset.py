@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+"""
+Generator dataset sintetis untuk database short link
+
+Mengisi short_links (banyak domain & user), link_keys, custom_domains dan
+riwayat click_logs dengan distribusi yang miring: sedikit user membuat
+banyak link, sedikit link mendapat sebagian besar klik. Generator bersifat
+append: menjalankan ulang dengan --links lebih besar hanya menambah sisa
+baris, jadi satu database bisa dibesarkan bertahap (dipakai bench_db.py).
+
+Usage:
+    python benchmarks/dataset.py --db /tmp/big.db --links 1000000
+    python benchmarks/dataset.py --db /tmp/big.db --links 5000000 --users 200000 --click-logs 10000000
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from typing import Dict
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+BASE62 = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+CODE_SPACE = 62 ** 6
+# Pengali ganjil & bukan kelipatan 31 -> permutasi id ke kode 6 karakter tanpa tabrakan
+CODE_MULTIPLIER = 15485863
+
+START_TIME = 1_700_000_000  # created_at link pertama (epoch)
+LINK_INTERVAL = 30  # detik antar link (rata-rata)
+BATCH_SIZE = 50000
+ALIAS_RATIO = 0.05  # proporsi link dengan custom alias
+
+
+def code_for_id(link_id: int) -> str:
+    """Short code deterministik 6 karakter untuk id (unik untuk id < 62^6)"""
+    value = (link_id * CODE_MULTIPLIER) % CODE_SPACE
+    chars = []
+    for _ in range(6):
+        value, rem = divmod(value, 62)
+        chars.append(BASE62[rem])
+    return ''.join(chars)
+
+
+def alias_for_id(link_id: int, alias_ratio: float):
+    """Custom alias deterministik untuk sebagian link (None jika tanpa alias)"""
+    if (link_id * 2654435761) % 10000 < alias_ratio * 10000:
+        return f'a{link_id}'
+    return None
+
+
+def domain_name(index: int) -> str:
+    return f'links{index}.example.net'
+
+
+def zipf_cum_weights(n: int, exponent: float) -> list:
+    return list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+def _timestamp(seconds: float) -> str:
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(seconds))
+
+
+def current_size(conn) -> Dict[str, int]:
+    """Jumlah baris yang sudah ada"""
+    return {
+        'links': conn.execute('SELECT COALESCE(MAX(id), 0) FROM short_links').fetchone()[0],
+        'domains': conn.execute('SELECT COUNT(*) FROM custom_domains').fetchone()[0],
+        'click_logs': conn.execute('SELECT COALESCE(MAX(id), 0) FROM click_logs').fetchone()[0],
+    }
+
+
+def generate(db_path: str, links: int, users: int = 10000, domains: int = 100,
+             click_logs: int = None, domain_ratio: float = 0.2, alias_ratio: float = ALIAS_RATIO,
+             inactive_ratio: float = 0.03, skew: float = 1.1, seed: int = 1,
+             verbose: bool = True) -> Dict[str, int]:
+    """
+    Tambah baris sampai database berisi `links` link
+
+    Args:
+        db_path: Path database SQLite (schema dibuat lewat migrasi)
+        links: Target jumlah short_links
+        users: Jumlah user pembuat link
+        domains: Jumlah custom domain
+        click_logs: Target jumlah baris click_logs (default 2x links)
+        domain_ratio: Proporsi link di custom domain
+        alias_ratio: Proporsi link dengan custom alias
+        inactive_ratio: Proporsi link nonaktif
+        skew: Exponent Zipf untuk user, domain dan popularitas link
+        seed: Seed random (hasil sama untuk seed & urutan pemanggilan sama)
+
+    Returns:
+        Jumlah baris setelah generate
+    """
+    from database.db_manager import DatabaseManager
+
+    click_logs = links * 2 if click_logs is None else click_logs
+    db = DatabaseManager(db_path)
+    with db.connection() as conn:
+        # Load massal: durability tidak penting untuk data sintetis
+        conn.execute('PRAGMA synchronous = OFF')
+        try:
+            existing = current_size(conn)
+            _generate_domains(conn, existing['domains'], domains, users, seed)
+            _generate_links(conn, existing['links'], links, users, domains, domain_ratio,
+                            alias_ratio, inactive_ratio, skew, seed, verbose)
+            _generate_click_logs(conn, existing['click_logs'], click_logs, links, alias_ratio, skew, seed, verbose)
+            size = current_size(conn)
+        finally:
+            conn.execute(f'PRAGMA synchronous = {db.tuning.synchronous}')
+    db.flush_clicks()
+    db.pool.close_all()
+    return size
+
+
+def _generate_domains(conn, start: int, total: int, users: int, seed: int):
+    if start >= total:
+        return
+    rnd = random.Random(f'{seed}-domains-{start}')
+    conn.executemany(
+        'INSERT OR IGNORE INTO custom_domains (domain, user_id) VALUES (?, ?)',
+        [(domain_name(i), str(rnd.randrange(users))) for i in range(start, total)]
+    )
+    conn.commit()
+
+
+def _generate_links(conn, start: int, total: int, users: int, domains: int, domain_ratio: float,
+                    alias_ratio: float, inactive_ratio: float, skew: float, seed: int, verbose: bool):
+    if start >= total:
+        return
+    user_weights = zipf_cum_weights(users, skew)
+    domain_weights = zipf_cum_weights(domains, skew) if domains else None
+    started = time.monotonic()
+
+    for batch_start in range(start, total, BATCH_SIZE):
+        batch_end = min(batch_start + BATCH_SIZE, total)
+        rnd = random.Random(f'{seed}-links-{batch_start}')
+        ids = range(batch_start + 1, batch_end + 1)
+        owners = rnd.choices(range(users), cum_weights=user_weights, k=len(ids))
+        rows = []
+        for link_id, owner in zip(ids, owners):
+            code = code_for_id(link_id)
+            if domains and rnd.random() < domain_ratio:
+                domain = domain_name(rnd.choices(range(domains), cum_weights=domain_weights)[0])
+            else:
+                domain = 'default'
+            alias = alias_for_id(link_id, alias_ratio)
+            # Pareto: kebanyakan link sedikit klik, sebagian kecil sangat populer
+            clicks = int(rnd.paretovariate(skew)) - 1
+            created_at = _timestamp(START_TIME + link_id * LINK_INTERVAL + rnd.randrange(LINK_INTERVAL))
+            active = 0 if rnd.random() < inactive_ratio else 1
+            rows.append((
+                link_id, alias or code, f'https://example.com/{owner}/{link_id}', alias,
+                domain, clicks, created_at, str(owner), active
+            ))
+
+        conn.executemany('''
+            INSERT INTO short_links
+            (id, short_code, original_url, custom_alias, domain, clicks, created_at, created_by, is_active)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.execute('''
+            INSERT OR IGNORE INTO link_keys (domain, key, link_id)
+            SELECT domain, short_code, id FROM short_links WHERE id > ? AND id <= ?
+        ''', (batch_start, batch_end))
+        conn.commit()
+
+        if verbose:
+            rate = (batch_end - start) / max(time.monotonic() - started, 1e-9)
+            print(f"   short_links: {batch_end}/{total} ({rate:,.0f} rows/s)")
+
+
+def _generate_click_logs(conn, start: int, total: int, links: int, alias_ratio: float,
+                         skew: float, seed: int, verbose: bool):
+    if start >= total or links <= 0:
+        return
+    # Popularitas link: rank Zipf di atas urutan acak id (bukan id kecil = populer)
+    rnd = random.Random(f'{seed}-popularity-{links}')
+    link_weights = zipf_cum_weights(links, skew)
+    order = list(range(1, links + 1))
+    rnd.shuffle(order)
+    started = time.monotonic()
+
+    for batch_start in range(start, total, BATCH_SIZE):
+        batch_end = min(batch_start + BATCH_SIZE, total)
+        rnd = random.Random(f'{seed}-clicks-{batch_start}')
+        picked = rnd.choices(order, cum_weights=link_weights, k=batch_end - batch_start)
+        rows = []
+        for link_id in picked:
+            clicked = START_TIME + link_id * LINK_INTERVAL + rnd.randrange(86400 * 30)
+            rows.append((
+                alias_for_id(link_id, alias_ratio) or code_for_id(link_id), link_id, _timestamp(clicked),
+                f'10.{rnd.randrange(256)}.{rnd.randrange(256)}.{rnd.randrange(256)}',
+                'Mozilla/5.0 (synthetic)', None
+            ))
+        conn.executemany('''
+            INSERT INTO click_logs (short_code, link_id, clicked_at, ip_address, user_agent, referer)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.commit()
+
+        if verbose:
+            rate = (batch_end - start) / max(time.monotonic() - started, 1e-9)
+            print(f"   click_logs: {batch_end}/{total} ({rate:,.0f} rows/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Isi database dengan data sintetis')
+    parser.add_argument('--db', required=True, help='Path database SQLite (dibuat jika belum ada)')
+    parser.add_argument('--links', type=int, required=True, help='Target jumlah short_links')
+    parser.add_argument('--users', type=int, default=10000, help='Jumlah user')
+    parser.add_argument('--domains', type=int, default=100, help='Jumlah custom domain')
+    parser.add_argument('--click-logs', type=int, help='Target jumlah click_logs (default 2x links)')
+    parser.add_argument('--domain-ratio', type=float, default=0.2, help='Proporsi link di custom domain')
+    parser.add_argument('--skew', type=float, default=1.1, help='Exponent Zipf (user, domain, popularitas)')
+    parser.add_argument('--seed', type=int, default=1, help='Seed random')
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    print(f"📦 Generating {args.links:,} links into {args.db}...")
+    size = generate(
+        args.db, args.links, users=args.users, domains=args.domains,
+        click_logs=args.click_logs, domain_ratio=args.domain_ratio,
+        skew=args.skew, seed=args.seed
+    )
+    print(f"✅ {size['links']:,} links, {size['domains']:,} domains, {size['click_logs']:,} click logs "
+          f"({time.monotonic() - started:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+"""
+Load test redirect service (lokal, tanpa network keluar)
+
+Database sintetis berisi link di domain default dan di beberapa custom
+domain. Request ke /<code> dibuat dari campuran yang bisa diatur:
+
+    hit          host default, kode yang ada          -> 302
+    miss         host default, kode yang tidak ada    -> 404
+    domain       host custom domain, kode domain itu  -> 302
+    domain_miss  host custom domain, kode tidak ada   -> 404
+
+Urutan request dibuat dari --seed (popularitas kode mengikuti distribusi
+Zipf), jadi dua run dengan argumen sama mengirim request yang sama.
+Hasil disimpan sebagai JSON (rps, p50/p95/p99 total dan per jenis) dan
+bisa dibandingkan dengan hasil sebelumnya lewat --compare.
+
+Usage:
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --modes flask,asgi --mix hit=0.8,miss=0.2 --duration 20
+    python benchmarks/load_test.py --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.bench_web import BENCH_HOST, run_load, start_server
+
+DEFAULT_MIX = 'hit=0.7,miss=0.1,domain=0.15,domain_miss=0.05'
+EXPECTED_STATUS = {'hit': 302, 'miss': 404, 'domain': 302, 'domain_miss': 404}
+DEFAULT_RESULTS_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'results')
+
+
+def parse_mix(value: str) -> dict:
+    """Parse 'hit=0.7,miss=0.3' menjadi {kind: weight}"""
+    mix = {}
+    for part in value.split(','):
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in EXPECTED_STATUS:
+            raise argparse.ArgumentTypeError(f'Jenis request tidak dikenal: {kind} (pilih {", ".join(EXPECTED_STATUS)})')
+        try:
+            mix[kind] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f'Bobot tidak valid: {part}')
+    if sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError('Total bobot mix harus > 0')
+    return mix
+
+
+def domain_host(index: int) -> str:
+    return f'go{index}.{BENCH_HOST}'
+
+
+def build_database(db_path: str, num_links: int, num_domains: int, domain_links: int) -> dict:
+    """
+    Buat database sintetis
+
+    Returns:
+        Dict {'default': [codes], 'domains': {host: [codes]}}
+    """
+    from database.db_manager import DatabaseManager
+
+    db = DatabaseManager(db_path)
+    default_codes = [f'b{i:07d}' for i in range(num_links)]
+    domains = {
+        domain_host(d): [f'd{d}x{i:06d}' for i in range(domain_links)]
+        for d in range(num_domains)
+    }
+
+    rows = [(code, 'default', str(i % 1000)) for i, code in enumerate(default_codes)]
+    for d, (host, codes) in enumerate(domains.items()):
+        rows.extend((code, host, f'domain{d}') for code in codes)
+
+    with db.connection() as conn:
+        conn.executemany(
+            'INSERT INTO custom_domains (domain, user_id) VALUES (?, ?)',
+            [(host, f'domain{d}') for d, host in enumerate(domains)]
+        )
+        conn.executemany(
+            'INSERT INTO short_links (short_code, original_url, domain, created_by) VALUES (?, ?, ?, ?)',
+            [(code, f'https://example.com/{code}', domain, user) for code, domain, user in rows]
+        )
+        conn.execute('''
+            INSERT OR IGNORE INTO link_keys (domain, key, link_id)
+            SELECT domain, short_code, id FROM short_links
+        ''')
+        conn.commit()
+    db.pool.close_all()
+    return {'default': default_codes, 'domains': domains}
+
+
+def zipf_picker(items: list, exponent: float, rnd: random.Random):
+    """Fungsi yang memilih item dengan distribusi Zipf (exponent 0 = uniform)"""
+    if exponent <= 0:
+        return lambda: rnd.choice(items)
+    cum_weights = list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, len(items) + 1)))
+    return lambda: rnd.choices(items, cum_weights=cum_weights)[0]
+
+
+def build_schedule(dataset: dict, mix: dict, size: int, zipf: float, seed: int) -> list:
+    """
+    Buat daftar request (kind, host, path) yang deterministik untuk seed
+
+    Args:
+        dataset: Hasil build_database
+        mix: {kind: weight}
+        size: Jumlah request di daftar (diulang jika load test lebih lama)
+        zipf: Exponent Zipf untuk popularitas kode
+        seed: Seed random
+    """
+    rnd = random.Random(seed)
+    hosts = list(dataset['domains'])
+    if not hosts:
+        mix = {k: w for k, w in mix.items() if not k.startswith('domain')}
+    kinds = list(mix)
+    weights = [mix[k] for k in kinds]
+
+    pick_default = zipf_picker(dataset['default'], zipf, rnd)
+    pick_host = zipf_picker(hosts, zipf, rnd) if hosts else None
+    domain_pickers = {host: zipf_picker(codes, zipf, rnd) for host, codes in dataset['domains'].items()}
+
+    schedule = []
+    for i, kind in enumerate(rnd.choices(kinds, weights=weights, k=size)):
+        if kind == 'hit':
+            schedule.append((kind, BENCH_HOST, f'/{pick_default()}'))
+        elif kind == 'miss':
+            schedule.append((kind, BENCH_HOST, f'/missing{i}'))
+        else:
+            host = pick_host()
+            code = domain_pickers[host]() if kind == 'domain' else f'nothere{i}'
+            schedule.append((kind, host, f'/{code}'))
+    return schedule
+
+
+def environment_info() -> dict:
+    """Info environment supaya hasil antar run bisa dibandingkan"""
+    def git(*args):
+        try:
+            return subprocess.run(
+                ['git', *args], cwd=ROOT_DIR, capture_output=True, text=True, timeout=10
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'git_commit': git('rev-parse', '--short', 'HEAD'),
+        'git_dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def check_statuses(result: dict) -> int:
+    """Tandai response dengan status yang tidak sesuai jenis request"""
+    unexpected = 0
+    for kind, stats in result['by_kind'].items():
+        expected = str(EXPECTED_STATUS[kind])
+        wrong = sum(count for status, count in stats['statuses'].items() if status != expected)
+        stats['unexpected'] = wrong
+        unexpected += wrong
+    result['unexpected'] = unexpected
+    return unexpected
+
+
+def print_results(results: dict):
+    print("")
+    print(f"{'mode':<8} {'kind':<12} {'rps':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'bad':>6}")
+    for mode, result in results.items():
+        rows = [('all', result)] + list(result['by_kind'].items())
+        for kind, stats in rows:
+            bad = result['errors'] + result['unexpected'] if kind == 'all' else stats['unexpected']
+            print(
+                f"{mode:<8} {kind:<12} {stats['rps']:>10} {stats['p50_ms']!s:>10} "
+                f"{stats['p95_ms']!s:>10} {stats['p99_ms']!s:>10} {bad:>6}"
+            )
+
+
+def print_comparison(baseline: dict, results: dict):
+    """Bandingkan hasil dengan file JSON sebelumnya"""
+    def delta(before, after):
+        if not before or after is None:
+            return 'n/a'
+        return f'{(after - before) / before * 100:+.1f}%'
+
+    base_env = baseline.get('environment', {})
+    print(f"\n📊 Compared to {base_env.get('git_commit')} ({base_env.get('timestamp')})")
+    print(f"{'mode':<8} {'metric':<8} {'before':>10} {'after':>10} {'change':>9}")
+    for mode, result in results.items():
+        before = baseline.get('results', {}).get(mode)
+        if not before:
+            print(f"{mode:<8} (tidak ada di baseline)")
+            continue
+        for metric in ('rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+            print(
+                f"{mode:<8} {metric:<8} {before.get(metric)!s:>10} {result[metric]!s:>10} "
+                f"{delta(before.get(metric), result[metric]):>9}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test redirect service')
+    parser.add_argument('--modes', default='flask', help='Server mode yang di-test (koma): flask, asgi')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f'Bobot jenis request (default {DEFAULT_MIX})')
+    parser.add_argument('--links', type=int, default=10000, help='Jumlah link di domain default')
+    parser.add_argument('--domains', type=int, default=20, help='Jumlah custom domain')
+    parser.add_argument('--domain-links', type=int, default=500, help='Jumlah link per custom domain')
+    parser.add_argument('--zipf', type=float, default=1.0, help='Skew popularitas kode (0 = uniform)')
+    parser.add_argument('--schedule-size', type=int, default=100000, help='Jumlah request unik di urutan request')
+    parser.add_argument('--seed', type=int, default=1, help='Seed untuk dataset dan urutan request')
+    parser.add_argument('--connections', type=int, default=32, help='Jumlah koneksi paralel')
+    parser.add_argument('--duration', type=float, default=10.0, help='Durasi pengukuran (detik)')
+    parser.add_argument('--warmup', type=float, default=2.0, help='Durasi warmup (detik)')
+    parser.add_argument('--output', help='File hasil JSON (default benchmarks/results/load-<waktu>.json)')
+    parser.add_argument('--compare', help='File JSON hasil sebelumnya untuk dibandingkan')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'load.db')
+        print(f"📦 Building database: {args.links} links + {args.domains} domains x {args.domain_links} links...")
+        dataset = build_database(db_path, args.links, args.domains, args.domain_links)
+        schedule = build_schedule(dataset, args.mix, args.schedule_size, args.zipf, args.seed)
+
+        for mode in args.modes.split(','):
+            mode = mode.strip()
+            print(f"🚀 {mode}: {args.connections} connections, {args.duration}s")
+            proc, port = start_server(mode, db_path)
+            try:
+                results[mode] = asyncio.run(
+                    run_load(port, schedule, args.connections, args.duration, args.warmup)
+                )
+            finally:
+                proc.terminate()
+                try:
+                    proc.wait(10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+            check_statuses(results[mode])
+
+    print_results(results)
+    if baseline:
+        print_comparison(baseline, results)
+
+    output = args.output
+    if not output:
+        os.makedirs(DEFAULT_RESULTS_DIR, exist_ok=True)
+        output = os.path.join(DEFAULT_RESULTS_DIR, time.strftime('load-%Y%m%d-%H%M%S.json'))
+    config = dict(vars(args), mix=args.mix)
+    with open(output, 'w') as f:
+        json.dump({'environment': environment_info(), 'config': config, 'results': results}, f, indent=2)
+    print(f"\n💾 Saved to {output}")
+
+    if any(r['unexpected'] for r in results.values()):
+        print("⚠️  Some responses had unexpected status codes")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
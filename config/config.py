@@ -12,16 +12,89 @@ class Config:
     
     # Bot Configuration
     BOT_TOKEN = os.getenv('BOT_TOKEN')
+    # Jumlah update yang diproses bersamaan (1 = satu per satu)
+    BOT_CONCURRENT_UPDATES = int(os.getenv('BOT_CONCURRENT_UPDATES', '1'))
     
     # TinyURL Fallback (when web server is down)
     TINYURL_API_KEY = os.getenv('TINYURL_API_KEY', '')
     
     # Database
     DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///shortlink.db')
+    DATABASE_PATH = DATABASE_URL.replace('sqlite:///', '', 1)
+    
+    # SQLite tuning profile (diterapkan ke setiap koneksi)
+    DB_JOURNAL_MODE = os.getenv('DB_JOURNAL_MODE', 'WAL')
+    DB_SYNCHRONOUS = os.getenv('DB_SYNCHRONOUS', 'NORMAL')
+    DB_MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', str(256 * 1024 * 1024)))
+    DB_CACHE_SIZE = int(os.getenv('DB_CACHE_SIZE', '-20000'))  # negatif = KiB
+    DB_TEMP_STORE = os.getenv('DB_TEMP_STORE', 'MEMORY')
+    DB_BUSY_TIMEOUT = int(os.getenv('DB_BUSY_TIMEOUT', '5000'))  # ms
+    
+    # WAL checkpoint policy
+    DB_WAL_AUTOCHECKPOINT = int(os.getenv('DB_WAL_AUTOCHECKPOINT', '1000'))  # pages
+    DB_CHECKPOINT_INTERVAL = float(os.getenv('DB_CHECKPOINT_INTERVAL', '300'))  # detik
+    DB_WAL_TRUNCATE_BYTES = int(os.getenv('DB_WAL_TRUNCATE_BYTES', str(64 * 1024 * 1024)))
+    
+    # Schema migration (backfill per batch supaya redirect tidak ter-block lama)
+    MIGRATION_BATCH_SIZE = int(os.getenv('MIGRATION_BATCH_SIZE', '1000'))
+    MIGRATION_BATCH_PAUSE = float(os.getenv('MIGRATION_BATCH_PAUSE', '0.05'))  # detik
+    
+    # Panjang minimal short code (naik otomatis jika semua kode sepanjang ini terpakai)
+    SHORT_CODE_LENGTH = int(os.getenv('SHORT_CODE_LENGTH', '6'))
+    # Jumlah short code yang di-lease per proses dalam satu transaksi
+    CODE_BLOCK_SIZE = int(os.getenv('CODE_BLOCK_SIZE', '100'))
+    
+    # Connection pool SQLite
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '16'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', '256'))
+    # Thread pool untuk query baca dari handler bot (write di satu thread terpisah)
+    DB_ASYNC_WORKERS = int(os.getenv('DB_ASYNC_WORKERS', '4'))
+    
+    # Cache lookup link (web redirect)
+    LINK_CACHE_SIZE = int(os.getenv('LINK_CACHE_SIZE', '10000'))
+    LINK_CACHE_TTL = float(os.getenv('LINK_CACHE_TTL', '60'))
+    
+    # Filter kode (bloom filter) & negative cache untuk 404
+    CODE_FILTER_FP_RATE = float(os.getenv('CODE_FILTER_FP_RATE', '0.01'))
+    CODE_FILTER_SYNC_INTERVAL = float(os.getenv('CODE_FILTER_SYNC_INTERVAL', '5'))
+    NEGATIVE_CACHE_TTL = float(os.getenv('NEGATIVE_CACHE_TTL', '30'))
+    
+    # Click tracking write-behind queue
+    CLICK_QUEUE_ENABLED = os.getenv('CLICK_QUEUE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    CLICK_QUEUE_SIZE = int(os.getenv('CLICK_QUEUE_SIZE', '10000'))
+    CLICK_BATCH_SIZE = int(os.getenv('CLICK_BATCH_SIZE', '500'))
+    CLICK_FLUSH_INTERVAL = float(os.getenv('CLICK_FLUSH_INTERVAL', '1'))
+    CLICK_FLUSH_RETRIES = int(os.getenv('CLICK_FLUSH_RETRIES', '10'))
     
     # Web Server Configuration  
     WEB_HOST = os.getenv('WEB_HOST', '0.0.0.0')
     WEB_PORT = int(os.getenv('WEB_PORT', '5000'))
+    # flask = Werkzeug server (default), asgi = uvicorn (pip install uvicorn)
+    WEB_SERVER_MODE = os.getenv('WEB_SERVER_MODE', 'flask').lower()
+    WEB_KEEPALIVE_TIMEOUT = int(os.getenv('WEB_KEEPALIVE_TIMEOUT', '5'))  # detik
+    WEB_BACKLOG = int(os.getenv('WEB_BACKLOG', '2048'))
+    # Jumlah proses web worker (0 = web server di thread proses bot)
+    WEB_WORKERS = int(os.getenv('WEB_WORKERS', '0'))
+    # Jumlah link teratas yang dimuat ke cache saat worker start
+    WEB_CACHE_WARM = int(os.getenv('WEB_CACHE_WARM', '1000'))
+    # Homepage di-render ulang (stats di-refresh) paling sering sekali per TTL
+    HOME_CACHE_TTL = float(os.getenv('HOME_CACHE_TTL', '30'))
+    
+    # Request log web server (JSON lines, ditulis oleh background thread)
+    WEB_LOG_FILE = os.getenv('WEB_LOG_FILE', '')  # kosong = stdout
+    WEB_LOG_LEVEL = os.getenv('WEB_LOG_LEVEL', 'INFO')
+    WEB_LOG_REDIRECT_SAMPLE = float(os.getenv('WEB_LOG_REDIRECT_SAMPLE', '0.1'))  # 0-1
+    WEB_LOG_NOT_FOUND_SAMPLE = float(os.getenv('WEB_LOG_NOT_FOUND_SAMPLE', '1.0'))  # 0-1
+    WEB_LOG_QUEUE_SIZE = int(os.getenv('WEB_LOG_QUEUE_SIZE', '10000'))
+    
+    # /api/create/batch: item per transaksi dan maksimal item per request
+    BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', '1000'))
+    BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', '100000'))
+    
+    # /api/export/*: token wajib (kosong = endpoint nonaktif), baris per query
+    EXPORT_TOKEN = os.getenv('EXPORT_TOKEN', '')
+    EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '1000'))
     
     # Default Domain untuk Short Link
     DEFAULT_DOMAIN = os.getenv('DEFAULT_DOMAIN', 'jhopan.id')
@@ -35,6 +108,13 @@ class Config:
     QR_BOX_SIZE = 10
     QR_BORDER = 4
     QR_ERROR_CORRECTION = 'H'  # L, M, Q, H
+    QR_RENDERER = os.getenv('QR_RENDERER', 'raster')  # raster (PNG palette 1-bit), pil
+    QR_RENDER_MODE = os.getenv('QR_RENDER_MODE', 'process')  # process, thread, inline
+    QR_RENDER_WORKERS = int(os.getenv('QR_RENDER_WORKERS', '2'))
+    QR_RENDER_QUEUE = int(os.getenv('QR_RENDER_QUEUE', '32'))
+    QR_CACHE_SIZE = int(os.getenv('QR_CACHE_SIZE', '1000'))  # jumlah PNG di memory (0 = off)
+    QR_CACHE_MAX_BYTES = int(os.getenv('QR_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+    QR_CACHE_DIR = os.getenv('QR_CACHE_DIR', '')  # kosong = tanpa cache disk
     
     @classmethod
     def validate(cls):
@@ -2,5 +2,10 @@
 Database package initialization
 """
 from .db_manager import DatabaseManager
+from .cache import LinkCache, NegativeCache
+from .bloom import BloomFilter, CodeFilter
+from .pool import ConnectionPool, PoolTimeout
+from .tuning import SqliteTuning
 
-__all__ = ['DatabaseManager']
+__all__ = ['DatabaseManager', 'LinkCache', 'NegativeCache', 'BloomFilter', 'CodeFilter',
+           'ConnectionPool', 'PoolTimeout', 'SqliteTuning']
@@ -0,0 +1,28 @@
+"""
+CLI database: python -m database <command> [options]
+
+Commands:
+    migrate   Jalankan / cek schema migrations (--status, --dry-run)
+    counters  Cek atau bangun ulang counter statistik (--check, --reconcile)
+    export    Export links / klik ke CSV atau NDJSON (streaming)
+"""
+import sys
+
+from . import counters, export, migrations
+
+COMMANDS = {
+    'migrate': migrations.main,
+    'counters': counters.main,
+    'export': export.main,
+}
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        print(__doc__.strip())
+        sys.exit(2)
+    COMMANDS[sys.argv[1]](sys.argv[2:])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Async facade untuk DatabaseManager (dipakai handler bot)
+
+Handler python-telegram-bot berjalan di satu event loop. Memanggil
+DatabaseManager langsung dari async handler membuat seluruh loop menunggu
+SQLite (mis. saat write menunggu busy_timeout), jadi update user lain ikut
+tertahan. AsyncDatabaseManager punya method yang sama dengan
+DatabaseManager, tetapi setiap call dijalankan di thread pool dan di-await.
+
+SQLite hanya mengizinkan satu writer, jadi method yang menulis dijalankan
+di satu thread khusus; query baca memakai DB_ASYNC_WORKERS thread lain.
+Write yang menunggu lock (busy_timeout) tidak memakan thread baca, dan
+di mode WAL baca tetap jalan selama write berlangsung.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from config.config import Config
+from .cache import shared_for_database
+from .db_manager import DatabaseManager
+
+# Method yang tidak punya versi async (context manager / koneksi mentah)
+SYNC_ONLY = ('connection', 'get_connection', 'release_connection')
+
+
+def async_methods(source: type, exclude=SYNC_ONLY):
+    """
+    Class decorator: tambah versi async untuk setiap method public source
+
+    Method baru menjalankan method yang sama pada self.sync lewat
+    self.run(), jadi method baru di DatabaseManager otomatis tersedia.
+    """
+    def decorate(cls):
+        for name, func in list(vars(source).items()):
+            if name.startswith('_') or name in exclude or not callable(func) or name in vars(cls):
+                continue
+            setattr(cls, name, _async_method(name, func))
+        return cls
+    return decorate
+
+
+def _async_method(name: str, func: Callable) -> Callable:
+    # Method yang menulis ditandai @writes di DatabaseManager
+    write = getattr(func, 'writes_database', False)
+
+    @functools.wraps(func)
+    async def method(self, *args, **kwargs):
+        return await self.run(getattr(self.sync, name), *args, write=write, **kwargs)
+    return method
+
+
+@async_methods(DatabaseManager)
+class AsyncDatabaseManager:
+    """DatabaseManager dengan method async (thread pool baca + satu thread writer)"""
+
+    def __init__(self, db: Optional[DatabaseManager] = None, max_workers: Optional[int] = None):
+        """
+        Args:
+            db: DatabaseManager yang dibungkus (default: DatabaseManager())
+            max_workers: Jumlah thread baca (default DB_ASYNC_WORKERS)
+        """
+        self.sync = db or DatabaseManager()
+        self.max_workers = max_workers or Config.DB_ASYNC_WORKERS
+
+    def executor(self, write: bool = False) -> ThreadPoolExecutor:
+        """Thread pool baca atau thread writer untuk database ini"""
+        # Dibagi semua facade untuk database yang sama, dan dibuat ulang di
+        # proses child setelah fork (thread executor parent tidak ikut)
+        if write:
+            return shared_for_database(
+                'async_writer',
+                self.sync.db_path,
+                lambda: ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-async-write')
+            )
+        return shared_for_database(
+            'async_reader',
+            self.sync.db_path,
+            lambda: ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='db-async-read')
+        )
+
+    async def run(self, func: Callable, *args, write: bool = False, **kwargs):
+        """
+        Jalankan fungsi sinkron di thread pool database
+
+        Args:
+            func: Fungsi yang dijalankan
+            write: True jika fungsi menulis (dijalankan di thread writer)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor(write), functools.partial(func, *args, **kwargs))
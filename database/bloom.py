@@ -0,0 +1,216 @@
+"""
+Bloom filter untuk semua short code / alias yang aktif
+"""
+import hashlib
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from .cache import shared_for_database
+
+
+class BloomFilter:
+    """Bloom filter sederhana berbasis bytearray"""
+
+    def __init__(self, capacity: int, fp_rate: float = 0.01):
+        """
+        Initialize bloom filter
+
+        Args:
+            capacity: Jumlah item yang direncanakan
+            fp_rate: Target false positive rate pada kapasitas penuh
+        """
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        """Hitung posisi bit dengan double hashing"""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, item: str):
+        """Tambahkan item ke filter"""
+        bits = self.bits
+        for pos in self._positions(item):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        for pos in self._positions(item):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    @property
+    def memory_bytes(self) -> int:
+        """Ukuran bit array dalam bytes"""
+        return len(self.bits)
+
+    def estimated_fp_rate(self) -> float:
+        """Estimasi false positive rate untuk jumlah item saat ini"""
+        if self.count == 0:
+            return 0.0
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class CodeFilter:
+    """
+    Set probabilistik berisi semua kode aktif di tabel short_links
+
+    Jika kode tidak ada di filter, link pasti tidak ada dan redirect bisa
+    langsung dijawab 404 tanpa query ke SQLite. Filter dibangun sekali saat
+    startup, ditambah saat link dibuat, dan secara berkala mengambil link
+    baru yang dibuat proses lain (berdasarkan id terakhir).
+    """
+
+    def __init__(self, fp_rate: float = 0.01, min_capacity: int = 100000,
+                 sync_interval: float = 5.0):
+        """
+        Initialize code filter
+
+        Args:
+            fp_rate: Target false positive rate
+            min_capacity: Kapasitas minimal bloom filter
+            sync_interval: Interval (detik) cek link baru dari proses lain
+        """
+        self.fp_rate = fp_rate
+        self.min_capacity = min_capacity
+        self.sync_interval = sync_interval
+        self._bloom: Optional[BloomFilter] = None
+        self._last_id = 0
+        self._last_sync = 0.0
+        self._lock = threading.Lock()
+        # Dipegang saat load/sync dari database
+        self.maintenance_lock = threading.Lock()
+
+        # Counters
+        self.checks = 0
+        self.rejects = 0
+        self.rebuilds = 0
+
+    @classmethod
+    def for_database(cls, db_path: str, **kwargs) -> 'CodeFilter':
+        """Get code filter bersama untuk satu file database"""
+        return shared_for_database('code_filter', db_path, lambda: cls(**kwargs))
+
+    @property
+    def loaded(self) -> bool:
+        """True jika filter sudah dibangun"""
+        return self._bloom is not None
+
+    def rebuild(self, total: int, rows: Iterable[Tuple[int, str, Optional[str]]],
+                last_id: Optional[int] = None):
+        """
+        Bangun ulang filter dari database
+
+        Args:
+            total: Perkiraan jumlah link (untuk ukuran filter)
+            rows: Iterable (id, short_code, custom_alias) semua link aktif
+            last_id: MAX(id) yang dibaca sebelum scan dimulai. Link dengan id
+                lebih besar (dibuat selama scan, termasuk yang di-add ke
+                filter lama) diambil oleh sync() setelah rebuild.
+        """
+        bloom = BloomFilter(max(self.min_capacity, total * 2), self.fp_rate)
+        max_seen = 0
+        for link_id, short_code, custom_alias in rows:
+            bloom.add(short_code)
+            if custom_alias and custom_alias != short_code:
+                bloom.add(custom_alias)
+            max_seen = max(max_seen, link_id)
+
+        with self._lock:
+            self._bloom = bloom
+            self._last_id = max_seen if last_id is None else last_id
+            self._last_sync = time.monotonic()
+            self.rebuilds += 1
+
+    def add(self, code: str, link_id: Optional[int] = None):
+        """
+        Tambahkan kode baru ke filter
+
+        link_id tidak memajukan posisi sync: link proses lain dengan id lebih
+        kecil yang belum di-sync tidak boleh terlewat. Posisi sync hanya
+        dimajukan oleh sync().
+        """
+        with self._lock:
+            if self._bloom is None:
+                return
+            self._bloom.add(code)
+
+    def needs_sync(self) -> bool:
+        """True jika sudah waktunya cek link baru dari proses lain"""
+        return time.monotonic() - self._last_sync >= self.sync_interval
+
+    def needs_rebuild(self) -> bool:
+        """True jika jumlah item sudah melewati kapasitas filter"""
+        bloom = self._bloom
+        return bloom is not None and bloom.count > bloom.capacity
+
+    def sync(self, fetch_since: Callable[[int], Iterable[Tuple[int, str, Optional[str]]]]):
+        """
+        Tambahkan link yang dibuat setelah sync terakhir
+
+        Args:
+            fetch_since: Fungsi (last_id) -> iterable (id, short_code, custom_alias)
+        """
+        with self._lock:
+            last_id = self._last_id
+            self._last_sync = time.monotonic()
+
+        max_id = last_id
+        for link_id, short_code, custom_alias in fetch_since(last_id):
+            self.add(short_code, link_id)
+            if custom_alias and custom_alias != short_code:
+                self.add(custom_alias, link_id)
+            max_id = max(max_id, link_id)
+
+        with self._lock:
+            # Rebuild yang terjadi selama fetch sudah menentukan posisinya sendiri
+            if self._last_id == last_id:
+                self._last_id = max_id
+
+    def might_exist(self, code: str) -> bool:
+        """
+        Cek apakah kode mungkin ada
+
+        Returns:
+            False jika kode pasti tidak ada. True jika mungkin ada atau
+            filter belum dibangun.
+        """
+        bloom = self._bloom
+        self.checks += 1
+        if bloom is None or code in bloom:
+            return True
+        self.rejects += 1
+        return False
+
+    def stats(self) -> Dict:
+        """Get statistik filter (memory & false positive rate)"""
+        bloom = self._bloom
+        if bloom is None:
+            return {'loaded': False, 'checks': self.checks, 'rejects': self.rejects}
+
+        return {
+            'loaded': True,
+            'items': bloom.count,
+            'capacity': bloom.capacity,
+            'bits': bloom.num_bits,
+            'hashes': bloom.num_hashes,
+            'memory_bytes': bloom.memory_bytes,
+            'target_fp_rate': bloom.fp_rate,
+            'estimated_fp_rate': round(bloom.estimated_fp_rate(), 6),
+            'checks': self.checks,
+            'rejects': self.rejects,
+            'rebuilds': self.rebuilds,
+            'last_id': self._last_id
+        }
@@ -0,0 +1,303 @@
+"""
+In-process cache untuk lookup short link
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Sentinel untuk membedakan "tidak ada di cache" dengan value None
+MISSING = object()
+
+_registry: Dict[Tuple[str, str], Any] = {}
+_registry_lock = threading.Lock()
+
+
+def shared_for_database(kind: str, db_path: str, factory: Callable[[], Any]) -> Any:
+    """
+    Get object bersama (cache, filter, dll) untuk satu file database
+
+    Semua DatabaseManager yang menunjuk ke file yang sama memakai object
+    yang sama, jadi perubahan dari bot langsung terlihat di web server.
+
+    Args:
+        kind: Nama jenis object (mis. 'link_cache')
+        db_path: Path ke database SQLite
+        factory: Fungsi untuk membuat object jika belum ada
+    """
+    key = (kind, os.path.abspath(db_path))
+    with _registry_lock:
+        obj = _registry.get(key)
+        if obj is None:
+            obj = factory()
+            _registry[key] = obj
+        return obj
+
+
+def _reset_registry_after_fork():
+    """
+    Proses child hasil fork mulai dengan registry kosong
+
+    Cache, pool dan queue tidak dibagi antar proses: setiap worker membuat
+    object sendiri saat DatabaseManager pertama dibuat di proses itu.
+    """
+    global _registry_lock
+    _registry.clear()
+    _registry_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_registry_after_fork)
+
+
+class LinkCache:
+    """
+    Cache read-through LRU + TTL untuk hasil lookup link
+
+    Key adalah tuple (domain, code); untuk redirect, domain adalah host
+    request dan value adalah hasil resolusi host-atau-default. Thread-safe, dipakai bersama oleh
+    Flask threads dan handler bot di proses yang sama.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0):
+        """
+        Initialize cache
+
+        Args:
+            max_size: Jumlah maksimal entry (LRU eviction jika penuh)
+            ttl: Umur maksimal entry dalam detik
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: 'OrderedDict[Tuple[str, str], Tuple[float, Any]]' = OrderedDict()
+        # code -> set domain yang ada di cache (untuk invalidate_code)
+        self._domains_by_code: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        # Naik setiap invalidation, supaya load yang berjalan bersamaan
+        # dengan invalidation tidak menyimpan data basi
+        self._generation = 0
+        # short_links.change_seq terakhir yang sudah di-invalidate (None = belum sync)
+        self.change_seq: Optional[int] = None
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @classmethod
+    def for_database(cls, db_path: str, max_size: int = 10000, ttl: float = 60.0) -> 'LinkCache':
+        """Get cache bersama untuk satu file database"""
+        return shared_for_database('link_cache', db_path, lambda: cls(max_size=max_size, ttl=ttl))
+
+    def get(self, domain: str, code: str) -> Any:
+        """
+        Ambil entry dari cache
+
+        Returns:
+            Value yang tersimpan atau MISSING
+        """
+        key = (domain, code)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+
+            expires_at, value = entry
+            if expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, domain: str, code: str, value: Any, generation: Optional[int] = None):
+        """
+        Simpan entry ke cache
+
+        Args:
+            generation: Generation saat value dibaca dari database. Jika ada
+                invalidation sejak itu, value tidak disimpan (dicek di bawah
+                lock yang sama dengan invalidate).
+        """
+        if self.max_size <= 0:
+            return
+
+        key = (domain, code)
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            self._domains_by_code.setdefault(code, set()).add(domain)
+            while len(self._data) > self.max_size:
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def _remove(self, key: Tuple[str, str]) -> bool:
+        """Hapus entry beserta index per kode (lock harus dipegang)"""
+        if self._data.pop(key, None) is None:
+            return False
+        domain, code = key
+        domains = self._domains_by_code.get(code)
+        if domains is not None:
+            domains.discard(domain)
+            if not domains:
+                del self._domains_by_code[code]
+        return True
+
+    def get_or_load(self, domain: str, code: str, loader: Callable[[str, str], Optional[Dict]]) -> Optional[Dict]:
+        """
+        Read-through lookup
+
+        Args:
+            domain: Domain
+            code: Short code atau custom alias
+            loader: Fungsi (code, domain) -> link atau None
+
+        Returns:
+            Link dict atau None. Hasil None tidak di-cache.
+        """
+        value = self.get(domain, code)
+        if value is not MISSING:
+            return value
+
+        with self._lock:
+            generation = self._generation
+        value = loader(code, domain)
+        if value is not None:
+            self.set(domain, code, value, generation)
+        return value
+
+    def invalidate(self, domain: str, code: str):
+        """Hapus satu entry dari cache"""
+        with self._lock:
+            self._generation += 1
+            if self._remove((domain, code)):
+                self.invalidations += 1
+
+    def invalidate_code(self, code: str):
+        """
+        Hapus semua entry untuk kode ini di semua domain
+
+        Dipakai untuk link di domain default, yang bisa di-cache di bawah
+        host mana saja.
+        """
+        with self._lock:
+            self._generation += 1
+            for domain in list(self._domains_by_code.get(code, ())):
+                if self._remove((domain, code)):
+                    self.invalidations += 1
+
+    def clear(self):
+        """Kosongkan cache"""
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+            self._domains_by_code.clear()
+
+    def stats(self) -> Dict:
+        """Get statistik cache"""
+        with self._lock:
+            size = len(self._data)
+        lookups = self.hits + self.misses
+        return {
+            'size': size,
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations
+        }
+
+
+class NegativeCache:
+    """
+    Cache TTL pendek untuk kode yang sudah pasti tidak ada
+
+    Dipakai untuk kode yang lolos bloom filter (false positive atau link
+    yang sudah dihapus) tapi tidak ditemukan di database.
+    """
+
+    def __init__(self, max_size: int = 50000, ttl: float = 30.0):
+        """
+        Initialize negative cache
+
+        Args:
+            max_size: Jumlah maksimal kode yang disimpan
+            ttl: Umur entry dalam detik
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        # code -> {host: expires_at}
+        self._data: 'OrderedDict[str, Dict[str, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_database(cls, db_path: str, max_size: int = 50000, ttl: float = 30.0) -> 'NegativeCache':
+        """Get negative cache bersama untuk satu file database"""
+        return shared_for_database('negative_cache', db_path, lambda: cls(max_size=max_size, ttl=ttl))
+
+    def contains(self, host: str, code: str) -> bool:
+        """Cek apakah (host, code) baru saja dipastikan tidak ada"""
+        now = time.monotonic()
+        with self._lock:
+            hosts = self._data.get(code)
+            expires_at = hosts.get(host) if hosts else None
+            if expires_at is None or expires_at <= now:
+                self.misses += 1
+                return False
+            self.hits += 1
+            return True
+
+    def add(self, host: str, code: str):
+        """Tandai (host, code) sebagai tidak ada"""
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            hosts = self._data.get(code)
+            if hosts is None:
+                hosts = {}
+                self._data[code] = hosts
+            hosts[host] = expires_at
+            self._data.move_to_end(code)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate_code(self, code: str):
+        """Hapus semua entry untuk kode ini (dipanggil saat link dibuat)"""
+        with self._lock:
+            self._data.pop(code, None)
+
+    def clear(self):
+        """Kosongkan cache"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict:
+        """Get statistik negative cache"""
+        with self._lock:
+            size = len(self._data)
+        return {
+            'size': size,
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses
+        }
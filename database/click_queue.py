@@ -0,0 +1,271 @@
+"""
+Write-behind queue untuk click tracking
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+import weakref
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from .cache import shared_for_database
+
+
+class ClickEvent(NamedTuple):
+    """Satu klik pada short link"""
+    link_id: int
+    short_code: str
+    clicked_at: str
+    ip_address: Optional[str]
+    user_agent: Optional[str]
+    referer: Optional[str]
+
+
+# Semua queue di proses ini (untuk reset setelah fork)
+_queues: 'weakref.WeakSet[ClickQueue]' = weakref.WeakSet()
+
+
+def _reset_queues_after_fork():
+    """Event yang sudah ada milik proses parent (parent yang menulisnya)"""
+    for click_queue in list(_queues):
+        click_queue._reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_queues_after_fork)
+
+
+class ClickQueue:
+    """
+    Queue in-memory untuk klik, ditulis ke database oleh background thread
+
+    Redirect cukup memasukkan event ke queue. Flusher menggabungkan
+    increment counter per link dan menulis click_logs dalam satu transaksi
+    per interval atau per batch.
+    """
+
+    def __init__(self, writer: Callable[[List[ClickEvent]], None], max_size: int = 10000,
+                 batch_size: int = 500, flush_interval: float = 1.0, max_retries: int = 10):
+        """
+        Initialize click queue
+
+        Args:
+            writer: Fungsi untuk menulis satu batch event ke database
+            max_size: Kedalaman maksimal queue
+            batch_size: Jumlah event maksimal per transaksi
+            flush_interval: Interval maksimal antar flush (detik)
+            max_retries: Jumlah percobaan satu batch sebelum event ditulis
+                satu per satu dan event yang tetap gagal dibuang
+        """
+        self.writer = writer
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_retries = max(1, max_retries)
+        self._queue: 'queue.Queue[ClickEvent]' = queue.Queue(maxsize=max_size)
+        self._pending: List[ClickEvent] = []
+        # Jumlah percobaan yang gagal untuk batch pending saat ini
+        self._attempts = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._atexit_registered = False
+
+        # Counters
+        self.enqueued = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.batches = 0
+        self.errors = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+
+        _queues.add(self)
+
+    @classmethod
+    def for_database(cls, db_path: str, **kwargs) -> 'ClickQueue':
+        """Get click queue bersama untuk satu file database"""
+        return shared_for_database('click_queue', db_path, lambda: cls(**kwargs))
+
+    @property
+    def depth(self) -> int:
+        """Jumlah event yang belum ditulis"""
+        return self._queue.qsize() + len(self._pending)
+
+    def start(self):
+        """Start background flusher (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='click-flusher', daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.stop)
+                self._atexit_registered = True
+
+    def put(self, event: ClickEvent) -> bool:
+        """
+        Masukkan event ke queue
+
+        Returns:
+            False jika queue penuh (caller harus menulis langsung)
+        """
+        self.start()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.rejected += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    def _run(self):
+        """Loop background flusher"""
+        while not self._stop.is_set():
+            self._collect(self.flush_interval)
+            if self._pending and not self.flush_pending():
+                # Tunggu sebentar sebelum retry (mis. database is locked)
+                self._stop.wait(min(self.flush_interval, 1.0))
+
+    def _collect(self, timeout: float):
+        """Ambil event dari queue sampai batch penuh atau timeout"""
+        deadline = time.monotonic() + timeout
+        room = self.batch_size - len(self._pending)
+        events = []
+        while len(events) < room:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                events.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        if events:
+            with self._flush_lock:
+                self._pending.extend(events)
+
+    def _drain(self):
+        """Ambil event yang tersisa tanpa menunggu (maksimal satu batch)"""
+        with self._flush_lock:
+            while len(self._pending) < self.batch_size:
+                try:
+                    self._pending.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+    def flush_pending(self) -> bool:
+        """
+        Tulis batch yang sedang pending ke database
+
+        Returns:
+            True jika batch sudah selesai. Jika gagal, batch disimpan untuk
+            dicoba lagi (False); setelah max_retries kali gagal, batch
+            dilepas lewat _give_up() supaya queue tetap bisa dikosongkan.
+        """
+        with self._flush_lock:
+            if not self._pending:
+                return True
+
+            batch = self._pending
+            started = time.perf_counter()
+            try:
+                self.writer(batch)
+            except Exception as e:
+                self.errors += 1
+                self._attempts += 1
+                print(f"❌ Click flush error ({len(batch)} events, attempt {self._attempts}/{self.max_retries}): {e}")
+                if self._attempts < self.max_retries:
+                    return False
+                self._give_up(batch)
+                self._pending = []
+                self._attempts = 0
+                return True
+
+            self._pending = []
+            self._attempts = 0
+            self.flushed += len(batch)
+            self.batches += 1
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 3)
+            return True
+
+    def _give_up(self, batch: List[ClickEvent]):
+        """
+        Tulis batch yang terus gagal satu event per transaksi
+
+        Event yang membuat batch gagal (mis. constraint) tidak ikut menahan
+        event lain. Event yang tetap gagal dicatat lalu dibuang (lock flush
+        harus dipegang).
+        """
+        dropped: Dict[str, int] = {}
+        for event in batch:
+            try:
+                self.writer([event])
+            except Exception:
+                dropped[event.short_code] = dropped.get(event.short_code, 0) + 1
+                continue
+            self.flushed += 1
+
+        if dropped:
+            total = sum(dropped.values())
+            self.dropped += total
+            summary = ', '.join(f"{code} x{count}" for code, count in dropped.items())
+            print(f"⚠️  Dropped {total} click events after {self.max_retries} failed flushes: {summary}")
+
+    def flush(self, retries: int = 3):
+        """
+        Tulis semua event di queue sekarang (blocking)
+
+        Args:
+            retries: Jumlah percobaan ulang jika penulisan gagal
+        """
+        failures = 0
+        while True:
+            self._drain()
+            if not self._pending:
+                return
+            if not self.flush_pending():
+                failures += 1
+                if failures > retries:
+                    print(f"⚠️  {self.depth} click events not written")
+                    return
+                time.sleep(0.5)
+
+    def stop(self, timeout: float = 10.0):
+        """Stop flusher dan tulis semua event yang tersisa"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+        self.flush()
+
+    def _reset_after_fork(self):
+        """Queue kosong tanpa flusher di proses child"""
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._pending = []
+        self._attempts = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def stats(self) -> Dict:
+        """Get statistik queue"""
+        return {
+            'depth': self.depth,
+            'max_size': self._queue.maxsize,
+            'batch_size': self.batch_size,
+            'flush_interval': self.flush_interval,
+            'enqueued': self.enqueued,
+            'rejected': self.rejected,
+            'flushed': self.flushed,
+            'batches': self.batches,
+            'errors': self.errors,
+            'dropped': self.dropped,
+            'last_flush_ms': self.last_flush_ms
+        }
@@ -0,0 +1,323 @@
+"""
+Alokasi short code tanpa lookup ke database
+
+Setiap link baru mengambil nilai berikutnya dari counter di table
+code_sequence, lalu nilai itu diacak dengan permutasi Feistel ber-key menjadi kode base62. Karena
+permutasi bersifat bijektif, dua nilai counter tidak pernah menghasilkan
+kode yang sama, jadi tidak perlu cek "apakah kode sudah dipakai".
+
+Key dibuat acak sekali per database (saat migrasi) sehingga urutan kode
+tidak bisa ditebak dari kode sebelumnya. Jika semua kode untuk satu
+panjang sudah terpakai, counter pindah ke panjang berikutnya.
+
+Setiap proses me-lease satu block nilai counter sekaligus (satu transaksi
+per block) lalu membagikan kode dari memory. Sisa block dikembalikan ke
+code_free_ranges saat proses berhenti dan dipakai ulang oleh lease
+berikutnya.
+"""
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+import weakref
+from typing import Callable, ContextManager, Dict, List, NamedTuple, Optional, Tuple
+
+from .cache import shared_for_database
+
+BASE62 = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+SEQUENCE_NAME = 'short_code'
+FEISTEL_ROUNDS = 6
+
+SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS code_sequence (
+        name TEXT PRIMARY KEY,
+        length INTEGER NOT NULL,
+        next_value INTEGER NOT NULL DEFAULT 0,
+        key TEXT NOT NULL
+    ) WITHOUT ROWID
+    ''',
+    f'''
+    INSERT OR IGNORE INTO code_sequence (name, length, next_value, key)
+    VALUES ('{SEQUENCE_NAME}', 6, 0, lower(hex(randomblob(16))))
+    ''',
+)
+
+# Range nilai counter yang sudah di-lease tapi tidak terpakai
+FREE_RANGES_SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS code_free_ranges (
+        id INTEGER PRIMARY KEY,
+        length INTEGER NOT NULL,
+        start_value INTEGER NOT NULL,
+        end_value INTEGER NOT NULL
+    )
+    ''',
+)
+
+# Semua allocator di proses ini (untuk reset setelah fork)
+_allocators: 'weakref.WeakSet[CodeAllocator]' = weakref.WeakSet()
+
+
+def _reset_allocators_after_fork():
+    """Block milik parent tidak boleh dipakai child (kode akan dobel)"""
+    for allocator in list(_allocators):
+        allocator._reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_allocators_after_fork)
+
+
+class CodeBlock(NamedTuple):
+    """Range nilai counter [start, end) milik proses ini"""
+    key: str
+    length: int
+    start: int
+    end: int
+
+
+class CodePermutation:
+    """
+    Permutasi ber-key dari [0, 62^length) ke kode base62 sepanjang length
+
+    Feistel network di atas 2k bit (2^2k >= 62^length) dengan cycle-walking:
+    hasil di luar range diacak lagi sampai masuk range. Rata-rata kurang
+    dari 2 putaran.
+    """
+
+    def __init__(self, key: bytes, length: int):
+        """
+        Args:
+            key: Secret key (maks 64 byte)
+            length: Panjang kode
+        """
+        self.key = key
+        self.length = length
+        self.size = 62 ** length
+        bits = (self.size - 1).bit_length()
+        self.half_bits = (bits + 1) // 2
+        self.half_mask = (1 << self.half_bits) - 1
+        # State hash ber-key per round disiapkan sekali, lalu di-copy per call
+        self._hashers = [
+            hashlib.blake2b(key=key, digest_size=8, person=b'shortcode%02d%02d' % (length, i))
+            for i in range(FEISTEL_ROUNDS)
+        ]
+
+    def _round(self, index: int, value: int) -> int:
+        hasher = self._hashers[index].copy()
+        hasher.update(value.to_bytes(8, 'big'))
+        return int.from_bytes(hasher.digest(), 'big') & self.half_mask
+
+    def _forward(self, value: int) -> int:
+        left, right = value >> self.half_bits, value & self.half_mask
+        for i in range(FEISTEL_ROUNDS):
+            left, right = right, left ^ self._round(i, right)
+        return (left << self.half_bits) | right
+
+    def _backward(self, value: int) -> int:
+        left, right = value >> self.half_bits, value & self.half_mask
+        for i in reversed(range(FEISTEL_ROUNDS)):
+            left, right = right ^ self._round(i, left), left
+        return (left << self.half_bits) | right
+
+    def permute(self, value: int) -> int:
+        if not 0 <= value < self.size:
+            raise ValueError(f'Value di luar range untuk panjang {self.length}: {value}')
+        value = self._forward(value)
+        while value >= self.size:
+            value = self._forward(value)
+        return value
+
+    def unpermute(self, value: int) -> int:
+        value = self._backward(value)
+        while value >= self.size:
+            value = self._backward(value)
+        return value
+
+    def encode(self, value: int) -> str:
+        """Nilai counter -> short code"""
+        permuted = self.permute(value)
+        chars = []
+        for _ in range(self.length):
+            permuted, rem = divmod(permuted, 62)
+            chars.append(BASE62[rem])
+        return ''.join(reversed(chars))
+
+    def decode(self, code: str) -> int:
+        """Short code -> nilai counter (kebalikan encode)"""
+        if len(code) != self.length:
+            raise ValueError(f'Panjang kode harus {self.length}: {code}')
+        value = 0
+        for char in code:
+            value = value * 62 + BASE62.index(char)
+        return self.unpermute(value)
+
+
+class CodeAllocator:
+    """Bagikan short code dari block nilai counter yang di-lease per proses"""
+
+    def __init__(self, connect: Callable[[], ContextManager[sqlite3.Connection]],
+                 min_length: int = 6, block_size: int = 100):
+        """
+        Args:
+            connect: Context manager untuk pinjam koneksi (ConnectionPool.connection)
+            min_length: Panjang kode minimal (counter dinaikkan ke panjang ini)
+            block_size: Jumlah nilai counter per lease
+        """
+        self.connect = connect
+        self.min_length = min_length
+        self.block_size = max(1, block_size)
+        self._permutations: Dict[Tuple[str, int], CodePermutation] = {}
+        self._block: Optional[CodeBlock] = None
+        self._next = 0
+        self._lock = threading.Lock()
+        self._atexit_registered = False
+
+        # Counters
+        self.allocated = 0
+        self.leases = 0
+        self.reused_ranges = 0
+        self.returned = 0
+        self.length_upgrades = 0
+
+        _allocators.add(self)
+
+    @classmethod
+    def for_database(cls, db_path: str, **kwargs) -> 'CodeAllocator':
+        """Get allocator bersama untuk satu file database"""
+        return shared_for_database('code_allocator', db_path, lambda: cls(**kwargs))
+
+    def permutation(self, key: str, length: int) -> CodePermutation:
+        permutation = self._permutations.get((key, length))
+        if permutation is None:
+            permutation = CodePermutation(bytes.fromhex(key), length)
+            self._permutations[(key, length)] = permutation
+        return permutation
+
+    def reserve(self, conn: sqlite3.Connection, count: int = 1) -> Tuple[str, int, int]:
+        """
+        Naikkan counter sebanyak count (dalam transaksi caller)
+
+        UPDATE ini mengambil write lock SQLite, jadi proses lain yang
+        mengalokasikan bersamaan menunggu dan mendapat range berikutnya.
+
+        Returns:
+            Tuple (key, length, start): nilai start .. start+count-1 milik caller
+        """
+        key, length, end = conn.execute(f'''
+            UPDATE code_sequence
+            SET length = MAX(length, ?), next_value = CASE WHEN length < ? THEN ? ELSE next_value + ? END
+            WHERE name = '{SEQUENCE_NAME}'
+            RETURNING key, length, next_value
+        ''', (self.min_length, self.min_length, count, count)).fetchone()
+
+        if end > 62 ** length:
+            # Panjang ini habis: pakai panjang berikutnya dari awal
+            length += 1
+            end = count
+            conn.execute(f'''
+                UPDATE code_sequence SET length = ?, next_value = ? WHERE name = '{SEQUENCE_NAME}'
+            ''', (length, end))
+            self.length_upgrades += 1
+
+        return key, length, end - count
+
+    def _lease(self, size: int) -> CodeBlock:
+        """
+        Ambil block baru dalam transaksi sendiri (bukan transaksi INSERT link)
+
+        Range yang dikembalikan proses lain dipakai dulu; jika tidak ada,
+        counter dinaikkan sebanyak size.
+        """
+        with self.connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                key = conn.execute(
+                    f"SELECT key FROM code_sequence WHERE name = '{SEQUENCE_NAME}'"
+                ).fetchone()[0]
+                free = conn.execute('''
+                    DELETE FROM code_free_ranges
+                    WHERE id = (SELECT MIN(id) FROM code_free_ranges)
+                    RETURNING length, start_value, end_value
+                ''').fetchone()
+                if free:
+                    block = CodeBlock(key, *free)
+                    self.reused_ranges += 1
+                else:
+                    key, length, start = self.reserve(conn, size)
+                    block = CodeBlock(key, length, start, start + size)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        self.leases += 1
+        if not self._atexit_registered:
+            atexit.register(self.release)
+            self._atexit_registered = True
+        return block
+
+    def next_code(self) -> str:
+        """Ambil satu short code baru (query hanya saat block habis)"""
+        return self.next_codes(1)[0]
+
+    def next_codes(self, count: int) -> List[str]:
+        """
+        Ambil beberapa short code sekaligus
+
+        Jika block saat ini kurang, block baru di-lease sebesar sisa
+        kebutuhan (minimal block_size), jadi batch besar tetap hanya
+        butuh satu atau dua transaksi lease.
+        """
+        values = []
+        with self._lock:
+            while len(values) < count:
+                if self._block is None or self._next >= self._block.end:
+                    self._block = self._lease(max(self.block_size, count - len(values)))
+                    self._next = self._block.start
+                block = self._block
+                stop = min(block.end, self._next + count - len(values))
+                values.extend((block.key, block.length, value) for value in range(self._next, stop))
+                self._next = stop
+            self.allocated += count
+        return [self.permutation(key, length).encode(value) for key, length, value in values]
+
+    def release(self):
+        """Kembalikan sisa block ke database (dipanggil saat shutdown)"""
+        with self._lock:
+            block, start = self._block, self._next
+            self._block = None
+        if block is None or start >= block.end:
+            return
+        try:
+            with self.connect() as conn:
+                conn.execute(
+                    'INSERT INTO code_free_ranges (length, start_value, end_value) VALUES (?, ?, ?)',
+                    (block.length, start, block.end)
+                )
+                conn.commit()
+            self.returned += block.end - start
+        except sqlite3.Error as e:
+            print(f"⚠️  Could not return unused short codes ({block.end - start}): {e}")
+
+    def _reset_after_fork(self):
+        """Block parent ditinggalkan; child me-lease block sendiri"""
+        self._block = None
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def stats(self) -> Dict:
+        """Get statistik allocator"""
+        block = self._block
+        return {
+            'min_length': self.min_length,
+            'block_size': self.block_size,
+            'allocated': self.allocated,
+            'leases': self.leases,
+            'reused_ranges': self.reused_ranges,
+            'returned': self.returned,
+            'remaining_in_block': block.end - self._next if block else 0,
+            'length_upgrades': self.length_upgrades
+        }
@@ -0,0 +1,248 @@
+"""
+Counter global (materialized) untuk statistik
+
+Total link, klik, user dan domain disimpan di table stats_counters dan
+dijaga oleh trigger SQLite, sehingga get_stats() dan total admin tidak
+perlu scan seluruh short_links. Per-user (jumlah link & klik aktif)
+disimpan di user_link_counts.
+
+Usage:
+    python -m database counters --check       # bandingkan counter dengan data asli
+    python -m database counters --reconcile   # bangun ulang counter dari awal
+"""
+import argparse
+import os
+import sqlite3
+import sys
+from typing import Dict, List, Optional
+
+COUNTER_NAMES = ('links', 'clicks', 'users', 'domains')
+
+SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS stats_counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS user_link_counts (
+        user_id TEXT PRIMARY KEY,
+        links INTEGER NOT NULL DEFAULT 0,
+        clicks INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_user_link_counts_links ON user_link_counts(links)',
+)
+
+TRIGGERS = (
+    # Link baru
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_short_links_insert
+    AFTER INSERT ON short_links
+    WHEN NEW.is_active = 1
+    BEGIN
+        UPDATE stats_counters SET value = value + 1 WHERE name = 'links';
+        UPDATE stats_counters SET value = value + COALESCE(NEW.clicks, 0) WHERE name = 'clicks';
+        INSERT INTO user_link_counts (user_id, links, clicks)
+        SELECT NEW.created_by, 1, COALESCE(NEW.clicks, 0) WHERE NEW.created_by IS NOT NULL
+        ON CONFLICT(user_id) DO UPDATE SET
+            links = links + 1,
+            clicks = clicks + excluded.clicks;
+    END
+    ''',
+    # Flush klik (jalur paling sering): hanya selisih klik
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_short_links_clicks
+    AFTER UPDATE OF clicks ON short_links
+    WHEN NEW.is_active = 1 AND OLD.is_active = 1
+        AND OLD.created_by IS NEW.created_by
+        AND OLD.clicks IS NOT NEW.clicks
+    BEGIN
+        UPDATE stats_counters
+        SET value = value + COALESCE(NEW.clicks, 0) - COALESCE(OLD.clicks, 0)
+        WHERE name = 'clicks';
+        UPDATE user_link_counts
+        SET clicks = clicks + COALESCE(NEW.clicks, 0) - COALESCE(OLD.clicks, 0)
+        WHERE user_id = NEW.created_by;
+    END
+    ''',
+    # Aktif/nonaktif atau pindah pemilik: kurangi nilai lama, tambah nilai baru
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_short_links_update
+    AFTER UPDATE ON short_links
+    WHEN OLD.is_active IS NOT NEW.is_active OR OLD.created_by IS NOT NEW.created_by
+    BEGIN
+        UPDATE stats_counters
+        SET value = value + (NEW.is_active = 1) - (OLD.is_active = 1)
+        WHERE name = 'links';
+        UPDATE stats_counters
+        SET value = value
+            + CASE WHEN NEW.is_active = 1 THEN COALESCE(NEW.clicks, 0) ELSE 0 END
+            - CASE WHEN OLD.is_active = 1 THEN COALESCE(OLD.clicks, 0) ELSE 0 END
+        WHERE name = 'clicks';
+        UPDATE user_link_counts
+        SET links = links - 1, clicks = clicks - COALESCE(OLD.clicks, 0)
+        WHERE OLD.is_active = 1 AND user_id = OLD.created_by;
+        INSERT INTO user_link_counts (user_id, links, clicks)
+        SELECT NEW.created_by, 1, COALESCE(NEW.clicks, 0)
+        WHERE NEW.is_active = 1 AND NEW.created_by IS NOT NULL
+        ON CONFLICT(user_id) DO UPDATE SET
+            links = links + 1,
+            clicks = clicks + excluded.clicks;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_short_links_delete
+    AFTER DELETE ON short_links
+    WHEN OLD.is_active = 1
+    BEGIN
+        UPDATE stats_counters SET value = value - 1 WHERE name = 'links';
+        UPDATE stats_counters SET value = value - COALESCE(OLD.clicks, 0) WHERE name = 'clicks';
+        UPDATE user_link_counts
+        SET links = links - 1, clicks = clicks - COALESCE(OLD.clicks, 0)
+        WHERE user_id = OLD.created_by;
+    END
+    ''',
+    # Jumlah user = user dengan minimal satu link aktif
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_user_link_counts_insert
+    AFTER INSERT ON user_link_counts
+    WHEN NEW.links > 0
+    BEGIN
+        UPDATE stats_counters SET value = value + 1 WHERE name = 'users';
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_user_link_counts_update
+    AFTER UPDATE OF links ON user_link_counts
+    WHEN (OLD.links > 0) != (NEW.links > 0)
+    BEGIN
+        UPDATE stats_counters
+        SET value = value + (NEW.links > 0) - (OLD.links > 0)
+        WHERE name = 'users';
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_custom_domains_insert
+    AFTER INSERT ON custom_domains
+    BEGIN
+        UPDATE stats_counters SET value = value + 1 WHERE name = 'domains';
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_custom_domains_delete
+    AFTER DELETE ON custom_domains
+    BEGIN
+        UPDATE stats_counters SET value = value - 1 WHERE name = 'domains';
+    END
+    ''',
+)
+
+# Hitung ulang semua counter dari data asli (dalam satu transaksi)
+RECONCILE = (
+    'DELETE FROM user_link_counts',
+    'DELETE FROM stats_counters',
+    '''
+    INSERT INTO user_link_counts (user_id, links, clicks)
+    SELECT created_by, COUNT(*), COALESCE(SUM(clicks), 0)
+    FROM short_links
+    WHERE is_active = 1 AND created_by IS NOT NULL
+    GROUP BY created_by
+    ''',
+    # stats_counters sudah kosong, jadi trigger user_link_counts di atas
+    # tidak mengubah apa-apa; semua counter diisi di sini
+    '''
+    INSERT OR REPLACE INTO stats_counters (name, value)
+    SELECT 'links', COUNT(*) FROM short_links WHERE is_active = 1
+    UNION ALL
+    SELECT 'clicks', COALESCE(SUM(clicks), 0) FROM short_links WHERE is_active = 1
+    UNION ALL
+    SELECT 'users', COUNT(*) FROM user_link_counts WHERE links > 0
+    UNION ALL
+    SELECT 'domains', COUNT(*) FROM custom_domains
+    ''',
+)
+
+# Nilai sebenarnya, untuk --check
+ACTUAL_QUERIES = {
+    'links': 'SELECT COUNT(*) FROM short_links WHERE is_active = 1',
+    'clicks': 'SELECT COALESCE(SUM(clicks), 0) FROM short_links WHERE is_active = 1',
+    'users': 'SELECT COUNT(DISTINCT created_by) FROM short_links WHERE is_active = 1',
+    'domains': 'SELECT COUNT(*) FROM custom_domains',
+}
+
+
+def read_counters(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Baca semua counter (0 untuk counter yang belum ada)"""
+    values = dict.fromkeys(COUNTER_NAMES, 0)
+    values.update(conn.execute('SELECT name, value FROM stats_counters').fetchall())
+    return values
+
+
+def reconcile(conn: sqlite3.Connection) -> Dict[str, Dict[str, int]]:
+    """
+    Bangun ulang stats_counters dan user_link_counts dari short_links
+
+    Returns:
+        Dict {'before': {...}, 'after': {...}}
+    """
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        before = read_counters(conn)
+        for statement in RECONCILE:
+            conn.execute(statement)
+        after = read_counters(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return {'before': before, 'after': after}
+
+
+def check(conn: sqlite3.Connection) -> Dict[str, Dict[str, int]]:
+    """
+    Bandingkan counter dengan hasil agregasi penuh (scan seluruh table)
+
+    Returns:
+        Dict {name: {'counter': x, 'actual': y}}
+    """
+    counters = read_counters(conn)
+    return {
+        name: {'counter': counters[name], 'actual': conn.execute(sql).fetchone()[0]}
+        for name, sql in ACTUAL_QUERIES.items()
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """CLI untuk cek / reconcile counter"""
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from config.config import Config
+
+    parser = argparse.ArgumentParser(prog='python -m database counters', description='Cek atau bangun ulang counter statistik')
+    parser.add_argument('--db', default=Config.DATABASE_PATH, help='Path ke database SQLite')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--check', action='store_true', help='Bandingkan counter dengan data asli')
+    group.add_argument('--reconcile', action='store_true', help='Bangun ulang counter dari awal')
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db, timeout=Config.DB_BUSY_TIMEOUT / 1000)
+    try:
+        if args.check:
+            drift = False
+            for name, values in check(conn).items():
+                mark = '✅' if values['counter'] == values['actual'] else '❌'
+                drift = drift or values['counter'] != values['actual']
+                print(f"{mark} {name}: counter={values['counter']} actual={values['actual']}")
+            if drift:
+                sys.exit(1)
+        else:
+            result = reconcile(conn)
+            for name in COUNTER_NAMES:
+                print(f"✅ {name}: {result['before'][name]} -> {result['after'][name]}")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,101 +1,239 @@
 """
 Database Manager untuk Short Link System
 """
+import functools
+import json
+import re
 import sqlite3
-import random
-import string
 from datetime import datetime
 from typing import Optional, Dict, List
 import os
+from config.config import Config
+from . import counters
+from .cache import LinkCache, NegativeCache
+from .bloom import CodeFilter
+from .codegen import CodeAllocator
+from .click_queue import ClickEvent, ClickQueue
+from .metrics import timed_methods
+from .migrations import SchemaMigrator
+from .pool import ConnectionPool
+from .tuning import SqliteTuning
 
+# Batas percobaan jika kode hasil counter sudah dipakai link lama / alias
+MAX_CODE_ATTEMPTS = 10
+
+# Validasi item batch (aturan alias sama dengan bot)
+MAX_URL_LENGTH = 2048
+ALIAS_PATTERN = re.compile(r'^[a-zA-Z0-9_-]{3,64}$')
+
+
+def validate_link_item(item) -> Optional[str]:
+    """
+    Validasi satu item create batch
+    
+    Args:
+        item: Dict dengan url, alias (opsional), domain (opsional), user_id (opsional)
+        
+    Returns:
+        Pesan error atau None jika valid
+    """
+    if not isinstance(item, dict):
+        return 'Item harus object JSON dengan field "url"'
+    url = item.get('url')
+    if not isinstance(url, str) or not url.startswith(('http://', 'https://')):
+        return 'URL harus diawali http:// atau https://'
+    if len(url) > MAX_URL_LENGTH:
+        return f'URL terlalu panjang (maks {MAX_URL_LENGTH} karakter)'
+    alias = item.get('alias')
+    if alias is not None and (not isinstance(alias, str) or not ALIAS_PATTERN.match(alias)):
+        return 'Alias harus 3-64 karakter: huruf, angka, - atau _'
+    domain = item.get('domain')
+    if domain is not None and (not isinstance(domain, str) or not domain):
+        return 'Domain tidak valid'
+    user_id = item.get('user_id')
+    if user_id is not None and not isinstance(user_id, (str, int)):
+        return 'user_id tidak valid'
+    return None
+
+
+def alias_taken_error(alias: str, scope: str) -> str:
+    """
+    Pesan error untuk alias yang sudah dipakai
+
+    Args:
+        alias: Custom alias
+        scope: 'domain' jika dipakai di domain yang sama, 'global' jika
+            bentrok dengan short code di domain lain (short_code unik global)
+    """
+    if scope == 'domain':
+        return f'Alias "{alias}" sudah digunakan untuk domain ini!'
+    return f'Alias "{alias}" sudah digunakan di domain lain!'
+
+
+def writes(func):
+    """
+    Tandai method DatabaseManager yang menulis ke database
+
+    AsyncDatabaseManager menjalankan method bertanda ini di thread writer.
+    Setelah method selesai, policy checkpoint WAL dicek (semua jalur write,
+    bukan hanya flush klik). Atribut ikut tersalin ke wrapper timed_methods
+    (functools.wraps).
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        result = func(self, *args, **kwargs)
+        self._after_write()
+        return result
+    wrapper.writes_database = True
+    return wrapper
+
+
+@timed_methods(exclude=('connection', 'get_connection', 'release_connection'))
 class DatabaseManager:
     """Manager untuk database operations"""
     
-    def __init__(self, db_path: str = "shortlink.db"):
+    def __init__(self, db_path: Optional[str] = None):
         """
         Initialize database manager
         
         Args:
-            db_path: Path ke database SQLite
+            db_path: Path ke database SQLite (default dari DATABASE_URL)
         """
+        db_path = db_path or Config.DATABASE_PATH
         self.db_path = db_path
+        self.tuning = SqliteTuning.for_database(db_path)
+        self.link_cache = LinkCache.for_database(
+            db_path,
+            max_size=Config.LINK_CACHE_SIZE,
+            ttl=Config.LINK_CACHE_TTL
+        )
+        self.negative_cache = NegativeCache.for_database(
+            db_path,
+            ttl=Config.NEGATIVE_CACHE_TTL
+        )
+        self.code_filter = CodeFilter.for_database(
+            db_path,
+            fp_rate=Config.CODE_FILTER_FP_RATE,
+            sync_interval=Config.CODE_FILTER_SYNC_INTERVAL
+        )
+        self.click_queue = ClickQueue.for_database(
+            db_path,
+            writer=self.write_click_batch,
+            max_size=Config.CLICK_QUEUE_SIZE,
+            batch_size=Config.CLICK_BATCH_SIZE,
+            flush_interval=Config.CLICK_FLUSH_INTERVAL,
+            max_retries=Config.CLICK_FLUSH_RETRIES
+        )
+        self.pool = ConnectionPool.for_database(
+            db_path,
+            max_size=Config.DB_POOL_SIZE,
+            timeout=Config.DB_POOL_TIMEOUT,
+            busy_timeout=Config.DB_BUSY_TIMEOUT / 1000,
+            cached_statements=Config.DB_STATEMENT_CACHE_SIZE,
+            on_connect=self._setup_connection
+        )
+        self.code_allocator = CodeAllocator.for_database(
+            db_path,
+            connect=self.pool.connection,
+            min_length=Config.SHORT_CODE_LENGTH,
+            block_size=Config.CODE_BLOCK_SIZE
+        )
         self.init_database()
     
+    def _setup_connection(self, conn: sqlite3.Connection):
+        """Setup koneksi baru (dipanggil sekali per koneksi oleh pool)"""
+        conn.execute('PRAGMA foreign_keys = ON')
+        self.tuning.apply(conn)
+    
+    def _after_write(self):
+        """Jalankan checkpoint PASSIVE/TRUNCATE jika sudah waktunya"""
+        if not self.tuning.checkpoint_due():
+            return
+        try:
+            with self.connection() as conn:
+                self.tuning.maybe_checkpoint(conn)
+        except sqlite3.Error as e:
+            # Write sudah berhasil; checkpoint dicoba lagi setelah write berikutnya
+            print(f"⚠️  WAL checkpoint error: {e}")
+    
     def get_connection(self):
-        """Get database connection"""
-        return sqlite3.connect(self.db_path)
+        """
+        Get database connection dari pool
+        
+        Koneksi harus dikembalikan dengan release_connection(),
+        atau gunakan context manager connection().
+        """
+        return self.pool.acquire()
     
+    def release_connection(self, conn: sqlite3.Connection):
+        """Kembalikan koneksi ke pool"""
+        self.pool.release(conn)
+    
+    def connection(self):
+        """Context manager untuk pinjam koneksi dari pool"""
+        return self.pool.connection()
+    
+    def get_pool_stats(self) -> Dict:
+        """Get statistik connection pool"""
+        return self.pool.stats()
+    
+    @writes
     def init_database(self):
-        """Initialize database tables"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Table untuk short links
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS short_links (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                short_code TEXT NOT NULL UNIQUE,
-                original_url TEXT NOT NULL,
-                custom_alias TEXT,
-                domain TEXT DEFAULT 'default',
-                clicks INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                created_by TEXT,
-                is_active INTEGER DEFAULT 1
-            )
-        ''')
-        
-        # Table untuk domains (custom domain users)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS custom_domains (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                domain TEXT NOT NULL UNIQUE,
-                user_id TEXT NOT NULL,
-                telegram_username TEXT,
-                is_active INTEGER DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Table untuk click analytics
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS click_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                short_code TEXT NOT NULL,
-                clicked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                ip_address TEXT,
-                user_agent TEXT,
-                referer TEXT
-            )
-        ''')
-        
-        # Index untuk performa
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_short_code ON short_links(short_code)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_domain ON short_links(domain)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_custom_alias ON short_links(custom_alias)')
-        
-        conn.commit()
-        conn.close()
-        
-        print("✅ Database initialized!")
+        """Initialize database tables (jalankan migrasi schema yang pending)"""
+        with self.connection() as conn:
+            self.tuning.apply_database(conn)
+            
+            SchemaMigrator(
+                conn,
+                batch_size=Config.MIGRATION_BATCH_SIZE,
+                batch_pause=Config.MIGRATION_BATCH_PAUSE
+            ).migrate()
+            
+            if not self.tuning.reported:
+                self.tuning.reported = True
+                report = self.tuning.report(conn)
+                print(f"✅ Database initialized! ({self.db_path})")
+                print("   SQLite: " + ", ".join(f"{k}={v}" for k, v in report.items()))
+    
+    def get_tuning_report(self) -> Dict:
+        """Get nilai PRAGMA yang aktif dan statistik checkpoint"""
+        with self.connection() as conn:
+            report = self.tuning.report(conn)
+        report['checkpoint'] = self.tuning.stats()
+        return report
     
-    def generate_short_code(self, length: int = 6) -> str:
+    @writes
+    def checkpoint(self, mode: str = 'PASSIVE') -> tuple:
         """
-        Generate random short code
+        Jalankan WAL checkpoint manual
         
         Args:
-            length: Panjang kode
+            mode: PASSIVE, FULL, RESTART atau TRUNCATE
             
         Returns:
-            Random short code
+            Tuple (busy, log_pages, checkpointed_pages)
         """
-        characters = string.ascii_letters + string.digits
-        while True:
-            code = ''.join(random.choice(characters) for _ in range(length))
-            # Check if code already exists
-            if not self.get_link_by_code(code):
-                return code
+        mode = mode.upper()
+        if mode not in ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'):
+            raise ValueError(f'Checkpoint mode tidak valid: {mode}')
+        with self.connection() as conn:
+            return conn.execute(f'PRAGMA wal_checkpoint({mode})').fetchone()
     
+    @writes
+    def generate_short_code(self) -> str:
+        """
+        Alokasikan short code baru (tanpa cek ke short_links)
+        
+        Kode berasal dari block counter code_sequence yang di-lease proses
+        ini dan diacak dengan permutasi ber-key, jadi selalu unik. Database
+        hanya disentuh saat block habis.
+        
+        Returns:
+            Short code
+        """
+        return self.code_allocator.next_code()
+    
+    @writes
     def create_short_link(
         self, 
         original_url: str, 
@@ -115,38 +253,66 @@ class DatabaseManager:
         Returns:
             Dict dengan info short link
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # Generate short code atau gunakan custom alias
-            if custom_alias:
-                # Validasi custom alias tidak ada
-                cursor.execute(
-                    'SELECT id FROM short_links WHERE custom_alias = ? AND domain = ?',
-                    (custom_alias, domain)
-                )
-                if cursor.fetchone():
-                    conn.close()
+        # Kode diambil dari block di memory sebelum meminjam koneksi, jadi
+        # link baru cukup satu transaksi tulis. Tabrakan hanya mungkin dengan
+        # kode lama (acak) atau custom alias; kode tersebut dilewati.
+        for _ in range(MAX_CODE_ATTEMPTS):
+            short_code = custom_alias or self.code_allocator.next_code()
+            
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                
+                try:
+                    # Validasi custom alias tidak ada
+                    if custom_alias:
+                        cursor.execute(
+                            'SELECT 1 FROM link_keys WHERE domain = ? AND key = ?',
+                            (domain, custom_alias)
+                        )
+                        if cursor.fetchone():
+                            return {
+                                'success': False,
+                                'error': alias_taken_error(custom_alias, 'domain')
+                            }
+                    
+                    cursor.execute('''
+                        INSERT INTO short_links 
+                        (short_code, original_url, custom_alias, domain, created_by)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(short_code) DO NOTHING
+                    ''', (short_code, original_url, custom_alias, domain, user_id))
+                    
+                    if not cursor.rowcount:
+                        conn.rollback()
+                        if custom_alias:
+                            # Tidak ada di link_keys domain ini: bentrok dengan domain lain
+                            return {
+                                'success': False,
+                                'error': alias_taken_error(custom_alias, 'global')
+                            }
+                        continue
+                    
+                    link_id = cursor.lastrowid
+                    
+                    cursor.execute(
+                        'INSERT INTO link_keys (domain, key, link_id) VALUES (?, ?, ?)',
+                        (domain, short_code, link_id)
+                    )
+                    
+                    conn.commit()
+                
+                except sqlite3.IntegrityError as e:
+                    conn.rollback()
                     return {
                         'success': False,
-                        'error': f'Alias "{custom_alias}" sudah digunakan untuk domain ini!'
+                        'error': f'Error: {str(e)}'
                     }
-                short_code = custom_alias
-            else:
-                short_code = self.generate_short_code()
-            
-            # Insert ke database
-            cursor.execute('''
-                INSERT INTO short_links 
-                (short_code, original_url, custom_alias, domain, created_by)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (short_code, original_url, custom_alias, domain, user_id))
-            
-            conn.commit()
-            link_id = cursor.lastrowid
             
-            conn.close()
+            # Buang entry lama dari cache; link di domain default bisa
+            # ter-cache di bawah host mana saja
+            self.link_cache.invalidate_code(short_code)
+            self.code_filter.add(short_code, link_id)
+            self.negative_cache.invalidate_code(short_code)
             
             return {
                 'success': True,
@@ -157,12 +323,192 @@ class DatabaseManager:
                 'custom_alias': custom_alias
             }
         
-        except sqlite3.IntegrityError as e:
-            conn.close()
-            return {
-                'success': False,
-                'error': f'Error: {str(e)}'
-            }
+        return {
+            'success': False,
+            'error': 'Gagal membuat short code, coba lagi'
+        }
+    
+    @writes
+    def create_short_links(self, items: List[Dict]) -> List[Dict]:
+        """
+        Create banyak short link dalam satu transaksi
+        
+        Item divalidasi dulu, kode untuk item tanpa alias diambil sekaligus
+        dari allocator, lalu semua baris ditulis dengan executemany.
+        link_keys diisi dengan satu INSERT ... SELECT dari baris baru.
+        Item yang gagal tidak membatalkan item lain: jika executemany tetap
+        kena IntegrityError, batch ditulis ulang per baris (savepoint).
+        
+        Args:
+            items: List dict {url, alias, domain, user_id} (format /api/create)
+            
+        Returns:
+            List hasil per item (urutan sama dengan items), format sama
+            dengan create_short_link
+        """
+        results: List[Optional[Dict]] = [None] * len(items)
+        pending = []  # [posisi, short_code, url, alias, domain, user_id]
+        aliases = set()
+        
+        for pos, item in enumerate(items):
+            error = validate_link_item(item)
+            alias = item.get('alias') if not error else None
+            if alias:
+                if alias in aliases:
+                    error = f'Alias "{alias}" duplikat di batch ini'
+                aliases.add(alias)
+            if error:
+                results[pos] = {'success': False, 'error': error}
+                continue
+            user_id = item.get('user_id')
+            pending.append([
+                pos, alias, item['url'], alias, item.get('domain') or 'default',
+                str(user_id) if user_id is not None else None
+            ])
+        
+        for _ in range(MAX_CODE_ATTEMPTS):
+            if not pending:
+                break
+            
+            # Kode diambil di luar transaksi (lease butuh write lock sendiri)
+            missing = [entry for entry in pending if entry[1] is None]
+            for entry, code in zip(missing, self.code_allocator.next_codes(len(missing))):
+                entry[1] = code
+            
+            with self.connection() as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    taken = self._taken_link_keys(conn, [(entry[4], entry[1]) for entry in pending])
+                    retry = False
+                    remaining = []
+                    for entry in pending:
+                        # short_code UNIQUE global: kode generate tidak boleh sama dengan alias di batch ini
+                        clash = not entry[3] and entry[1] in aliases
+                        scope = taken.get((entry[4], entry[1]))
+                        if scope is None and not clash:
+                            remaining.append(entry)
+                        elif entry[3]:
+                            results[entry[0]] = {
+                                'success': False,
+                                'error': alias_taken_error(entry[3], scope)
+                            }
+                        else:
+                            # Tabrakan dengan kode lama: ambil kode baru
+                            entry[1] = None
+                            remaining.append(entry)
+                            retry = True
+                    pending = remaining
+                    
+                    if retry:
+                        conn.rollback()
+                        continue
+                    
+                    last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM short_links').fetchone()[0]
+                    conn.executemany('''
+                        INSERT INTO short_links 
+                        (short_code, original_url, custom_alias, domain, created_by)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', [entry[1:] for entry in pending])
+                    # AUTOINCREMENT + write lock: semua id > last_id adalah baris batch ini
+                    conn.execute('''
+                        INSERT INTO link_keys (domain, key, link_id)
+                        SELECT domain, short_code, id FROM short_links WHERE id > ?
+                    ''', (last_id,))
+                    ids = dict(conn.execute(
+                        'SELECT short_code, id FROM short_links WHERE id > ?', (last_id,)
+                    ).fetchall())
+                    conn.commit()
+                
+                except sqlite3.IntegrityError:
+                    conn.rollback()
+                    # Ada baris yang bentrok: tulis per baris supaya item lain tetap dibuat
+                    ids = self._insert_links_each(conn, pending, results)
+                    pending = [entry for entry in pending if entry[1] in ids]
+            
+            for pos, short_code, url, alias, domain, _ in pending:
+                self.link_cache.invalidate_code(short_code)
+                self.code_filter.add(short_code, ids[short_code])
+                self.negative_cache.invalidate_code(short_code)
+                results[pos] = {
+                    'success': True,
+                    'id': ids[short_code],
+                    'short_code': short_code,
+                    'original_url': url,
+                    'domain': domain,
+                    'custom_alias': alias
+                }
+            pending = []
+        
+        for entry in pending:
+            results[entry[0]] = {'success': False, 'error': 'Gagal membuat short code, coba lagi'}
+        
+        return results
+    
+    def _insert_links_each(self, conn: sqlite3.Connection, entries: List[list],
+                           results: List[Optional[Dict]]) -> Dict[str, int]:
+        """
+        Insert link satu per satu dalam satu transaksi (fallback create_short_links)
+        
+        Setiap baris memakai savepoint sendiri, jadi baris yang kena
+        IntegrityError hanya menggagalkan item itu.
+        
+        Returns:
+            Dict short_code -> id untuk baris yang berhasil
+        """
+        ids = {}
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for pos, short_code, url, alias, domain, user_id in entries:
+                conn.execute('SAVEPOINT link_item')
+                try:
+                    cursor = conn.execute('''
+                        INSERT INTO short_links 
+                        (short_code, original_url, custom_alias, domain, created_by)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', (short_code, url, alias, domain, user_id))
+                    conn.execute(
+                        'INSERT INTO link_keys (domain, key, link_id) VALUES (?, ?, ?)',
+                        (domain, short_code, cursor.lastrowid)
+                    )
+                    conn.execute('RELEASE link_item')
+                    ids[short_code] = cursor.lastrowid
+                except sqlite3.IntegrityError as e:
+                    conn.execute('ROLLBACK TO link_item')
+                    conn.execute('RELEASE link_item')
+                    scope = self._taken_link_keys(conn, [(domain, short_code)]).get((domain, short_code))
+                    error = alias_taken_error(alias, scope) if alias and scope else f'Error: {str(e)}'
+                    results[pos] = {'success': False, 'error': error}
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return ids
+    
+    def _taken_link_keys(self, conn: sqlite3.Connection, keys: List[tuple]) -> Dict[tuple, str]:
+        """
+        Pasangan (domain, key) yang sudah dipakai
+        
+        Returns:
+            Dict (domain, key) -> 'domain' (key sudah ada di domain yang sama)
+            atau 'global' (key sudah jadi short_code di domain lain;
+            short_code unik di semua domain)
+        """
+        codes = {row[0] for row in conn.execute('''
+            SELECT short_code FROM short_links
+            WHERE short_code IN (SELECT value FROM json_each(?))
+        ''', (json.dumps([key for _, key in keys]),))}
+        pairs = set(conn.execute('''
+            SELECT k.domain, k.key FROM json_each(?) j
+            JOIN link_keys k ON k.domain = json_extract(j.value, '$[0]')
+                            AND k.key = json_extract(j.value, '$[1]')
+        ''', (json.dumps(keys),)).fetchall())
+        taken = {}
+        for key in keys:
+            if key in pairs:
+                taken[key] = 'domain'
+            elif key[1] in codes:
+                taken[key] = 'global'
+        return taken
     
     def get_link_by_code(self, short_code: str, domain: str = 'default') -> Optional[Dict]:
         """
@@ -175,17 +521,75 @@ class DatabaseManager:
         Returns:
             Dict dengan info link atau None
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT l.id, l.short_code, l.original_url, l.custom_alias, l.domain,
+                       l.clicks, l.created_at, l.is_active
+                FROM link_keys k
+                JOIN short_links l ON l.id = k.link_id
+                WHERE k.domain = ? AND k.key = ? AND l.is_active = 1
+            ''', (domain, short_code))
+            
+            row = cursor.fetchone()
+            
+            if row:
+                return {
+                    'id': row[0],
+                    'short_code': row[1],
+                    'original_url': row[2],
+                    'custom_alias': row[3],
+                    'domain': row[4],
+                    'clicks': row[5],
+                    'created_at': row[6],
+                    'is_active': row[7]
+                }
+            
+            return None
+    
+    def get_link_cached(self, short_code: str, domain: str = 'default') -> Optional[Dict]:
+        """
+        Get link by short code lewat cache (untuk redirect)
         
-        cursor.execute('''
-            SELECT id, short_code, original_url, custom_alias, domain, clicks, created_at, is_active
-            FROM short_links
-            WHERE (short_code = ? OR custom_alias = ?) AND domain = ? AND is_active = 1
-        ''', (short_code, short_code, domain))
+        Args:
+            short_code: Short code
+            domain: Domain
+            
+        Returns:
+            Dict dengan info link atau None
+        """
+        return self.link_cache.get_or_load(domain, short_code, self.get_link_by_code)
+    
+    def resolve_link(self, short_code: str, host: str) -> Optional[Dict]:
+        """
+        Resolusi link untuk host dalam satu query
         
-        row = cursor.fetchone()
-        conn.close()
+        Mencari link di domain host dan domain default sekaligus; link di
+        domain host diutamakan. Setiap domain cukup satu seek di primary
+        key link_keys.
+        
+        Args:
+            short_code: Short code atau custom alias
+            host: Domain dari request
+            
+        Returns:
+            Dict dengan info link atau None
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT l.id, l.short_code, l.original_url, l.custom_alias, l.domain,
+                       l.clicks, l.created_at, l.is_active
+                FROM link_keys k
+                JOIN short_links l ON l.id = k.link_id
+                WHERE k.domain IN (?, 'default') AND k.key = ? AND l.is_active = 1
+                ORDER BY k.domain = ? DESC
+                LIMIT 1
+            ''', (host, short_code, host))
+            
+            row = cursor.fetchone()
         
         if row:
             return {
@@ -201,6 +605,165 @@ class DatabaseManager:
         
         return None
     
+    def find_link_for_host(self, short_code: str, host: str) -> Optional[Dict]:
+        """
+        Cari link untuk redirect: domain request dulu, lalu domain default
+        
+        Kode yang tidak ada di code filter atau baru saja dipastikan tidak
+        ada (negative cache) dijawab dari memory tanpa query ke database.
+        
+        Args:
+            short_code: Short code atau custom alias
+            host: Domain dari request
+            
+        Returns:
+            Dict dengan info link atau None
+        """
+        self.refresh_code_filter()
+        
+        if not self.code_filter.might_exist(short_code):
+            return None
+        
+        if self.negative_cache.contains(host, short_code):
+            return None
+        
+        link = self.link_cache.get_or_load(host, short_code, self.resolve_link)
+        
+        if not link:
+            self.negative_cache.add(host, short_code)
+        
+        return link
+
+    def warm_link_cache(self, host: str, limit: int = 1000) -> int:
+        """
+        Isi link cache dengan link yang paling sering diklik
+
+        Dipakai worker baru supaya request pertama tidak semuanya ke SQLite.
+
+        Args:
+            host: Domain request yang di-cache (mis. domain default)
+            limit: Jumlah link teratas
+
+        Returns:
+            Jumlah key yang masuk cache
+        """
+        if not host or limit <= 0:
+            return 0
+
+        with self.connection() as conn:
+            rows = conn.execute('''
+                SELECT short_code, custom_alias FROM short_links
+                WHERE is_active = 1
+                ORDER BY clicks DESC
+                LIMIT ?
+            ''', (limit,)).fetchall()
+
+        warmed = 0
+        for short_code, custom_alias in rows:
+            for code in (short_code, custom_alias):
+                if code and self.link_cache.get_or_load(host, code, self.resolve_link):
+                    warmed += 1
+        return warmed
+
+    def load_code_filter(self):
+        """Bangun code filter dari semua link aktif"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT COUNT(*) FROM short_links WHERE is_active = 1')
+            total = cursor.fetchone()[0]
+            # Batas sync dibaca sebelum scan: link yang dibuat selama scan
+            # (termasuk yang di-add ke filter lama) diambil sync di bawah
+            last_id = cursor.execute('SELECT COALESCE(MAX(id), 0) FROM short_links').fetchone()[0]
+            
+            cursor.execute('''
+                SELECT id, short_code, custom_alias
+                FROM short_links
+                WHERE is_active = 1
+            ''')
+            self.code_filter.rebuild(total, cursor, last_id=last_id)
+        
+        self.code_filter.sync(self._sync_new_links)
+    
+    def refresh_code_filter(self):
+        """Load, rebuild atau sync code filter jika diperlukan"""
+        code_filter = self.code_filter
+        if code_filter.loaded and not code_filter.needs_sync() and not code_filter.needs_rebuild():
+            return
+        
+        # Cukup satu thread yang melakukan maintenance, thread lain lanjut
+        if not code_filter.maintenance_lock.acquire(blocking=False):
+            return
+        try:
+            if not code_filter.loaded or code_filter.needs_rebuild():
+                self.load_code_filter()
+            elif code_filter.needs_sync():
+                code_filter.sync(self._sync_new_links)
+            self._sync_link_changes()
+        finally:
+            code_filter.maintenance_lock.release()
+    
+    def _sync_new_links(self, last_id: int) -> List[tuple]:
+        """
+        Ambil link baru (mis. dibuat proses lain) untuk code filter
+        
+        Negative cache dan link cache untuk kode tersebut di-invalidate,
+        supaya hasil 404 sebelum link dibuat tidak bertahan sampai TTL habis.
+        """
+        rows = self._get_links_since(last_id)
+        for _, short_code, custom_alias in rows:
+            for code in (short_code, custom_alias):
+                if code:
+                    self.negative_cache.invalidate_code(code)
+                    self.link_cache.invalidate_code(code)
+        return rows
+    
+    def _sync_link_changes(self):
+        """
+        Invalidate link cache untuk link yang diubah proses lain
+        
+        Link yang dinonaktifkan dari bot (proses terpisah di mode
+        supervisor) tidak boleh tetap redirect dari cache worker web sampai
+        TTL habis (dan link yang diaktifkan lagi tidak tertahan di negative
+        cache). Trigger mencatat setiap perubahan is_active / original_url
+        di short_links.change_seq; di sini perubahan setelah sync terakhir
+        diambil lewat index change_seq.
+        """
+        link_cache = self.link_cache
+        with self.connection() as conn:
+            if link_cache.change_seq is None:
+                # Sync pertama di proses ini: cache masih kosong, cukup catat posisi
+                link_cache.change_seq = conn.execute(
+                    'SELECT COALESCE(MAX(change_seq), 0) FROM short_links'
+                ).fetchone()[0]
+                return
+            rows = conn.execute('''
+                SELECT change_seq, short_code, custom_alias
+                FROM short_links
+                WHERE change_seq > ?
+                ORDER BY change_seq
+            ''', (link_cache.change_seq,)).fetchall()
+        
+        for change_seq, short_code, custom_alias in rows:
+            for code in (short_code, custom_alias):
+                if code:
+                    link_cache.invalidate_code(code)
+                    # Link yang diaktifkan lagi tidak boleh tertahan di negative cache
+                    self.negative_cache.invalidate_code(code)
+            link_cache.change_seq = change_seq
+    
+    def _get_links_since(self, last_id: int) -> List[tuple]:
+        """Get (id, short_code, custom_alias) untuk link dengan id > last_id"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, short_code, custom_alias
+                FROM short_links
+                WHERE id > ?
+            ''', (last_id,))
+            return cursor.fetchall()
+    
+    @writes
     def increment_click(self, short_code: str, domain: str = 'default', 
                        ip_address: str = None, user_agent: str = None, 
                        referer: str = None):
@@ -214,25 +777,104 @@ class DatabaseManager:
             user_agent: User agent
             referer: Referer
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Increment counter
+            cursor.execute('''
+                UPDATE short_links 
+                SET clicks = clicks + 1 
+                WHERE id = (SELECT link_id FROM link_keys WHERE domain = ? AND key = ?)
+            ''', (domain, short_code))
+            
+            # Log click
+            cursor.execute('''
+                INSERT INTO click_logs (short_code, link_id, ip_address, user_agent, referer)
+                VALUES (?, (SELECT link_id FROM link_keys WHERE domain = ? AND key = ?), ?, ?, ?)
+            ''', (short_code, domain, short_code, ip_address, user_agent, referer))
+            
+            conn.commit()
+    
+    @writes
+    def record_click(self, link: Dict, ip_address: str = None,
+                     user_agent: str = None, referer: str = None):
+        """
+        Catat klik lewat write-behind queue (untuk redirect)
+        
+        Jika queue dimatikan atau penuh, klik langsung ditulis ke database.
+        
+        Args:
+            link: Link dict dari get_link_by_code
+            ip_address: IP address pengunjung
+            user_agent: User agent
+            referer: Referer
+        """
+        if Config.CLICK_QUEUE_ENABLED:
+            event = ClickEvent(
+                link_id=link['id'],
+                short_code=link['custom_alias'] or link['short_code'],
+                clicked_at=datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+                ip_address=ip_address,
+                user_agent=user_agent,
+                referer=referer
+            )
+            if self.click_queue.put(event):
+                return
+        
+        self.increment_click(
+            link['custom_alias'] or link['short_code'],
+            link['domain'],
+            ip_address=ip_address,
+            user_agent=user_agent,
+            referer=referer
+        )
+    
+    @writes
+    def write_click_batch(self, events: List[ClickEvent]):
+        """
+        Tulis satu batch klik dalam satu transaksi
         
-        # Increment counter
-        cursor.execute('''
-            UPDATE short_links 
-            SET clicks = clicks + 1 
-            WHERE (short_code = ? OR custom_alias = ?) AND domain = ?
-        ''', (short_code, short_code, domain))
+        Increment counter digabung per link, click_logs ditulis dengan
+        executemany.
         
-        # Log click
-        cursor.execute('''
-            INSERT INTO click_logs (short_code, ip_address, user_agent, referer)
-            VALUES (?, ?, ?, ?)
-        ''', (short_code, ip_address, user_agent, referer))
+        Args:
+            events: List ClickEvent
+        """
+        counts: Dict[int, int] = {}
+        for event in events:
+            counts[event.link_id] = counts.get(event.link_id, 0) + 1
         
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            try:
+                cursor.executemany(
+                    'UPDATE short_links SET clicks = clicks + ? WHERE id = ?',
+                    [(count, link_id) for link_id, count in counts.items()]
+                )
+                cursor.executemany('''
+                    INSERT INTO click_logs (short_code, link_id, clicked_at, ip_address, user_agent, referer)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', [
+                    (e.short_code, e.link_id, e.clicked_at, e.ip_address, e.user_agent, e.referer)
+                    for e in events
+                ])
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    
+    @writes
+    def flush_clicks(self):
+        """Tulis semua klik yang masih di queue (dipanggil saat shutdown)"""
+        self.click_queue.stop()
     
+    @writes
+    def release_code_block(self):
+        """Kembalikan sisa block short code ke database (dipanggil saat shutdown)"""
+        self.code_allocator.release()
+    
+    @writes
     def add_custom_domain(self, domain: str, user_id: str, username: str = None) -> Dict:
         """
         Add custom domain untuk user
@@ -245,29 +887,27 @@ class DatabaseManager:
         Returns:
             Dict dengan status
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('''
-                INSERT INTO custom_domains (domain, user_id, telegram_username)
-                VALUES (?, ?, ?)
-            ''', (domain, user_id, username))
+        with self.connection() as conn:
+            cursor = conn.cursor()
             
-            conn.commit()
-            conn.close()
+            try:
+                cursor.execute('''
+                    INSERT INTO custom_domains (domain, user_id, telegram_username)
+                    VALUES (?, ?, ?)
+                ''', (domain, user_id, username))
+                
+                conn.commit()
+                
+                return {
+                    'success': True,
+                    'domain': domain
+                }
             
-            return {
-                'success': True,
-                'domain': domain
-            }
-        
-        except sqlite3.IntegrityError:
-            conn.close()
-            return {
-                'success': False,
-                'error': 'Domain sudah terdaftar!'
-            }
+            except sqlite3.IntegrityError:
+                return {
+                    'success': False,
+                    'error': 'Domain sudah terdaftar!'
+                }
     
     def get_user_links(self, user_id: str, limit: int = 10) -> List[Dict]:
         """
@@ -280,36 +920,35 @@ class DatabaseManager:
         Returns:
             List of links
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT short_code, original_url, custom_alias, domain, clicks, created_at
-            FROM short_links
-            WHERE created_by = ? AND is_active = 1
-            ORDER BY created_at DESC
-            LIMIT ?
-        ''', (user_id, limit))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        links = []
-        for row in rows:
-            links.append({
-                'short_code': row[0],
-                'original_url': row[1],
-                'custom_alias': row[2],
-                'domain': row[3],
-                'clicks': row[4],
-                'created_at': row[5]
-            })
-        
-        return links
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT short_code, original_url, custom_alias, domain, clicks, created_at
+                FROM short_links
+                WHERE created_by = ? AND is_active = 1
+                ORDER BY created_at DESC
+                LIMIT ?
+            ''', (user_id, limit))
+            
+            rows = cursor.fetchall()
+            
+            links = []
+            for row in rows:
+                links.append({
+                    'short_code': row[0],
+                    'original_url': row[1],
+                    'custom_alias': row[2],
+                    'domain': row[3],
+                    'clicks': row[4],
+                    'created_at': row[5]
+                })
+            
+            return links
     
     def get_stats(self, user_id: Optional[str] = None) -> Dict:
         """
-        Get statistics
+        Get statistics (dari counter, tanpa scan short_links)
         
         Args:
             user_id: Filter by user (opsional)
@@ -317,30 +956,38 @@ class DatabaseManager:
         Returns:
             Dict dengan stats
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        if user_id:
-            cursor.execute('''
-                SELECT COUNT(*), SUM(clicks)
-                FROM short_links
-                WHERE created_by = ? AND is_active = 1
-            ''', (user_id,))
-        else:
-            cursor.execute('''
-                SELECT COUNT(*), SUM(clicks)
-                FROM short_links
-                WHERE is_active = 1
-            ''')
-        
-        row = cursor.fetchone()
-        conn.close()
+        with self.connection() as conn:
+            if user_id:
+                row = conn.execute(
+                    'SELECT links, clicks FROM user_link_counts WHERE user_id = ?',
+                    (str(user_id),)
+                ).fetchone() or (0, 0)
+            else:
+                values = counters.read_counters(conn)
+                row = (values['links'], values['clicks'])
+            
+            return {
+                'total_links': row[0] or 0,
+                'total_clicks': row[1] or 0
+            }
+    
+    def get_counters(self) -> Dict[str, int]:
+        """Get semua counter global (links, clicks, users, domains)"""
+        with self.connection() as conn:
+            return counters.read_counters(conn)
+    
+    @writes
+    def reconcile_counters(self) -> Dict[str, Dict[str, int]]:
+        """
+        Bangun ulang counter dari short_links / custom_domains
         
-        return {
-            'total_links': row[0] or 0,
-            'total_clicks': row[1] or 0
-        }
+        Returns:
+            Dict {'before': {...}, 'after': {...}}
+        """
+        with self.connection() as conn:
+            return counters.reconcile(conn)
     
+    @writes
     def delete_link(self, short_code: str, user_id: str, domain: str = 'default') -> bool:
         """
         Delete/deactivate link
@@ -353,145 +1000,156 @@ class DatabaseManager:
         Returns:
             True jika berhasil
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE short_links
-            SET is_active = 0
-            WHERE (short_code = ? OR custom_alias = ?) 
-            AND domain = ? 
-            AND created_by = ?
-        ''', (short_code, short_code, domain, user_id))
-        
-        affected = cursor.rowcount
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                UPDATE short_links
+                SET is_active = 0
+                WHERE id = (SELECT link_id FROM link_keys WHERE domain = ? AND key = ?)
+                AND created_by = ?
+            ''', (domain, short_code, user_id))
+            
+            affected = cursor.rowcount
+            conn.commit()
+            
+            if affected > 0:
+                self.link_cache.invalidate_code(short_code)
+            
+            return affected > 0
+    
+    # Telegram file_id (foto QR yang sudah pernah di-upload)
+    def get_telegram_file_id(self, content_hash: str) -> Optional[str]:
+        """
+        Get file_id Telegram untuk foto dengan content hash ini
         
-        return affected > 0
+        Args:
+            content_hash: Hash isi foto (cache key QR)
+            
+        Returns:
+            file_id atau None jika belum pernah dikirim
+        """
+        with self.connection() as conn:
+            row = conn.execute(
+                'SELECT file_id FROM telegram_files WHERE content_hash = ?', (content_hash,)
+            ).fetchone()
+            return row[0] if row else None
+    
+    @writes
+    def save_telegram_file_id(self, content_hash: str, file_id: str):
+        """Simpan file_id yang dikembalikan Telegram setelah upload"""
+        with self.connection() as conn:
+            conn.execute('''
+                INSERT INTO telegram_files (content_hash, file_id) VALUES (?, ?)
+                ON CONFLICT(content_hash) DO UPDATE SET file_id = excluded.file_id,
+                    created_at = CURRENT_TIMESTAMP
+            ''', (content_hash, file_id))
+            conn.commit()
+    
+    @writes
+    def forget_telegram_file_id(self, content_hash: str):
+        """Hapus file_id yang ditolak Telegram (mis. token bot diganti)"""
+        with self.connection() as conn:
+            conn.execute('DELETE FROM telegram_files WHERE content_hash = ?', (content_hash,))
+            conn.commit()
     
     # Admin methods
     def get_total_links(self) -> int:
         """Get total links count"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM short_links WHERE is_active = 1')
-        result = cursor.fetchone()[0]
-        conn.close()
-        return result
+        return self.get_counters()['links']
     
     def get_total_clicks(self) -> int:
         """Get total clicks count"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT SUM(clicks) FROM short_links WHERE is_active = 1')
-        result = cursor.fetchone()[0] or 0
-        conn.close()
-        return result
+        return self.get_counters()['clicks']
     
     def get_total_users(self) -> int:
         """Get total unique users"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(DISTINCT created_by) FROM short_links WHERE is_active = 1')
-        result = cursor.fetchone()[0]
-        conn.close()
-        return result
+        return self.get_counters()['users']
     
     def get_total_domains(self) -> int:
         """Get total custom domains"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM custom_domains')
-        result = cursor.fetchone()[0]
-        conn.close()
-        return result
+        return self.get_counters()['domains']
     
     def get_all_domains(self, limit: int = 50) -> List[Dict]:
         """Get all custom domains"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT domain, user_id, username, added_at
-            FROM custom_domains
-            ORDER BY added_at DESC
-            LIMIT ?
-        ''', (limit,))
-        
-        domains = []
-        for row in cursor.fetchall():
-            domains.append({
-                'domain': row[0],
-                'user_id': row[1],
-                'username': row[2],
-                'added_at': row[3]
-            })
-        
-        conn.close()
-        return domains
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT domain, user_id, telegram_username, created_at
+                FROM custom_domains
+                ORDER BY created_at DESC
+                LIMIT ?
+            ''', (limit,))
+            
+            domains = []
+            for row in cursor.fetchall():
+                domains.append({
+                    'domain': row[0],
+                    'user_id': row[1],
+                    'username': row[2],
+                    'added_at': row[3]
+                })
+            
+            return domains
     
     def get_recent_links(self, limit: int = 10) -> List[Dict]:
         """Get recent links"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT short_code, original_url, custom_alias, domain, clicks, created_by, created_at
-            FROM short_links
-            WHERE is_active = 1
-            ORDER BY created_at DESC
-            LIMIT ?
-        ''', (limit,))
-        
-        links = []
-        for row in cursor.fetchall():
-            links.append({
-                'short_code': row[0],
-                'original_url': row[1],
-                'custom_alias': row[2],
-                'domain': row[3],
-                'clicks': row[4],
-                'user_id': row[5],
-                'created_at': row[6]
-            })
-        
-        conn.close()
-        return links
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT short_code, original_url, custom_alias, domain, clicks, created_by, created_at
+                FROM short_links
+                WHERE is_active = 1
+                ORDER BY created_at DESC
+                LIMIT ?
+            ''', (limit,))
+            
+            links = []
+            for row in cursor.fetchall():
+                links.append({
+                    'short_code': row[0],
+                    'original_url': row[1],
+                    'custom_alias': row[2],
+                    'domain': row[3],
+                    'clicks': row[4],
+                    'user_id': row[5],
+                    'created_at': row[6]
+                })
+            
+            return links
     
     def get_active_users(self, limit: int = 10) -> List[Dict]:
         """Get active users with stats"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT created_by, COUNT(*) as link_count, SUM(clicks) as total_clicks
-            FROM short_links
-            WHERE is_active = 1
-            GROUP BY created_by
-            ORDER BY link_count DESC
-            LIMIT ?
-        ''', (limit,))
-        
-        users = []
-        for row in cursor.fetchall():
-            users.append({
-                'user_id': row[0],
-                'link_count': row[1],
-                'total_clicks': row[2] or 0
-            })
-        
-        conn.close()
-        return users
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT user_id, links, clicks
+                FROM user_link_counts
+                WHERE links > 0
+                ORDER BY links DESC
+                LIMIT ?
+            ''', (limit,))
+            
+            users = []
+            for row in cursor.fetchall():
+                users.append({
+                    'user_id': row[0],
+                    'link_count': row[1],
+                    'total_clicks': row[2] or 0
+                })
+            
+            return users
     
     def check_subdomain_exists(self, subdomain: str) -> bool:
         """Check if subdomain already exists"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Check in custom_domains table
-        cursor.execute('''
-            SELECT COUNT(*) FROM custom_domains
-            WHERE domain LIKE ?
-        ''', (f"{subdomain}.%",))
-        
-        result = cursor.fetchone()[0] > 0
-        conn.close()
-        return result
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Check in custom_domains table
+            cursor.execute('''
+                SELECT COUNT(*) FROM custom_domains
+                WHERE domain LIKE ?
+            ''', (f"{subdomain}.%",))
+            
+            result = cursor.fetchone()[0] > 0
+            return result
@@ -0,0 +1,241 @@
+"""
+Export streaming links & klik ke CSV atau NDJSON
+
+Baris dibaca per chunk dengan keyset pagination (WHERE id > last ORDER BY
+id LIMIT n): koneksi hanya dipinjam selama satu chunk, tidak ada read
+transaction panjang yang menahan checkpoint WAL, dan memory tetap konstan
+berapa pun ukuran table. Output berupa generator string sehingga bisa
+langsung dipakai sebagai response streaming atau ditulis ke file.
+
+Usage:
+    python -m database export links --format csv --output links.csv
+    python -m database export clicks --user 123456 --since 2024-01-01 --until 2024-02-01
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class ExportFilter(NamedTuple):
+    """Filter export (None = tanpa filter)"""
+    user_id: Optional[str] = None
+    domain: Optional[str] = None
+    since: Optional[str] = None  # inklusif, 'YYYY-MM-DD HH:MM:SS'
+    until: Optional[str] = None  # eksklusif
+
+
+class ExportQuery(NamedTuple):
+    """Query export untuk satu jenis data"""
+    columns: Tuple[str, ...]
+    select: str  # SELECT ... FROM ... tanpa WHERE; kolom pertama = id untuk keyset
+    id_column: str
+    time_column: str
+
+
+QUERIES: Dict[str, ExportQuery] = {
+    'links': ExportQuery(
+        ('id', 'short_code', 'original_url', 'custom_alias', 'domain', 'clicks',
+         'created_at', 'created_by', 'is_active'),
+        '''
+        SELECT l.id, l.short_code, l.original_url, l.custom_alias, l.domain, l.clicks,
+               l.created_at, l.created_by, l.is_active
+        FROM short_links l
+        ''',
+        'l.id',
+        'l.created_at'
+    ),
+    'clicks': ExportQuery(
+        ('id', 'link_id', 'short_code', 'domain', 'clicked_at', 'ip_address', 'user_agent', 'referer'),
+        '''
+        SELECT c.id, c.link_id, c.short_code, l.domain, c.clicked_at, c.ip_address,
+               c.user_agent, c.referer
+        FROM click_logs c
+        LEFT JOIN short_links l ON l.id = c.link_id
+        ''',
+        'c.id',
+        'c.clicked_at'
+    ),
+}
+
+
+def parse_time(value: Optional[str]) -> Optional[str]:
+    """
+    Normalisasi tanggal filter ke format timestamp SQLite
+
+    Args:
+        value: 'YYYY-MM-DD' atau ISO datetime (None / kosong = tanpa filter)
+
+    Returns:
+        'YYYY-MM-DD HH:MM:SS' atau None
+
+    Raises:
+        ValueError: Format tanggal tidak valid
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', ''))
+    except ValueError:
+        raise ValueError(f'Format tanggal tidak valid: {value} (pakai YYYY-MM-DD atau YYYY-MM-DDTHH:MM:SS)')
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def make_filter(user_id: Optional[str] = None, domain: Optional[str] = None,
+                since: Optional[str] = None, until: Optional[str] = None) -> ExportFilter:
+    """Buat ExportFilter dari input user (query string / argumen CLI)"""
+    return ExportFilter(user_id or None, domain or None, parse_time(since), parse_time(until))
+
+
+def _where(query: ExportQuery, filters: ExportFilter) -> Tuple[List[str], List]:
+    clauses, params = [], []
+    if filters.user_id is not None:
+        clauses.append('l.created_by = ?')
+        params.append(filters.user_id)
+    if filters.domain is not None:
+        clauses.append('l.domain = ?')
+        params.append(filters.domain)
+    if filters.since is not None:
+        clauses.append(f'{query.time_column} >= ?')
+        params.append(filters.since)
+    if filters.until is not None:
+        clauses.append(f'{query.time_column} < ?')
+        params.append(filters.until)
+    return clauses, params
+
+
+def iter_rows(db, kind: str, filters: ExportFilter = ExportFilter(),
+              chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple]:
+    """
+    Baca baris export per chunk
+
+    Args:
+        db: DatabaseManager
+        kind: 'links' atau 'clicks'
+        filters: Filter user, domain dan rentang waktu
+        chunk_size: Jumlah baris per query
+
+    Yields:
+        Tuple sesuai QUERIES[kind].columns
+    """
+    query = QUERIES[kind]
+    clauses, params = _where(query, filters)
+    sql = (
+        f"{query.select} WHERE {' AND '.join(clauses + [f'{query.id_column} > ?'])} "
+        f"ORDER BY {query.id_column} LIMIT ?"
+    )
+    last_id = 0
+    while True:
+        with db.connection() as conn:
+            rows = conn.execute(sql, (*params, last_id, chunk_size)).fetchall()
+        if not rows:
+            return
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last_id = rows[-1][0]
+
+
+def to_csv(columns: Tuple[str, ...], rows: Iterator[tuple], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Serialize baris ke CSV (header + satu string per chunk baris)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    yield buffer.getvalue()
+
+
+def to_ndjson(columns: Tuple[str, ...], rows: Iterator[tuple], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Serialize baris ke NDJSON (satu object per baris, satu string per chunk)"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, row)), default=str))
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def export(db, kind: str, fmt: str = 'csv', filters: ExportFilter = ExportFilter(),
+           chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Export links atau klik sebagai generator string
+
+    Args:
+        db: DatabaseManager
+        kind: 'links' atau 'clicks'
+        fmt: 'csv' atau 'ndjson'
+        filters: Filter export
+        chunk_size: Jumlah baris per query dan per string output
+
+    Returns:
+        Generator potongan output (memory konstan)
+    """
+    if kind not in QUERIES:
+        raise ValueError(f'Jenis export tidak dikenal: {kind} (pilih {", ".join(QUERIES)})')
+    if fmt not in FORMATS:
+        raise ValueError(f'Format tidak dikenal: {fmt} (pilih {", ".join(FORMATS)})')
+    rows = iter_rows(db, kind, filters, chunk_size)
+    serialize = to_csv if fmt == 'csv' else to_ndjson
+    return serialize(QUERIES[kind].columns, rows, chunk_size)
+
+
+def main(argv: Optional[List[str]] = None):
+    """CLI untuk export ke file atau stdout"""
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from config.config import Config
+
+    parser = argparse.ArgumentParser(prog='python -m database export', description='Export links atau klik (streaming)')
+    parser.add_argument('kind', choices=list(QUERIES), help='Data yang di-export')
+    parser.add_argument('--db', default=Config.DATABASE_PATH, help='Path ke database SQLite')
+    parser.add_argument('--format', choices=list(FORMATS), default='csv', help='Format output')
+    parser.add_argument('--user', help='Filter user ID pembuat link')
+    parser.add_argument('--domain', help='Filter domain link')
+    parser.add_argument('--since', help='Mulai tanggal (inklusif), YYYY-MM-DD[THH:MM:SS]')
+    parser.add_argument('--until', help='Sampai tanggal (eksklusif), YYYY-MM-DD[THH:MM:SS]')
+    parser.add_argument('--output', help='File output (default stdout)')
+    parser.add_argument('--chunk-size', type=int, default=Config.EXPORT_CHUNK_SIZE, help='Baris per query')
+    args = parser.parse_args(argv)
+
+    try:
+        filters = make_filter(args.user, args.domain, args.since, args.until)
+    except ValueError as e:
+        parser.error(str(e))
+
+    from .db_manager import DatabaseManager
+
+    # Log init database ke stderr supaya stdout hanya berisi data export
+    with contextlib.redirect_stdout(sys.stderr):
+        db = DatabaseManager(args.db)
+    out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for part in export(db, args.kind, args.format, filters, args.chunk_size):
+            out.write(part)
+    finally:
+        if args.output:
+            out.close()
+        db.pool.close_all()
+
+
+if __name__ == '__main__':
+    main()
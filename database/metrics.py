@@ -0,0 +1,347 @@
+"""
+Metrics in-process (format teks Prometheus)
+
+Counter dan histogram di sini dipakai di jalur redirect, jadi dibuat
+seringan mungkin: satu lock per seri (hampir tidak pernah contended)
+dan bisect ke bucket. Nilai yang sudah ada di object lain (statistik
+cache, pool, click queue) tidak dihitung ulang per request, tetapi
+dibaca saat /metrics di-scrape lewat collector.
+"""
+import bisect
+import functools
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Latency dalam detik: 50µs (cache hit) sampai 5s (busy timeout SQLite)
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+
+class MetricFamily(NamedTuple):
+    """Hasil collector: satu metric beserta semua sample-nya"""
+    name: str
+    type: str  # counter, gauge, histogram
+    help: str
+    samples: List[Tuple[str, Dict[str, str], float]]  # (nama sample, labels, value)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ('buckets', 'counts', 'sum', '_lock')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # slot terakhir = +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class _Metric:
+    """Base untuk metric dengan label"""
+
+    type = ''
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Get seri untuk kombinasi label (dibuat sekali, lalu dict lookup)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f'{self.name}: expected labels {self.labelnames}, got {values}')
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _reset(self):
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def collect(self) -> MetricFamily:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Counter yang hanya naik"""
+
+    type = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        """Increment counter tanpa label"""
+        self.labels().inc(amount)
+
+    def collect(self) -> MetricFamily:
+        samples = [
+            (self.name, dict(zip(self.labelnames, values)), child.value)
+            for values, child in list(self._children.items())
+        ]
+        return MetricFamily(self.name, self.type, self.help, samples)
+
+
+class Histogram(_Metric):
+    """Histogram dengan bucket tetap (kumulatif saat di-render)"""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        """Observe nilai tanpa label"""
+        self.labels().observe(value)
+
+    def collect(self) -> MetricFamily:
+        samples = []
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                samples.append((self.name + '_bucket', {**labels, 'le': _format_value(float(bound))}, cumulative))
+            samples.append((self.name + '_sum', labels, total))
+            samples.append((self.name + '_count', labels, cumulative))
+        return MetricFamily(self.name, self.type, self.help, samples)
+
+
+class Registry:
+    """Kumpulan metric + collector yang di-render ke format Prometheus"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[MetricFamily]]):
+        """Tambah fungsi yang dipanggil saat scrape (untuk nilai dari stats())"""
+        self._collectors.append(collector)
+
+    def collect(self) -> List[MetricFamily]:
+        families = [metric.collect() for metric in self._metrics]
+        for collector in self._collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                print(f"⚠️  Metrics collector error: {e}")
+        return families
+
+    def render(self) -> str:
+        """Render semua metric ke format teks Prometheus"""
+        lines = []
+        for family in self.collect():
+            lines.append(f'# HELP {family.name} {family.help}')
+            lines.append(f'# TYPE {family.name} {family.type}')
+            for name, labels, value in family.samples:
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def _reset_after_fork(self):
+        """Proses child mulai dari nol (dan tidak mewarisi lock yang sedang dipegang)"""
+        for metric in self._metrics:
+            metric._reset()
+
+
+REGISTRY = Registry()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=REGISTRY._reset_after_fork)
+
+
+# Metrics database
+DB_CALL_DURATION = REGISTRY.histogram(
+    'shortlink_db_call_duration_seconds',
+    'Durasi method DatabaseManager',
+    ('method',)
+)
+DB_CALL_ERRORS = REGISTRY.counter(
+    'shortlink_db_call_errors_total',
+    'Exception dari method DatabaseManager',
+    ('method',)
+)
+DB_LOCK_TIMEOUTS = REGISTRY.counter(
+    'shortlink_db_lock_timeouts_total',
+    'Operasi yang gagal karena database is locked/busy setelah busy_timeout',
+    ('method',)
+)
+
+
+def _is_lock_error(error: sqlite3.OperationalError) -> bool:
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def timed_methods(exclude: Sequence[str] = ()):
+    """
+    Class decorator: catat durasi setiap method public ke DB_CALL_DURATION
+
+    Seri per method dibuat sekali saat class didefinisikan, jadi overhead
+    per call hanya perf_counter() dua kali dan satu observe().
+
+    Args:
+        exclude: Nama method yang tidak di-instrument
+    """
+    def decorate(cls):
+        for name, func in list(vars(cls).items()):
+            if name.startswith('_') or name in exclude or not callable(func):
+                continue
+            setattr(cls, name, _timed(name, func))
+        return cls
+    return decorate
+
+
+def _timed(name: str, func: Callable) -> Callable:
+    # Series di-resolve lewat labels() per call supaya tetap benar setelah
+    # reset di proses child (dict lookup, tanpa lock)
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except sqlite3.OperationalError as e:
+            if _is_lock_error(e):
+                DB_LOCK_TIMEOUTS.labels(name).inc()
+            DB_CALL_ERRORS.labels(name).inc()
+            raise
+        except Exception:
+            DB_CALL_ERRORS.labels(name).inc()
+            raise
+        finally:
+            DB_CALL_DURATION.labels(name).observe(time.perf_counter() - started)
+    return wrapper
+
+
+def database_collector(db) -> Callable[[], List[MetricFamily]]:
+    """
+    Collector untuk statistik DatabaseManager (cache, pool, click queue)
+
+    Args:
+        db: DatabaseManager (disimpan sebagai weakref)
+    """
+    ref = weakref.ref(db)
+
+    def collect() -> List[MetricFamily]:
+        db = ref()
+        if db is None:
+            return []
+
+        link = db.link_cache.stats()
+        negative = db.negative_cache.stats()
+        caches = {'link': link, 'negative': negative}
+        pool = db.pool.stats()
+        clicks = db.click_queue.stats()
+
+        def per_cache(key: str) -> List[Tuple[Dict[str, str], float]]:
+            return [({'cache': name}, stats[key]) for name, stats in caches.items()]
+
+        def ratio(stats: Dict) -> float:
+            lookups = stats['hits'] + stats['misses']
+            return round(stats['hits'] / lookups, 4) if lookups else 0.0
+
+        families = [
+            ('shortlink_cache_hits_total', 'counter', 'Cache hit', per_cache('hits')),
+            ('shortlink_cache_misses_total', 'counter', 'Cache miss', per_cache('misses')),
+            ('shortlink_cache_hit_ratio', 'gauge', 'Hit ratio sejak proses start',
+             [({'cache': name}, ratio(stats)) for name, stats in caches.items()]),
+            ('shortlink_cache_entries', 'gauge', 'Jumlah entry di cache', per_cache('size')),
+            ('shortlink_cache_evictions_total', 'counter', 'Entry link cache yang dibuang (LRU)',
+             [({'cache': 'link'}, link['evictions'])]),
+            ('shortlink_click_queue_depth', 'gauge', 'Klik yang menunggu ditulis',
+             [({}, clicks['depth'])]),
+            ('shortlink_click_queue_enqueued_total', 'counter', 'Klik yang masuk queue',
+             [({}, clicks['enqueued'])]),
+            ('shortlink_click_queue_rejected_total', 'counter', 'Klik yang ditulis langsung karena queue penuh',
+             [({}, clicks['rejected'])]),
+            ('shortlink_click_queue_flushed_total', 'counter', 'Klik yang sudah ditulis ke database',
+             [({}, clicks['flushed'])]),
+            ('shortlink_click_queue_flush_errors_total', 'counter', 'Batch klik yang gagal ditulis',
+             [({}, clicks['errors'])]),
+            ('shortlink_click_queue_dropped_total', 'counter', 'Klik yang dibuang setelah flush terus gagal',
+             [({}, clicks['dropped'])]),
+            ('shortlink_db_pool_connections', 'gauge', 'Koneksi SQLite di pool',
+             [({'state': 'idle'}, pool['idle']), ({'state': 'in_use'}, pool['in_use'])]),
+            ('shortlink_db_pool_waits_total', 'counter', 'Acquire yang harus menunggu koneksi',
+             [({}, pool['waits'])]),
+            ('shortlink_db_pool_wait_seconds_total', 'counter', 'Total waktu menunggu koneksi',
+             [({}, pool['wait_time_ms'] / 1000)]),
+            ('shortlink_db_pool_timeouts_total', 'counter', 'Acquire yang timeout',
+             [({}, pool['timeouts'])]),
+        ]
+        return [
+            MetricFamily(name, kind, help, [(name, labels, value) for labels, value in samples])
+            for name, kind, help, samples in families
+        ]
+
+    return collect
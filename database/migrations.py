@@ -0,0 +1,498 @@
+"""
+Versioned schema migrations untuk database SQLite
+
+Setiap migrasi punya nomor versi berurutan dan dicatat di table
+schema_migrations. DDL dan pencatatan versi dijalankan dalam satu
+transaksi, jadi DDL tidak pernah dijalankan dua kali. Backfill data
+dijalankan per batch kecil (satu commit per batch) supaya redirect tidak
+ter-block lama; posisi backfill (backfill_cursor) ikut di-commit setiap
+batch, sehingga backfill yang terputus (crash, restart) dilanjutkan dari
+batch terakhir, bukan diulang dari awal.
+
+Usage:
+    python -m database migrate              # jalankan migrasi pending
+    python -m database migrate --status     # lihat versi schema
+    python -m database migrate --dry-run    # EXPLAIN QUERY PLAN sebelum & sesudah
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from . import codegen, counters
+
+# Backfill: (conn, last_key, batch_size) -> (next_last_key atau None jika selesai, rows)
+Backfill = Callable[[sqlite3.Connection, int, int], Tuple[Optional[int], int]]
+# Statement: SQL, atau fungsi (conn) untuk DDL yang butuh pengecekan dulu
+Statement = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+class Migration(NamedTuple):
+    """Satu langkah migrasi schema"""
+    version: int
+    name: str
+    statements: Tuple[Statement, ...]
+    backfill: Optional[Backfill] = None
+
+
+def add_column(table: str, column: str, definition: str) -> Callable[[sqlite3.Connection], None]:
+    """
+    Statement ALTER TABLE ADD COLUMN yang aman dijalankan ulang
+
+    SQLite tidak punya ADD COLUMN IF NOT EXISTS; kolom dicek dulu lewat
+    PRAGMA table_info (mis. database yang migrasinya terputus sebelum
+    versinya tercatat).
+    """
+    def statement(conn: sqlite3.Connection):
+        columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        if column not in columns:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    return statement
+
+
+def _execute(conn: sqlite3.Connection, statement: Statement):
+    if callable(statement):
+        statement(conn)
+    else:
+        conn.execute(statement)
+
+
+# ---------------------------------------------------------------------------
+# Backfills
+# ---------------------------------------------------------------------------
+
+def _backfill_link_keys(conn: sqlite3.Connection, last_id: int, batch_size: int) -> Tuple[Optional[int], int]:
+    """Isi link_keys dari short_links untuk satu range id"""
+    row = conn.execute('''
+        SELECT MAX(id), COUNT(*) FROM (
+            SELECT id FROM short_links WHERE id > ? ORDER BY id LIMIT ?
+        )
+    ''', (last_id, batch_size)).fetchone()
+    upper, count = row
+    if not count:
+        return None, 0
+
+    conn.execute('''
+        INSERT OR IGNORE INTO link_keys (domain, key, link_id)
+        SELECT domain, short_code, id FROM short_links
+        WHERE id > ? AND id <= ? AND domain IS NOT NULL
+    ''', (last_id, upper))
+    conn.execute('''
+        INSERT OR IGNORE INTO link_keys (domain, key, link_id)
+        SELECT domain, custom_alias, id FROM short_links
+        WHERE id > ? AND id <= ? AND domain IS NOT NULL
+        AND custom_alias IS NOT NULL AND custom_alias != short_code
+    ''', (last_id, upper))
+    return upper, count
+
+
+def _backfill_click_link_ids(conn: sqlite3.Connection, last_id: int, batch_size: int) -> Tuple[Optional[int], int]:
+    """Isi click_logs.link_id dari short_code untuk satu range id"""
+    row = conn.execute('''
+        SELECT MAX(id), COUNT(*) FROM (
+            SELECT id FROM click_logs WHERE id > ? ORDER BY id LIMIT ?
+        )
+    ''', (last_id, batch_size)).fetchone()
+    upper, count = row
+    if not count:
+        return None, 0
+
+    # Link dengan alias menyimpan alias sebagai short_code, jadi cukup
+    # lewat index UNIQUE short_code; klik link yang sudah dihapus tetap NULL
+    conn.execute('''
+        UPDATE click_logs
+        SET link_id = (SELECT id FROM short_links WHERE short_code = click_logs.short_code)
+        WHERE id > ? AND id <= ? AND link_id IS NULL
+    ''', (last_id, upper))
+    return upper, count
+
+
+# ---------------------------------------------------------------------------
+# Daftar migrasi (urut berdasarkan versi, jangan ubah migrasi yang sudah rilis)
+# ---------------------------------------------------------------------------
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'initial_schema', (
+        '''
+        CREATE TABLE IF NOT EXISTS short_links (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            short_code TEXT NOT NULL UNIQUE,
+            original_url TEXT NOT NULL,
+            custom_alias TEXT,
+            domain TEXT DEFAULT 'default',
+            clicks INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_by TEXT,
+            is_active INTEGER DEFAULT 1
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS custom_domains (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            domain TEXT NOT NULL UNIQUE,
+            user_id TEXT NOT NULL,
+            telegram_username TEXT,
+            is_active INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS click_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            short_code TEXT NOT NULL,
+            clicked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            ip_address TEXT,
+            user_agent TEXT,
+            referer TEXT
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_short_code ON short_links(short_code)',
+        'CREATE INDEX IF NOT EXISTS idx_domain ON short_links(domain)',
+        'CREATE INDEX IF NOT EXISTS idx_custom_alias ON short_links(custom_alias)',
+    )),
+    Migration(2, 'link_keys', (
+        '''
+        CREATE TABLE IF NOT EXISTS link_keys (
+            domain TEXT NOT NULL,
+            key TEXT NOT NULL,
+            link_id INTEGER NOT NULL REFERENCES short_links(id),
+            PRIMARY KEY (domain, key)
+        ) WITHOUT ROWID
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_link_keys_link ON link_keys(link_id)',
+        'DROP INDEX IF EXISTS idx_alias_domain',
+    ), _backfill_link_keys),
+    Migration(3, 'partial_active_indexes', (
+        # Index lama yang sudah tidak dipakai (short_code sudah punya index UNIQUE,
+        # lookup alias lewat link_keys)
+        'DROP INDEX IF EXISTS idx_short_code',
+        'DROP INDEX IF EXISTS idx_custom_alias',
+        # get_user_links / get_stats(user_id)
+        '''
+        CREATE INDEX IF NOT EXISTS idx_links_user_active
+        ON short_links(created_by, created_at) WHERE is_active = 1
+        ''',
+        # get_recent_links
+        '''
+        CREATE INDEX IF NOT EXISTS idx_links_recent_active
+        ON short_links(created_at) WHERE is_active = 1
+        ''',
+    )),
+    # Counter dihitung sekali dalam transaksi DDL supaya konsisten dengan trigger
+    Migration(4, 'stats_counters', counters.SCHEMA + counters.TRIGGERS + counters.RECONCILE),
+    # Counter + key untuk alokasi short code (key acak per database)
+    Migration(5, 'code_sequence', codegen.SCHEMA),
+    Migration(6, 'code_free_ranges', codegen.FREE_RANGES_SCHEMA),
+    # Export & statistik klik per link tanpa join lewat short_code
+    Migration(7, 'click_logs_link_id', (
+        add_column('click_logs', 'link_id', 'INTEGER'),
+        'CREATE INDEX IF NOT EXISTS idx_click_logs_link ON click_logs(link_id, clicked_at)',
+    ), _backfill_click_link_ids),
+    Migration(8, 'telegram_files', (
+        '''
+        CREATE TABLE IF NOT EXISTS telegram_files (
+            content_hash TEXT PRIMARY KEY,
+            file_id TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+        ''',
+    )),
+    # Nomor urut perubahan link (nonaktif / aktif lagi / URL diganti), supaya
+    # proses lain bisa meng-invalidate link cache-nya tanpa menunggu TTL
+    Migration(9, 'link_change_seq', (
+        add_column('short_links', 'change_seq', 'INTEGER'),
+        'CREATE INDEX IF NOT EXISTS idx_short_links_change_seq ON short_links(change_seq)',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_short_links_change_seq
+        AFTER UPDATE OF is_active, original_url ON short_links
+        WHEN OLD.is_active IS NOT NEW.is_active OR OLD.original_url IS NOT NEW.original_url
+        BEGIN
+            UPDATE short_links
+            SET change_seq = (SELECT COALESCE(MAX(change_seq), 0) + 1 FROM short_links)
+            WHERE id = NEW.id;
+        END
+        ''',
+    )),
+]
+
+# Query yang ada di jalur panas, untuk dry-run EXPLAIN QUERY PLAN
+HOT_QUERIES: List[Tuple[str, str, tuple]] = [
+    ('resolve_link', '''
+        SELECT l.id, l.original_url FROM link_keys k
+        JOIN short_links l ON l.id = k.link_id
+        WHERE k.domain IN (?, 'default') AND k.key = ? AND l.is_active = 1
+        ORDER BY k.domain = ? DESC LIMIT 1
+    ''', ('example.com', 'abc123', 'example.com')),
+    ('get_user_links', '''
+        SELECT short_code, original_url FROM short_links
+        WHERE created_by = ? AND is_active = 1
+        ORDER BY created_at DESC LIMIT ?
+    ''', ('123', 10)),
+    ('get_stats_user', '''
+        SELECT links, clicks FROM user_link_counts WHERE user_id = ?
+    ''', ('123',)),
+    ('get_stats', '''
+        SELECT name, value FROM stats_counters
+    ''', ()),
+    ('get_recent_links', '''
+        SELECT short_code, original_url FROM short_links
+        WHERE is_active = 1 ORDER BY created_at DESC LIMIT ?
+    ''', (10,)),
+    ('get_active_users', '''
+        SELECT user_id, links, clicks FROM user_link_counts
+        WHERE links > 0 ORDER BY links DESC LIMIT ?
+    ''', (10,)),
+    ('flush_click_counter', '''
+        UPDATE short_links SET clicks = clicks + ? WHERE id = ?
+    ''', (1, 1)),
+]
+
+
+class SchemaMigrator:
+    """Menjalankan migrasi pending pada satu koneksi SQLite"""
+
+    def __init__(self, conn: sqlite3.Connection, migrations: Optional[List[Migration]] = None,
+                 batch_size: int = 1000, batch_pause: float = 0.05, verbose: bool = True):
+        """
+        Initialize migrator
+
+        Args:
+            conn: Koneksi SQLite
+            migrations: Daftar migrasi (default: MIGRATIONS)
+            batch_size: Jumlah baris per batch backfill
+            batch_pause: Jeda antar batch (detik) supaya writer lain kebagian lock
+            verbose: Print progress
+        """
+        self.conn = conn
+        self.migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.verbose = verbose
+
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
+
+    def _ensure_version_table(self):
+        """Buat table schema_migrations jika belum ada"""
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                backfill_cursor INTEGER
+            )
+        ''')
+        # Database lama: table dibuat sebelum ada kolom backfill_cursor
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(schema_migrations)')}
+        if 'backfill_cursor' not in columns:
+            self.conn.execute('ALTER TABLE schema_migrations ADD COLUMN backfill_cursor INTEGER')
+        self.conn.commit()
+
+    def _applied(self) -> Dict[int, Optional[int]]:
+        """Versi yang sudah dicatat -> backfill_cursor (None = backfill selesai)"""
+        self._ensure_version_table()
+        return dict(self.conn.execute('SELECT version, backfill_cursor FROM schema_migrations'))
+
+    def current_version(self) -> int:
+        """Versi schema saat ini (0 jika belum ada migrasi)"""
+        return max(self._applied(), default=0)
+
+    def pending(self) -> List[Migration]:
+        """Migrasi yang belum dijalankan (termasuk versi yang terlewat di tengah)"""
+        applied = self._applied()
+        return [m for m in self.migrations if m.version not in applied]
+
+    def pending_backfills(self) -> List[Migration]:
+        """Migrasi yang DDL-nya sudah jalan tetapi backfill-nya belum selesai"""
+        applied = self._applied()
+        return [
+            m for m in self.migrations
+            if m.backfill and m.version in applied and applied[m.version] is not None
+        ]
+
+    def migrate(self) -> List[Migration]:
+        """
+        Jalankan semua migrasi pending dan lanjutkan backfill yang terputus
+
+        Returns:
+            List migrasi yang dijalankan
+        """
+        applied = []
+        pending = {m.version for m in self.pending()}
+        resumable = {m.version for m in self.pending_backfills()}
+        for migration in self.migrations:
+            if migration.version in resumable:
+                self._log(f"🔁 Resuming backfill {migration.version:03d} {migration.name}")
+                self._run_backfill(migration)
+            elif migration.version in pending and self._apply(migration):
+                applied.append(migration)
+        return applied
+
+    def _apply(self, migration: Migration) -> bool:
+        """Jalankan satu migrasi: DDL + catat versi dalam satu transaksi, lalu backfill per batch"""
+        conn = self.conn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Cek ulang setelah dapat lock (proses lain mungkin sudah migrasi)
+            row = conn.execute(
+                'SELECT 1 FROM schema_migrations WHERE version = ?', (migration.version,)
+            ).fetchone()
+            if row:
+                conn.rollback()
+                return False
+
+            for statement in migration.statements:
+                _execute(conn, statement)
+            # Versi dicatat di transaksi yang sama dengan DDL; backfill_cursor
+            # 0 menandai backfill yang masih harus dijalankan
+            conn.execute(
+                'INSERT INTO schema_migrations (version, name, backfill_cursor) VALUES (?, ?, ?)',
+                (migration.version, migration.name, 0 if migration.backfill else None)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        if migration.backfill:
+            self._run_backfill(migration)
+
+        self._log(f"✅ Migration {migration.version:03d} {migration.name} applied")
+        return True
+
+    def _run_backfill(self, migration: Migration):
+        """
+        Backfill per batch, satu commit per batch
+
+        Cursor dibaca dan disimpan di transaksi yang sama dengan batch-nya,
+        jadi beberapa proses yang startup bersamaan saling melanjutkan
+        (tidak mengulang batch yang sama) dan crash hanya kehilangan batch
+        yang sedang berjalan.
+        """
+        conn = self.conn
+        total = 0
+        started = time.monotonic()
+        while True:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute(
+                    'SELECT backfill_cursor FROM schema_migrations WHERE version = ?', (migration.version,)
+                ).fetchone()
+                if row is None or row[0] is None:
+                    # Sudah diselesaikan proses lain
+                    conn.rollback()
+                    break
+                next_key, rows = migration.backfill(conn, row[0], self.batch_size)
+                conn.execute(
+                    'UPDATE schema_migrations SET backfill_cursor = ? WHERE version = ?',
+                    (next_key, migration.version)
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+            total += rows
+            if next_key is None:
+                break
+            if self.batch_pause:
+                time.sleep(self.batch_pause)
+
+        if total:
+            self._log(
+                f"   Backfilled {total} rows for {migration.name} "
+                f"in {time.monotonic() - started:.1f}s"
+            )
+
+    def explain(self, sql: str, params: tuple) -> List[str]:
+        """EXPLAIN QUERY PLAN untuk satu query"""
+        try:
+            rows = self.conn.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+        except sqlite3.Error as e:
+            return [f'(error: {e})']
+        return [row[3] for row in rows]
+
+    def dry_run(self, queries: Optional[List[Tuple[str, str, tuple]]] = None) -> List[Migration]:
+        """
+        Tampilkan query plan sebelum & sesudah migrasi pending tanpa mengubah database
+
+        DDL dijalankan dalam transaksi lalu di-rollback; backfill tidak dijalankan.
+
+        Returns:
+            List migrasi pending
+        """
+        queries = queries or HOT_QUERIES
+        pending = self.pending()
+
+        print(f"Schema version: {self.current_version()}")
+        if not pending:
+            print("No pending migrations.")
+        for migration in pending:
+            backfill = ' (+ batched backfill)' if migration.backfill else ''
+            print(f"Pending: {migration.version:03d} {migration.name}{backfill}")
+        for migration in self.pending_backfills():
+            print(f"Backfill belum selesai: {migration.version:03d} {migration.name}")
+
+        before = {name: self.explain(sql, params) for name, sql, params in queries}
+
+        conn = self.conn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for migration in pending:
+                for statement in migration.statements:
+                    _execute(conn, statement)
+            after = {name: self.explain(sql, params) for name, sql, params in queries}
+        finally:
+            conn.rollback()
+
+        for name, _, _ in queries:
+            print("")
+            print(f"== {name}")
+            print("   before:")
+            for line in before[name]:
+                print(f"     {line}")
+            print("   after:")
+            for line in after[name]:
+                print(f"     {line}")
+
+        return pending
+
+
+def main(argv: Optional[List[str]] = None):
+    """CLI untuk migrasi schema"""
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from config.config import Config
+
+    parser = argparse.ArgumentParser(prog='python -m database migrate', description='Schema migrations untuk shortlink database')
+    parser.add_argument('--db', default=Config.DATABASE_PATH, help='Path ke database SQLite')
+    parser.add_argument('--dry-run', action='store_true', help='Tampilkan EXPLAIN QUERY PLAN sebelum & sesudah')
+    parser.add_argument('--status', action='store_true', help='Tampilkan versi schema dan migrasi pending')
+    parser.add_argument('--batch-size', type=int, default=Config.MIGRATION_BATCH_SIZE)
+    parser.add_argument('--batch-pause', type=float, default=Config.MIGRATION_BATCH_PAUSE)
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db, timeout=Config.DB_BUSY_TIMEOUT / 1000)
+    try:
+        migrator = SchemaMigrator(conn, batch_size=args.batch_size, batch_pause=args.batch_pause)
+        if args.dry_run:
+            migrator.dry_run()
+        elif args.status:
+            print(f"Schema version: {migrator.current_version()}")
+            for migration in migrator.pending():
+                print(f"Pending: {migration.version:03d} {migration.name}")
+            for migration in migrator.pending_backfills():
+                print(f"Backfill belum selesai: {migration.version:03d} {migration.name}")
+        else:
+            resumed = migrator.pending_backfills()
+            applied = migrator.migrate()
+            if not applied and not resumed:
+                print("Schema is up to date.")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
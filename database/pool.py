@@ -0,0 +1,246 @@
+"""
+Connection pool untuk SQLite
+"""
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .cache import shared_for_database
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """Tidak ada koneksi yang tersedia dalam batas waktu"""
+
+
+# Semua pool di proses ini (untuk reset setelah fork)
+_pools: 'weakref.WeakSet[ConnectionPool]' = weakref.WeakSet()
+
+# Koneksi warisan parent setelah fork: tidak boleh dipakai atau ditutup di
+# child (close bisa checkpoint / hapus file WAL milik parent), jadi cukup
+# disimpan supaya tidak pernah di-finalize.
+_inherited_connections: List[sqlite3.Connection] = []
+
+
+def _reset_pools_after_fork():
+    """Lepas semua koneksi warisan parent di proses child"""
+    for pool in list(_pools):
+        pool._reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+
+class ConnectionPool:
+    """
+    Pool koneksi SQLite yang dipakai ulang antar request
+
+    Koneksi dibuat dengan check_same_thread=False sehingga bisa dipakai
+    bergantian oleh Flask threads, flusher dan event loop bot (satu thread
+    per koneksi pada satu waktu). Setup koneksi (PRAGMA, statement cache)
+    hanya dilakukan sekali saat koneksi dibuat.
+    """
+
+    def __init__(self, db_path: str, max_size: int = 16, timeout: float = 10.0,
+                 busy_timeout: float = 5.0, cached_statements: int = 256,
+                 health_check_interval: float = 30.0,
+                 on_connect: Optional[Callable[[sqlite3.Connection], None]] = None):
+        """
+        Initialize connection pool
+
+        Args:
+            db_path: Path ke database SQLite
+            max_size: Jumlah koneksi maksimal
+            timeout: Waktu tunggu maksimal jika pool habis (detik)
+            busy_timeout: Waktu tunggu lock SQLite (detik)
+            cached_statements: Ukuran statement cache per koneksi
+            health_check_interval: Koneksi yang idle lebih lama dari ini dicek dulu
+            on_connect: Callback untuk setup koneksi baru (mis. PRAGMA)
+        """
+        self.db_path = db_path
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+        self.health_check_interval = health_check_interval
+        self.on_connect = on_connect
+
+        # Stack (LIFO) koneksi idle: (connection, idle_since)
+        self._idle: List[Tuple[sqlite3.Connection, float]] = []
+        self._size = 0
+        self._cond = threading.Condition(threading.Lock())
+
+        # Counters
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.timeouts = 0
+        self.peak_in_use = 0
+
+        _pools.add(self)
+
+    @classmethod
+    def for_database(cls, db_path: str, **kwargs) -> 'ConnectionPool':
+        """Get pool bersama untuk satu file database"""
+        return shared_for_database('connection_pool', db_path, lambda: cls(db_path, **kwargs))
+
+    @property
+    def in_use(self) -> int:
+        """Jumlah koneksi yang sedang dipinjam"""
+        return self._size - len(self._idle)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Buat koneksi baru"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        try:
+            if self.on_connect:
+                self.on_connect(conn)
+        except Exception:
+            conn.close()
+            raise
+        self.created += 1
+        return conn
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        """Cek koneksi masih bisa dipakai"""
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Pinjam koneksi dari pool
+
+        Returns:
+            sqlite3.Connection (kembalikan dengan release())
+
+        Raises:
+            PoolTimeout: Jika pool habis sampai timeout
+        """
+        with self._cond:
+            if not self._idle and self._size >= self.max_size:
+                self.waits += 1
+                started = time.monotonic()
+                deadline = started + self.timeout
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise PoolTimeout(
+                            f'No database connection available after {self.timeout}s '
+                            f'(pool size {self.max_size})'
+                        )
+                    self._cond.wait(remaining)
+                self.wait_time += time.monotonic() - started
+
+            if self._idle:
+                conn, idle_since = self._idle.pop()
+            else:
+                conn, idle_since = None, 0.0
+                self._size += 1
+
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+        if conn is not None:
+            if time.monotonic() - idle_since < self.health_check_interval or self._is_healthy(conn):
+                self.reused += 1
+                return conn
+            self._discard(conn, keep_slot=True)
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn: sqlite3.Connection):
+        """
+        Kembalikan koneksi ke pool
+
+        Transaksi yang belum di-commit akan di-rollback.
+        """
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self, conn: sqlite3.Connection, keep_slot: bool = False):
+        """Tutup koneksi yang rusak"""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        self.discarded += 1
+        if not keep_slot:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager: pinjam koneksi lalu kembalikan otomatis"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        """Tutup semua koneksi idle (mis. setelah fork atau saat shutdown)"""
+        with self._cond:
+            idle = self._idle
+            self._idle = []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def _reset_after_fork(self):
+        """Mulai dengan pool kosong di proses child (koneksi parent ditinggalkan)"""
+        _inherited_connections.extend(conn for conn, _ in self._idle)
+        self._idle = []
+        self._size = 0
+        self._cond = threading.Condition(threading.Lock())
+
+    def stats(self) -> Dict:
+        """Get statistik pool"""
+        with self._cond:
+            size = self._size
+            idle = len(self._idle)
+        return {
+            'max_size': self.max_size,
+            'size': size,
+            'idle': idle,
+            'in_use': size - idle,
+            'peak_in_use': self.peak_in_use,
+            'created': self.created,
+            'reused': self.reused,
+            'discarded': self.discarded,
+            'waits': self.waits,
+            'wait_time_ms': round(self.wait_time * 1000, 3),
+            'timeouts': self.timeouts
+        }
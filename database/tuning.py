@@ -0,0 +1,214 @@
+"""
+SQLite tuning profile (PRAGMA) dan WAL checkpoint policy
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config.config import Config
+from .cache import shared_for_database
+
+JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+TEMP_STORES = ('DEFAULT', 'FILE', 'MEMORY')
+
+# Nilai PRAGMA yang dilaporkan saat startup
+REPORTED_PRAGMAS = (
+    'journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'temp_store',
+    'busy_timeout', 'wal_autocheckpoint', 'page_size'
+)
+
+# PRAGMA synchronous / temp_store mengembalikan angka
+_SYNCHRONOUS_NAMES = {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'}
+_TEMP_STORE_NAMES = {0: 'DEFAULT', 1: 'FILE', 2: 'MEMORY'}
+
+
+def _choice(value: str, choices: tuple, name: str) -> str:
+    """Validasi nilai PRAGMA berbasis keyword"""
+    value = value.upper()
+    if value not in choices:
+        raise ValueError(f"{name} tidak valid: {value} (pilihan: {', '.join(choices)})")
+    return value
+
+
+class SqliteTuning:
+    """
+    Profile PRAGMA untuk semua koneksi SQLite
+
+    journal_mode disimpan di file database, jadi cukup di-set sekali saat
+    init. PRAGMA lain berlaku per koneksi dan diterapkan saat pool membuat
+    koneksi baru.
+    """
+
+    def __init__(self, db_path: str, journal_mode: str = 'WAL', synchronous: str = 'NORMAL',
+                 mmap_size: int = 0, cache_size: int = -2000, temp_store: str = 'DEFAULT',
+                 busy_timeout: int = 5000, wal_autocheckpoint: int = 1000,
+                 checkpoint_interval: float = 300.0, wal_truncate_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize tuning profile
+
+        Args:
+            db_path: Path ke database SQLite
+            journal_mode: PRAGMA journal_mode (WAL supaya reader tidak block writer)
+            synchronous: PRAGMA synchronous (NORMAL aman untuk WAL)
+            mmap_size: PRAGMA mmap_size dalam bytes (0 = nonaktif)
+            cache_size: PRAGMA cache_size (negatif = KiB, positif = pages)
+            temp_store: PRAGMA temp_store
+            busy_timeout: PRAGMA busy_timeout dalam milidetik
+            wal_autocheckpoint: Checkpoint otomatis setiap N pages WAL
+            checkpoint_interval: Interval checkpoint PASSIVE manual (detik, 0 = nonaktif)
+            wal_truncate_bytes: Jika file WAL lebih besar dari ini, checkpoint TRUNCATE
+        """
+        self.db_path = db_path
+        self.journal_mode = _choice(journal_mode, JOURNAL_MODES, 'DB_JOURNAL_MODE')
+        self.synchronous = _choice(synchronous, SYNCHRONOUS_MODES, 'DB_SYNCHRONOUS')
+        self.mmap_size = int(mmap_size)
+        self.cache_size = int(cache_size)
+        self.temp_store = _choice(temp_store, TEMP_STORES, 'DB_TEMP_STORE')
+        self.busy_timeout = int(busy_timeout)
+        self.wal_autocheckpoint = int(wal_autocheckpoint)
+        self.checkpoint_interval = checkpoint_interval
+        self.wal_truncate_bytes = wal_truncate_bytes
+
+        self._checkpoint_lock = threading.Lock()
+        self._last_checkpoint = time.monotonic()
+        self._next_check = 0.0
+        self.reported = False
+
+        # Counters
+        self.checkpoints = 0
+        self.truncates = 0
+        self.checkpoint_busy = 0
+        self.last_checkpoint_ms = 0.0
+
+    @classmethod
+    def from_config(cls, db_path: str) -> 'SqliteTuning':
+        """Buat profile dari Config / env"""
+        return cls(
+            db_path,
+            journal_mode=Config.DB_JOURNAL_MODE,
+            synchronous=Config.DB_SYNCHRONOUS,
+            mmap_size=Config.DB_MMAP_SIZE,
+            cache_size=Config.DB_CACHE_SIZE,
+            temp_store=Config.DB_TEMP_STORE,
+            busy_timeout=Config.DB_BUSY_TIMEOUT,
+            wal_autocheckpoint=Config.DB_WAL_AUTOCHECKPOINT,
+            checkpoint_interval=Config.DB_CHECKPOINT_INTERVAL,
+            wal_truncate_bytes=Config.DB_WAL_TRUNCATE_BYTES
+        )
+
+    @classmethod
+    def for_database(cls, db_path: str) -> 'SqliteTuning':
+        """Get tuning profile bersama untuk satu file database"""
+        return shared_for_database('tuning', db_path, lambda: cls.from_config(db_path))
+
+    def connection_pragmas(self) -> List[str]:
+        """PRAGMA yang diterapkan ke setiap koneksi baru"""
+        return [
+            f'PRAGMA busy_timeout = {self.busy_timeout}',
+            f'PRAGMA synchronous = {self.synchronous}',
+            f'PRAGMA cache_size = {self.cache_size}',
+            f'PRAGMA temp_store = {self.temp_store}',
+            f'PRAGMA mmap_size = {self.mmap_size}',
+            f'PRAGMA wal_autocheckpoint = {self.wal_autocheckpoint}',
+        ]
+
+    def apply(self, conn: sqlite3.Connection):
+        """Terapkan PRAGMA per-koneksi"""
+        for pragma in self.connection_pragmas():
+            conn.execute(pragma)
+
+    def apply_database(self, conn: sqlite3.Connection) -> str:
+        """
+        Set journal_mode (persisten di file database)
+
+        Returns:
+            journal_mode yang benar-benar aktif
+        """
+        return conn.execute(f'PRAGMA journal_mode = {self.journal_mode}').fetchone()[0]
+
+    def report(self, conn: sqlite3.Connection) -> Dict:
+        """Baca nilai PRAGMA yang benar-benar aktif pada koneksi"""
+        values = {}
+        for name in REPORTED_PRAGMAS:
+            row = conn.execute(f'PRAGMA {name}').fetchone()
+            values[name] = row[0] if row else None
+
+        values['synchronous'] = _SYNCHRONOUS_NAMES.get(values['synchronous'], values['synchronous'])
+        values['temp_store'] = _TEMP_STORE_NAMES.get(values['temp_store'], values['temp_store'])
+        values['wal_size_bytes'] = self.wal_size()
+        return values
+
+    def wal_size(self) -> int:
+        """Ukuran file WAL dalam bytes (0 jika tidak ada)"""
+        try:
+            return os.path.getsize(f'{self.db_path}-wal')
+        except OSError:
+            return 0
+
+    def checkpoint_due(self) -> bool:
+        """
+        Cek murah setelah write: apakah maybe_checkpoint perlu dijalankan
+
+        Ukuran WAL dicek paling sering sekali per detik, jadi aman dipanggil
+        setelah setiap write.
+        """
+        if self.journal_mode != 'WAL':
+            return False
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + 1.0
+        if self.checkpoint_interval > 0 and now - self._last_checkpoint >= self.checkpoint_interval:
+            return True
+        return self.wal_size() > self.wal_truncate_bytes
+
+    def maybe_checkpoint(self, conn: sqlite3.Connection) -> Optional[str]:
+        """
+        Jalankan checkpoint jika sudah waktunya
+
+        PASSIVE setiap checkpoint_interval, TRUNCATE jika file WAL sudah
+        lebih besar dari wal_truncate_bytes (supaya file tidak tumbuh terus
+        saat ada reader yang lama).
+
+        Returns:
+            Mode checkpoint yang dijalankan atau None
+        """
+        if self.journal_mode != 'WAL':
+            return None
+
+        wal_size = self.wal_size()
+        if wal_size > self.wal_truncate_bytes:
+            mode = 'TRUNCATE'
+        elif self.checkpoint_interval > 0 and time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+            mode = 'PASSIVE'
+        else:
+            return None
+
+        if not self._checkpoint_lock.acquire(blocking=False):
+            return None
+        try:
+            started = time.perf_counter()
+            busy, _, _ = conn.execute(f'PRAGMA wal_checkpoint({mode})').fetchone()
+            self.last_checkpoint_ms = round((time.perf_counter() - started) * 1000, 3)
+            self._last_checkpoint = time.monotonic()
+            self.checkpoints += 1
+            if mode == 'TRUNCATE':
+                self.truncates += 1
+            if busy:
+                self.checkpoint_busy += 1
+            return mode
+        finally:
+            self._checkpoint_lock.release()
+
+    def stats(self) -> Dict:
+        """Get statistik checkpoint"""
+        return {
+            'checkpoints': self.checkpoints,
+            'truncates': self.truncates,
+            'busy': self.checkpoint_busy,
+            'last_checkpoint_ms': self.last_checkpoint_ms,
+            'wal_size_bytes': self.wal_size()
+        }
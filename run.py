@@ -1,36 +1,47 @@
 #!/usr/bin/env python
 """
 Script untuk menjalankan bot dan web server sekaligus
+
+Usage:
+    python run.py                      # web server di thread proses bot
+    python run.py --workers 4          # supervisor: 4 web worker + proses bot
+    python run.py --workers 4 --no-bot # hanya web worker (redirect box)
 """
+import argparse
 import sys
 import os
 import threading
-import time
 
 # Tambahkan root directory ke Python path
 root_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, root_dir)
 
-from app.bot import TelegramBot
-from web.server import app
 from config.config import Config
 
+# Diset saat web server sudah listen (pengganti sleep sebelum start bot)
+web_ready = threading.Event()
+
 def run_web_server():
-    """Jalankan Flask web server"""
+    """Jalankan web server (Flask atau ASGI sesuai WEB_SERVER_MODE)"""
     try:
+        from web.server import app
+        
         print("📡 Starting Web Server...")
+        print(f"   Mode: {Config.WEB_SERVER_MODE}")
         print(f"   Host: {Config.WEB_HOST}")
         print(f"   Port: {Config.WEB_PORT}")
         print(f"   URL: http://localhost:{Config.WEB_PORT}")
         print(f"   Public: https://{Config.DEFAULT_SUBDOMAIN}.{Config.DEFAULT_DOMAIN}")
         print("")
         
-        app.run(
-            host=Config.WEB_HOST,
-            port=Config.WEB_PORT,
-            debug=False,
-            use_reloader=False
-        )
+        if Config.WEB_SERVER_MODE == 'asgi':
+            from web.asgi import run_asgi_server
+            run_asgi_server(host=Config.WEB_HOST, port=Config.WEB_PORT, on_ready=web_ready.set)
+        else:
+            from werkzeug.serving import make_server
+            server = make_server(Config.WEB_HOST, Config.WEB_PORT, app, threaded=True)
+            web_ready.set()
+            server.serve_forever()
     except Exception as e:
         print(f"❌ Web Server Error: {e}")
         sys.exit(1)
@@ -38,11 +49,14 @@ def run_web_server():
 def run_telegram_bot():
     """Jalankan Telegram Bot"""
     try:
-        time.sleep(2)  # Tunggu web server start dulu
+        # Tunggu web server listen dulu
+        if not web_ready.wait(timeout=30):
+            print("⚠️  Web server not ready, starting bot anyway")
         
         print("🤖 Starting Telegram Bot...")
         print("")
         
+        from app.bot import TelegramBot
         bot = TelegramBot()
         bot.run()
         
@@ -50,7 +64,35 @@ def run_telegram_bot():
         print(f"❌ Bot Error: {e}")
         sys.exit(1)
 
+def run_single_process():
+    """Bot di main thread, web server di thread terpisah"""
+    from web.server import db
+    
+    try:
+        # Start web server di thread terpisah
+        web_thread = threading.Thread(target=run_web_server, daemon=True)
+        web_thread.start()
+        
+        # Run telegram bot di main thread
+        run_telegram_bot()
+    finally:
+        # Tulis klik yang masih ada di queue sebelum keluar
+        db.flush_clicks()
+        db.release_code_block()
+
+def run_supervisor(workers: int, run_bot: bool):
+    """N proses web worker + proses bot, di-restart jika crash"""
+    from app.supervisor import Supervisor
+    
+    Supervisor(workers, run_bot=run_bot).run()
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Jalankan bot dan web server')
+    parser.add_argument('--workers', type=int, default=Config.WEB_WORKERS,
+                        help='Jumlah proses web worker (0 = web server di thread proses bot)')
+    parser.add_argument('--no-bot', action='store_true', help='Jangan jalankan bot (hanya web worker)')
+    args = parser.parse_args()
+    
     try:
         print("")
         print("=" * 60)
@@ -58,12 +100,10 @@ if __name__ == "__main__":
         print("=" * 60)
         print("")
         
-        # Start web server di thread terpisah
-        web_thread = threading.Thread(target=run_web_server, daemon=True)
-        web_thread.start()
-        
-        # Run telegram bot di main thread
-        run_telegram_bot()
+        if args.workers > 0:
+            run_supervisor(args.workers, run_bot=not args.no_bot)
+        else:
+            run_single_process()
         
     except KeyboardInterrupt:
         print("\n" + "=" * 60)
@@ -3,11 +3,12 @@ Admin handlers untuk bot
 """
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from database.db_manager import DatabaseManager
+from database.async_db import AsyncDatabaseManager
 from config.config import Config
+from src.handlers.messages import qr_renderer
 
 # Initialize database
-db = DatabaseManager()
+db = AsyncDatabaseManager()
 
 # Admin user ID (ganti dengan ID Telegram Anda)
 ADMIN_ID = "YOUR_TELEGRAM_USER_ID"  # Ganti dengan user ID @jhopan_05
@@ -67,10 +68,12 @@ Pilih menu di bawah untuk manage bot.
 async def handle_admin_stats(query, context: ContextTypes.DEFAULT_TYPE):
     """Show bot statistics"""
     # Get stats from database
-    total_links = db.get_total_links()
-    total_clicks = db.get_total_clicks()
-    total_users = db.get_total_users()
-    total_domains = db.get_total_domains()
+    total_links = await db.get_total_links()
+    total_clicks = await db.get_total_clicks()
+    total_users = await db.get_total_users()
+    total_domains = await db.get_total_domains()
+    qr_stats = qr_renderer.stats()
+    qr_cache = qr_stats['cache'] or {'hit_ratio': 0.0, 'size': 0}
     
     keyboard = [
         [InlineKeyboardButton("🔄 Refresh", callback_data="admin_stats")],
@@ -89,6 +92,8 @@ async def handle_admin_stats(query, context: ContextTypes.DEFAULT_TYPE):
 
 ━━━━━━━━━━━━━━━━━
 *Average:* {total_clicks / total_links if total_links > 0 else 0:.1f} clicks per link
+📱 *QR Rendered:* `{qr_stats['rendered']}` (busy: `{qr_stats['rejected']}`)
+🗂 *QR Cache Hit Rate:* `{qr_cache['hit_ratio'] * 100:.1f}%` ({qr_cache['size']} cached)
     """
     
     await query.edit_message_text(
@@ -99,7 +104,7 @@ async def handle_admin_stats(query, context: ContextTypes.DEFAULT_TYPE):
 
 async def handle_admin_domains(query, context: ContextTypes.DEFAULT_TYPE):
     """Show domain management"""
-    domains = db.get_all_domains()
+    domains = await db.get_all_domains()
     
     keyboard = [
         [InlineKeyboardButton("➕ Add Subdomain", callback_data="admin_add_subdomain")],
@@ -138,7 +143,7 @@ Contoh: user1.jhopan.my.id, user2.jhopan.my.id
 
 async def handle_admin_links(query, context: ContextTypes.DEFAULT_TYPE):
     """Show recent links"""
-    links = db.get_recent_links(limit=10)
+    links = await db.get_recent_links(limit=10)
     
     keyboard = [
         [InlineKeyboardButton("🔄 Refresh", callback_data="admin_links")],
@@ -169,7 +174,7 @@ async def handle_admin_links(query, context: ContextTypes.DEFAULT_TYPE):
 
 async def handle_admin_users(query, context: ContextTypes.DEFAULT_TYPE):
     """Show active users"""
-    users = db.get_active_users(limit=10)
+    users = await db.get_active_users(limit=10)
     
     keyboard = [
         [InlineKeyboardButton("🔄 Refresh", callback_data="admin_users")],
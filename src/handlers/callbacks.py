@@ -3,11 +3,11 @@ Callback query handlers untuk inline keyboard buttons
 """
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler
-from database.db_manager import DatabaseManager
+from database.async_db import AsyncDatabaseManager
 from config.config import Config
 
 # Initialize database
-db = DatabaseManager()
+db = AsyncDatabaseManager()
 
 # Conversation states
 WAITING_URL, WAITING_ALIAS, WAITING_QR_TEXT, WAITING_DOMAIN = range(4)
@@ -198,7 +198,7 @@ async def handle_alias_random(query, context: ContextTypes.DEFAULT_TYPE):
     
     try:
         # Create short link dengan random code (no custom alias)
-        result = db.create_short_link(
+        result = await db.create_short_link(
             original_url=url,
             custom_alias=None,  # Random code
             domain='default',
@@ -594,7 +594,7 @@ Ketik /cancel untuk batal
 async def handle_stats_menu(query, context: ContextTypes.DEFAULT_TYPE):
     """Tampilkan statistik user"""
     user_id = str(query.from_user.id)
-    stats = db.get_user_stats(user_id)
+    stats = await db.get_user_stats(user_id)
     
     keyboard = [
         [InlineKeyboardButton("🔙 Back to Main Menu", callback_data="back_to_main")]
@@ -622,7 +622,7 @@ Klik "🔗 Short Link" untuk membuat link pertama Anda!
         """
         
         # Get top 5 links
-        top_links = db.get_user_links(user_id, limit=5)
+        top_links = await db.get_user_links(user_id, limit=5)
         for idx, link in enumerate(top_links, 1):
             domain_name = link['domain'] if link['domain'] != 'default' else f"{Config.DEFAULT_SUBDOMAIN}.{Config.DEFAULT_DOMAIN}"
             short_code = link['custom_alias'] or link['short_code']
@@ -640,7 +640,7 @@ Klik "🔗 Short Link" untuk membuat link pertama Anda!
 async def handle_mylinks_menu(query, context: ContextTypes.DEFAULT_TYPE):
     """Tampilkan daftar link user"""
     user_id = str(query.from_user.id)
-    links = db.get_user_links(user_id, limit=10)
+    links = await db.get_user_links(user_id, limit=10)
     
     keyboard = [
         [InlineKeyboardButton("🔙 Back to Main Menu", callback_data="back_to_main")]
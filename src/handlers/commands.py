@@ -3,11 +3,11 @@ Command handlers untuk bot
 """
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from database.db_manager import DatabaseManager
+from database.async_db import AsyncDatabaseManager
 from config.config import Config
 
 # Initialize database
-db = DatabaseManager()
+db = AsyncDatabaseManager()
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handler untuk command /start dengan inline keyboard menu"""
@@ -116,7 +116,7 @@ Butuh bantuan? Hubungi developer! 💬
 
 async def about_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handler untuk command /about"""
-    stats = db.get_stats()
+    stats = await db.get_stats()
     
     about_message = f"""
 ℹ️ *Tentang Bot*
@@ -164,7 +164,7 @@ Terima kasih sudah menggunakan bot ini! 🙏
 async def mystats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handler untuk command /mystats - Stats user"""
     user_id = str(update.effective_user.id)
-    stats = db.get_stats(user_id=user_id)
+    stats = await db.get_stats(user_id=user_id)
     
     stats_message = f"""
 📊 *Statistik Anda*
@@ -186,7 +186,7 @@ async def mystats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def mylinks_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handler untuk command /mylinks - List user links"""
     user_id = str(update.effective_user.id)
-    links = db.get_user_links(user_id, limit=10)
+    links = await db.get_user_links(user_id, limit=10)
     
     if not links:
         await update.message.reply_text(
@@ -238,7 +238,7 @@ async def adddomain_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = str(update.effective_user.id)
     username = update.effective_user.username or "unknown"
     
-    result = db.add_custom_domain(domain, user_id, username)
+    result = await db.add_custom_domain(domain, user_id, username)
     
     if result['success']:
         await update.message.reply_text(
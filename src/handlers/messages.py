@@ -1,23 +1,77 @@
 """
 Message handlers untuk bot
 """
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, Message
+from telegram.error import BadRequest
 from telegram.ext import ContextTypes
-from src.utils import QRCodeGenerator, ShortLinkGenerator
+from src.utils import QRImageCache, QROptions, QRRenderPool, ShortLinkGenerator
 from config.config import Config
-from database.db_manager import DatabaseManager
+from database.async_db import AsyncDatabaseManager
 import re
 import aiohttp
 
-# Initialize generators
-qr_gen = QRCodeGenerator(
-    box_size=Config.QR_BOX_SIZE,
-    border=Config.QR_BORDER,
-    error_correction=Config.QR_ERROR_CORRECTION
+# Initialize generators (render QR di worker pool, bukan di event loop)
+qr_renderer = QRRenderPool(
+    QROptions(
+        box_size=Config.QR_BOX_SIZE,
+        border=Config.QR_BORDER,
+        error_correction=Config.QR_ERROR_CORRECTION,
+        renderer=Config.QR_RENDERER
+    ),
+    mode=Config.QR_RENDER_MODE,
+    workers=Config.QR_RENDER_WORKERS,
+    max_queue=Config.QR_RENDER_QUEUE,
+    cache=QRImageCache(
+        max_entries=Config.QR_CACHE_SIZE,
+        max_bytes=Config.QR_CACHE_MAX_BYTES,
+        directory=Config.QR_CACHE_DIR
+    )
 )
 
 # Initialize database
-db = DatabaseManager()
+db = AsyncDatabaseManager()
+
+# Potongan pesan BadRequest Telegram untuk file_id yang tidak berlaku
+STALE_FILE_ID_ERRORS = ('wrong file identifier', 'invalid file', 'file reference')
+
+def is_stale_file_id(error: BadRequest) -> bool:
+    """True jika BadRequest disebabkan file_id yang salah / tidak berlaku"""
+    message = str(error).lower()
+    return any(part in message for part in STALE_FILE_ID_ERRORS)
+
+async def reply_qr_photo(message: Message, data: str, **kwargs) -> Message:
+    """
+    Kirim QR Code sebagai foto balasan
+    
+    Telegram mengembalikan file_id untuk setiap foto yang di-upload.
+    file_id disimpan per content hash QR, jadi QR yang sama berikutnya
+    dikirim dengan file_id (tanpa render dan tanpa upload ulang).
+    
+    Args:
+        message: Message yang dibalas
+        data: Data yang di-encode ke QR Code
+        **kwargs: Argumen lain untuk reply_photo (caption, parse_mode, ...)
+        
+    Returns:
+        Message foto yang terkirim
+    """
+    content_hash = qr_renderer.cache_key(data)
+    file_id = await db.get_telegram_file_id(content_hash)
+    if file_id:
+        try:
+            return await message.reply_photo(photo=file_id, **kwargs)
+        except BadRequest as e:
+            # Error lain (caption, parse_mode, ...) akan gagal juga saat upload
+            if not is_stale_file_id(e):
+                raise
+            # file_id tidak berlaku lagi (mis. token bot diganti): upload ulang
+            await db.forget_telegram_file_id(content_hash)
+    
+    qr_image = await qr_renderer.render(data)
+    sent = await message.reply_photo(photo=qr_image, **kwargs)
+    if sent.photo:
+        await db.save_telegram_file_id(content_hash, sent.photo[-1].file_id)
+    return sent
 
 async def check_web_server_status():
     """Check if web server is running"""
@@ -185,7 +239,7 @@ async def process_custom_alias(update: Update, context: ContextTypes.DEFAULT_TYP
     
     try:
         # Create short link dengan custom alias
-        result = db.create_short_link(
+        result = await db.create_short_link(
             original_url=url,
             custom_alias=alias,
             domain='default',
@@ -299,12 +353,9 @@ async def process_qr_input(update: Update, context: ContextTypes.DEFAULT_TYPE, t
     )
     
     try:
-        # Generate QR code
-        qr_image = qr_gen.generate(text)
-        
-        if qr_image:
-            text_preview = text if len(text) <= 100 else text[:97] + "..."
-            caption = f"""
+        # Generate & send QR code
+        text_preview = text if len(text) <= 100 else text[:97] + "..."
+        caption = f"""
 ✅ *QR Code Berhasil Dibuat!*
 
 ━━━━━━━━━━━━━━━━━
@@ -313,21 +364,17 @@ async def process_qr_input(update: Update, context: ContextTypes.DEFAULT_TYPE, t
 
 ━━━━━━━━━━━━━━━━━
 Scan QR code untuk akses content.
-            """
-            
-            await update.message.reply_photo(
-                photo=qr_image,
-                caption=caption,
-                parse_mode='Markdown',
-                reply_markup=get_back_button()
-            )
-            
-            await processing_msg.delete()
-        else:
-            await processing_msg.edit_text(
-                "❌ Gagal membuat QR Code!",
-                reply_markup=get_back_button()
-            )
+        """
+        
+        await reply_qr_photo(
+            update.message,
+            text,
+            caption=caption,
+            parse_mode='Markdown',
+            reply_markup=get_back_button()
+        )
+        
+        await processing_msg.delete()
     
     except Exception as e:
         await processing_msg.edit_text(
@@ -362,7 +409,7 @@ async def process_both_input(update: Update, context: ContextTypes.DEFAULT_TYPE,
         
         if web_server_online and Config.DEFAULT_DOMAIN:
             # Create short link
-            result = db.create_short_link(
+            result = await db.create_short_link(
                 original_url=url,
                 custom_alias=custom_alias,
                 domain='default',
@@ -391,12 +438,9 @@ async def process_both_input(update: Update, context: ContextTypes.DEFAULT_TYPE,
                 )
                 return
         
-        # Generate QR code for short URL
-        qr_image = qr_gen.generate(short_url)
-        
-        if qr_image:
-            url_preview = url if len(url) <= 60 else url[:57] + "..."
-            caption = f"""
+        # Generate & send QR code for short URL
+        url_preview = url if len(url) <= 60 else url[:57] + "..."
+        caption = f"""
 ✅ *Short Link + QR Code Berhasil Dibuat!*
 
 ━━━━━━━━━━━━━━━━━
@@ -408,21 +452,17 @@ async def process_both_input(update: Update, context: ContextTypes.DEFAULT_TYPE,
 
 ━━━━━━━━━━━━━━━━━
 📱 Scan QR code untuk akses link.
-            """
-            
-            await update.message.reply_photo(
-                photo=qr_image,
-                caption=caption,
-                parse_mode='Markdown',
-                reply_markup=get_back_button()
-            )
-            
-            await processing_msg.delete()
-        else:
-            await processing_msg.edit_text(
-                "❌ Gagal membuat QR Code!",
-                reply_markup=get_back_button()
-            )
+        """
+        
+        await reply_qr_photo(
+            update.message,
+            short_url,
+            caption=caption,
+            parse_mode='Markdown',
+            reply_markup=get_back_button()
+        )
+        
+        await processing_msg.delete()
     
     except Exception as e:
         await processing_msg.edit_text(
@@ -458,7 +498,7 @@ async def process_subdomain_request(update: Update, context: ContextTypes.DEFAUL
         return
     
     # Check jika subdomain sudah ada di database
-    existing = db.check_subdomain_exists(subdomain)
+    existing = await db.check_subdomain_exists(subdomain)
     if existing:
         await update.message.reply_text(
             f"❌ *Subdomain sudah digunakan!*\n\n"
@@ -549,7 +589,7 @@ async def process_domain_input(update: Update, context: ContextTypes.DEFAULT_TYP
     )
     
     try:
-        result = db.add_custom_domain(domain, user_id, username)
+        result = await db.add_custom_domain(domain, user_id, username)
         
         if result['success']:
             message = f"""
@@ -623,23 +663,21 @@ async def qr_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     
     try:
-        # Generate QR Code
-        qr_image = qr_gen.generate(data)
-        
-        # Delete processing message
-        await processing_msg.delete()
-        
         # Send QR Code
         caption = (
             "✅ *QR Code berhasil dibuat!*\n\n"
             f"📝 *Data:*\n`{data[:100]}{'...' if len(data) > 100 else ''}`"
         )
         
-        await update.message.reply_photo(
-            photo=qr_image,
+        await reply_qr_photo(
+            update.message,
+            data,
             caption=caption,
             parse_mode='Markdown'
         )
+        
+        # Delete processing message
+        await processing_msg.delete()
     
     except Exception as e:
         await processing_msg.edit_text(
@@ -686,7 +724,7 @@ async def both_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     try:
         # Create short link in database
-        result = db.create_short_link(
+        result = await db.create_short_link(
             original_url=url,
             custom_alias=custom_alias,
             domain=custom_domain,
@@ -703,13 +741,7 @@ async def both_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             short_code = result['custom_alias'] or result['short_code']
             short_url = f"https://{domain_name}/{short_code}"
             
-            # Generate QR Code from short link
-            qr_image = qr_gen.generate(short_url)
-            
-            # Delete processing message
-            await processing_msg.delete()
-            
-            # Send result
+            # Send result (QR Code mengarah ke short link)
             caption = (
                 "✅ *Short Link + QR Code berhasil dibuat!*\n\n"
                 f"🔗 *URL Asli:*\n`{url[:50]}{'...' if len(url) > 50 else ''}`\n\n"
@@ -718,11 +750,15 @@ async def both_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 "QR Code di atas mengarah ke short link! 📱"
             )
             
-            await update.message.reply_photo(
-                photo=qr_image,
+            await reply_qr_photo(
+                update.message,
+                short_url,
                 caption=caption,
                 parse_mode='Markdown'
             )
+            
+            # Delete processing message
+            await processing_msg.delete()
         else:
             await processing_msg.edit_text(
                 f"❌ *Gagal membuat short link!*\n\n"
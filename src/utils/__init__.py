@@ -1,7 +1,9 @@
 """
 Utils package initialization
 """
+from .qr_cache import QRImageCache
 from .qr_generator import QRCodeGenerator
+from .qr_pool import QROptions, QRRenderBusy, QRRenderPool
 from .shortlink_generator import ShortLinkGenerator
 
-__all__ = ['QRCodeGenerator', 'ShortLinkGenerator']
+__all__ = ['QRCodeGenerator', 'QRImageCache', 'QROptions', 'QRRenderBusy', 'QRRenderPool', 'ShortLinkGenerator']
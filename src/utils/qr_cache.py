@@ -0,0 +1,182 @@
+"""
+Cache QR Code berdasarkan isi (content-addressed)
+
+Short URL yang sama (mis. hasil /both, link populer) di-render berulang
+kali. QRImageCache menyimpan PNG hasil render dengan key hash dari semua
+input render: data, box_size, border, error correction, warna dan logo.
+Tier pertama adalah LRU di memory yang dibatasi jumlah entry dan total
+bytes; tier kedua (opsional) adalah file di QR_CACHE_DIR, sehingga cache
+tetap terpakai setelah restart dan dibagi antar proses.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+def logo_fingerprint(logo_path: Optional[str]) -> str:
+    """
+    Identitas file logo untuk cache key
+
+    Memakai path, ukuran dan mtime (bukan isi file) supaya tidak perlu
+    membaca logo setiap request; logo yang diganti otomatis dapat key baru.
+    """
+    if not logo_path:
+        return ''
+    try:
+        st = os.stat(logo_path)
+    except OSError:
+        # Logo tidak ada: render tanpa logo, jadi key sama dengan tanpa logo
+        return ''
+    return f'{os.path.abspath(logo_path)}:{st.st_size}:{st.st_mtime_ns}'
+
+
+def cache_key(data: str, box_size: int, border: int, error_correction,
+              fill_color='black', back_color='white', logo_path: Optional[str] = None,
+              renderer: str = 'raster') -> str:
+    """
+    Hitung cache key untuk satu render
+
+    Renderer ikut di-hash: raster dan pil menghasilkan PNG yang berbeda
+    (palette 1-bit vs RGB), jadi keduanya tidak boleh berbagi entry.
+
+    Returns:
+        Hex SHA-256 dari semua parameter yang mempengaruhi PNG
+    """
+    parts = (data, box_size, border, error_correction, fill_color, back_color,
+             logo_fingerprint(logo_path), renderer)
+    return hashlib.sha256('\x00'.join(map(str, parts)).encode('utf-8')).hexdigest()
+
+
+class QRImageCache:
+    """LRU PNG di memory + tier disk opsional, thread-safe"""
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 32 * 1024 * 1024,
+                 directory: Optional[str] = None):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Jumlah maksimal PNG di memory (0 = memory cache off)
+            max_bytes: Total ukuran maksimal PNG di memory
+            directory: Folder untuk tier disk (None / kosong = tanpa disk)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory or None
+        self._data: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+        # Counters
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_errors = 0
+
+    def _path(self, key: str) -> str:
+        # Dua karakter pertama sebagai subfolder supaya satu folder tidak berisi terlalu banyak file
+        return os.path.join(self.directory, key[:2], f'{key}.png')
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Ambil PNG dari memory, lalu dari disk
+
+        Returns:
+            Bytes PNG atau None jika tidak ada
+        """
+        with self._lock:
+            png = self._data.get(key)
+            if png is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return png
+
+        if self.directory:
+            try:
+                with open(self._path(key), 'rb') as f:
+                    png = f.read()
+            except FileNotFoundError:
+                png = None
+            except OSError:
+                self.disk_errors += 1
+                png = None
+            if png:
+                self.disk_hits += 1
+                self._remember(key, png)
+                return png
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, png: bytes):
+        """Simpan PNG ke memory dan (jika aktif) ke disk"""
+        self._remember(key, png)
+        if self.directory:
+            self._write_file(key, png)
+
+    def _remember(self, key: str, png: bytes):
+        if self.max_entries <= 0 or len(png) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._data[key] = png
+            self._size += len(png)
+            while len(self._data) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def _write_file(self, key: str, png: bytes):
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        try:
+            folder = os.path.dirname(path)
+            os.makedirs(folder, exist_ok=True)
+            # Tulis ke file sementara lalu rename: proses lain tidak pernah membaca file setengah jadi
+            fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(png)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            self.disk_errors += 1
+            print(f"⚠️ Gagal menyimpan QR cache ke disk: {e}")
+
+    def clear(self):
+        """Kosongkan cache memory (file di disk tidak dihapus)"""
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+    def stats(self) -> Dict:
+        """Get statistik cache"""
+        with self._lock:
+            size = len(self._data)
+            size_bytes = self._size
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'size': size,
+            'bytes': size_bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'directory': self.directory,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_ratio': round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'disk_errors': self.disk_errors
+        }
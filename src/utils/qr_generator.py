@@ -4,11 +4,16 @@ Utility untuk membuat QR Code
 import qrcode
 from io import BytesIO
 from PIL import Image
+from . import qr_raster
+from .qr_cache import cache_key
+
+# 'raster': matrix -> pixel dengan block replication (qr_raster), 'pil': qrcode.make_image
+RENDERERS = ('raster', 'pil')
 
 class QRCodeGenerator:
     """Generator untuk membuat QR Code"""
     
-    def __init__(self, box_size=10, border=4, error_correction='H'):
+    def __init__(self, box_size=10, border=4, error_correction='H', cache=None, renderer='raster'):
         """
         Initialize QR Code generator
         
@@ -16,9 +21,15 @@ class QRCodeGenerator:
             box_size: Ukuran setiap box dalam QR code
             border: Ukuran border (minimum 4)
             error_correction: Level error correction (L, M, Q, H)
+            cache: QRImageCache untuk PNG yang sudah pernah di-render (opsional)
+            renderer: 'raster' (default, PNG palette 1-bit) atau 'pil' (qrcode + PIL)
         """
+        if renderer not in RENDERERS:
+            raise ValueError(f'QR renderer tidak valid: {renderer} (pilih {", ".join(RENDERERS)})')
         self.box_size = box_size
         self.border = border
+        self.cache = cache
+        self.renderer = renderer
         
         # Mapping error correction
         error_levels = {
@@ -29,18 +40,8 @@ class QRCodeGenerator:
         }
         self.error_correction = error_levels.get(error_correction, qrcode.constants.ERROR_CORRECT_H)
     
-    def generate(self, data: str, fill_color='black', back_color='white') -> BytesIO:
-        """
-        Generate QR Code dari data
-        
-        Args:
-            data: Data yang akan di-encode ke QR Code
-            fill_color: Warna foreground
-            back_color: Warna background
-            
-        Returns:
-            BytesIO object berisi image QR Code
-        """
+    def _make_qr(self, data: str) -> qrcode.QRCode:
+        """Encode data ke matrix QR Code"""
         # Buat QR Code instance
         qr = qrcode.QRCode(
             version=1,
@@ -53,15 +54,109 @@ class QRCodeGenerator:
         qr.add_data(data)
         qr.make(fit=True)
         
-        # Buat image
-        img = qr.make_image(fill_color=fill_color, back_color=back_color)
+        return qr
+    
+    def _make_image(self, data: str, fill_color='black', back_color='white'):
+        """Buat image QR Code (PIL) dari data"""
+        qr = self._make_qr(data)
+        if self.renderer == 'raster':
+            return qr_raster.to_image(qr.get_matrix(), self.box_size, fill_color, back_color)
+        return qr.make_image(fill_color=fill_color, back_color=back_color).get_image()
+    
+    def _add_logo(self, img, logo_path: str):
+        """Tempel logo di tengah QR Code (maksimal 1/4 ukuran)"""
+        try:
+            logo = Image.open(logo_path)
+            
+            # Hitung ukuran logo (maksimal 1/4 dari QR code)
+            qr_width, qr_height = img.size
+            logo_size = min(qr_width, qr_height) // 4
+            
+            # Resize logo
+            logo = logo.resize((logo_size, logo_size), Image.Resampling.LANCZOS)
+            
+            # Hitung posisi tengah
+            logo_pos = ((qr_width - logo_size) // 2, (qr_height - logo_size) // 2)
+            
+            # Paste logo
+            img.paste(logo, logo_pos)
+        except Exception as e:
+            print(f"Error menambahkan logo: {e}")
+        return img
+    
+    def render_png(self, data: str, fill_color='black', back_color='white', logo_path: str = None) -> bytes:
+        """
+        Render QR Code ke PNG
+        
+        Args:
+            data: Data yang akan di-encode ke QR Code
+            fill_color: Warna foreground
+            back_color: Warna background
+            logo_path: Path ke file logo (opsional)
+            
+        Returns:
+            Bytes PNG
+        """
+        if self.cache is not None:
+            key = self.cache_key(data, fill_color, back_color, logo_path)
+            png = self.cache.get(key)
+            if png is not None:
+                return png
+        
+        img = self._make_image(data, fill_color, back_color)
+        if logo_path:
+            img = self._add_logo(img.convert('RGB'), logo_path)
         
-        # Convert ke BytesIO
-        bio = BytesIO()
+        png = qr_raster.save_png(img)
+        
+        if self.cache is not None:
+            self.cache.put(key, png)
+        return png
+    
+    def render_svg(self, data: str, fill_color='black', back_color='white') -> str:
+        """
+        Render QR Code ke SVG (vector, tajam di ukuran berapa pun)
+        
+        Args:
+            data: Data yang akan di-encode ke QR Code
+            fill_color: Warna foreground (warna CSS)
+            back_color: Warna background (warna CSS)
+            
+        Returns:
+            Dokumen SVG
+        """
+        return qr_raster.to_svg(self._make_qr(data).get_matrix(), self.box_size, fill_color, back_color)
+    
+    def cache_key(self, data: str, fill_color='black', back_color='white', logo_path: str = None) -> str:
+        """Cache key untuk render dengan setting generator ini"""
+        return cache_key(data, self.box_size, self.border, self.error_correction,
+                         fill_color, back_color, logo_path, self.renderer)
+    
+    def generate(self, data: str, fill_color='black', back_color='white') -> BytesIO:
+        """
+        Generate QR Code dari data
+        
+        Args:
+            data: Data yang akan di-encode ke QR Code
+            fill_color: Warna foreground
+            back_color: Warna background
+            
+        Returns:
+            BytesIO object berisi image QR Code
+        """
+        bio = BytesIO(self.render_png(data, fill_color, back_color))
         bio.name = 'qrcode.png'
-        img.save(bio, 'PNG')
-        bio.seek(0)
+        return bio
+    
+    def generate_svg(self, data: str, fill_color='black', back_color='white') -> BytesIO:
+        """
+        Generate QR Code sebagai file SVG
         
+        Returns:
+            BytesIO object berisi SVG (nama file qrcode.svg)
+        """
+        bio = BytesIO(self.render_svg(data, fill_color, back_color).encode('utf-8'))
+        bio.name = 'qrcode.svg'
         return bio
     
     def generate_with_logo(self, data: str, logo_path: str = None) -> BytesIO:
@@ -75,43 +170,6 @@ class QRCodeGenerator:
         Returns:
             BytesIO object berisi image QR Code dengan logo
         """
-        # Generate QR Code dasar
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=self.error_correction,
-            box_size=self.box_size,
-            border=self.border,
-        )
-        
-        qr.add_data(data)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white").convert('RGB')
-        
-        # Jika ada logo, tambahkan di tengah
-        if logo_path:
-            try:
-                logo = Image.open(logo_path)
-                
-                # Hitung ukuran logo (maksimal 1/4 dari QR code)
-                qr_width, qr_height = img.size
-                logo_size = min(qr_width, qr_height) // 4
-                
-                # Resize logo
-                logo = logo.resize((logo_size, logo_size), Image.Resampling.LANCZOS)
-                
-                # Hitung posisi tengah
-                logo_pos = ((qr_width - logo_size) // 2, (qr_height - logo_size) // 2)
-                
-                # Paste logo
-                img.paste(logo, logo_pos)
-            except Exception as e:
-                print(f"Error menambahkan logo: {e}")
-        
-        # Convert ke BytesIO
-        bio = BytesIO()
+        bio = BytesIO(self.render_png(data, logo_path=logo_path))
         bio.name = 'qrcode.png'
-        img.save(bio, 'PNG')
-        bio.seek(0)
-        
         return bio
@@ -0,0 +1,176 @@
+"""
+Render QR Code di luar event loop bot
+
+Membuat matrix QR dan encode PNG adalah kerja CPU. Jika dijalankan
+langsung di handler async, satu burst /qr menahan semua update lain.
+QRRenderPool menjalankan render di process pool (default), thread pool
+atau inline, dengan batas render bersamaan dan antrian terbatas: jika
+antrian penuh, request langsung ditolak (QRRenderBusy) daripada menumpuk.
+
+Jika ada QRImageCache, cache dicek di proses bot sebelum request masuk
+antrian: PNG yang sudah pernah dibuat tidak dikirim ke worker sama sekali.
+"""
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, NamedTuple, Optional
+
+from .qr_cache import QRImageCache
+from .qr_generator import QRCodeGenerator
+
+MODES = ('process', 'thread', 'inline')
+
+
+class QRRenderBusy(Exception):
+    """Antrian render penuh (pesan ditampilkan ke user)"""
+
+
+class QROptions(NamedTuple):
+    """Setting QRCodeGenerator (dikirim ke worker, harus picklable)"""
+    box_size: int = 10
+    border: int = 4
+    error_correction: str = 'H'
+    renderer: str = 'raster'
+
+
+@functools.lru_cache(maxsize=8)
+def _generator(options: QROptions) -> QRCodeGenerator:
+    return QRCodeGenerator(**options._asdict())
+
+
+def render_png(options: QROptions, data: str, logo_path: Optional[str] = None) -> bytes:
+    """Render satu QR Code ke PNG (dijalankan di worker)"""
+    return _generator(options).render_png(data, logo_path=logo_path)
+
+
+class QRRenderPool:
+    """Async facade untuk render QR Code dengan backpressure"""
+
+    def __init__(self, options: QROptions = QROptions(), mode: str = 'process',
+                 workers: int = 2, max_queue: int = 32, cache: Optional[QRImageCache] = None):
+        """
+        Args:
+            options: Setting QR Code
+            mode: 'process', 'thread' atau 'inline' (tanpa pool, untuk debug)
+            workers: Jumlah render bersamaan (ukuran pool)
+            max_queue: Jumlah request yang boleh menunggu worker; lebih dari
+                ini langsung ditolak dengan QRRenderBusy
+            cache: Cache PNG yang dicek sebelum render (opsional)
+        """
+        if mode not in MODES:
+            raise ValueError(f'QR render mode tidak valid: {mode} (pilih {", ".join(MODES)})')
+        self.options = options
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.cache = cache
+        # Generator lokal hanya untuk menghitung cache key (render tetap di worker)
+        self._keygen = QRCodeGenerator(**options._asdict())
+        self._executor: Optional[Executor] = None
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._pending = 0
+
+        # Counters
+        self.rendered = 0
+        self.rejected = 0
+        self.errors = 0
+
+    def cache_key(self, data: str, logo_path: Optional[str] = None) -> str:
+        """Content hash untuk QR Code ini (sama dengan key QRImageCache)"""
+        return self._keygen.cache_key(data, logo_path=logo_path)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == 'process':
+                # spawn: proses bot punya thread (pool database, PTB), fork tidak aman
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='qr-render')
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Satu semaphore per event loop (run_polling bisa membuat loop baru saat reconnect)
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            self._semaphores = {loop: asyncio.Semaphore(self.workers)}
+            semaphore = self._semaphores[loop]
+        return semaphore
+
+    async def render(self, data: str, logo_path: Optional[str] = None) -> bytes:
+        """
+        Render QR Code ke PNG tanpa mem-block event loop
+
+        Args:
+            data: Data yang akan di-encode
+            logo_path: Path ke file logo (opsional)
+
+        Returns:
+            Bytes PNG (bisa langsung dikirim sebagai photo)
+
+        Raises:
+            QRRenderBusy: Render yang berjalan + menunggu sudah penuh
+        """
+        key = None
+        if self.cache is not None:
+            key = self.cache_key(data, logo_path=logo_path)
+            png = self.cache.get(key)
+            if png is not None:
+                return png
+
+        if self._pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise QRRenderBusy('Server sedang sibuk membuat QR Code, coba lagi sebentar lagi.')
+
+        self._pending += 1
+        try:
+            async with self._get_semaphore():
+                if self.mode == 'inline':
+                    png = render_png(self.options, data, logo_path)
+                else:
+                    png = await self._run(data, logo_path)
+            self.rendered += 1
+            if key is not None:
+                self.cache.put(key, png)
+            return png
+        except QRRenderBusy:
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._pending -= 1
+
+    async def _run(self, data: str, logo_path: Optional[str]) -> bytes:
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            return await loop.run_in_executor(executor, render_png, self.options, data, logo_path)
+        except BrokenExecutor:
+            # Worker mati (mis. OOM): pool dibuat ulang untuk request berikutnya
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False)
+            raise
+
+    def stats(self) -> Dict:
+        """Get statistik render"""
+        return {
+            'mode': self.mode,
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'pending': self._pending,
+            'rendered': self.rendered,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'cache': self.cache.stats() if self.cache is not None else None
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Hentikan worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -0,0 +1,141 @@
+"""
+Rasterizer QR Code tanpa menggambar per module
+
+qrcode + PIL menggambar setiap module hitam sebagai kotak terpisah.
+Di sini matrix boolean langsung diubah ke pixel: satu baris module
+diperbesar box_size kali ke samping lalu diulang box_size kali ke bawah
+(block replication). Hasilnya image palette 2 warna yang disimpan
+sebagai PNG 1-bit. Jika numpy terpasang, replikasi memakai numpy.repeat;
+tanpa numpy dipakai operasi bytes biasa dengan hasil yang sama persis.
+
+Juga tersedia output SVG: satu <path> dengan satu subpath per deret
+module hitam yang bersebelahan dalam satu baris.
+"""
+import html
+import itertools
+from io import BytesIO
+from typing import List, Sequence
+
+from PIL import Image, ImageColor
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - numpy opsional
+    numpy = None
+
+BACKENDS = ('auto', 'numpy', 'python')
+
+Matrix = Sequence[Sequence[bool]]
+
+
+def _palette(fill_color, back_color) -> List[int]:
+    # Index 0 = background, 1 = module
+    return list(ImageColor.getrgb(back_color)[:3] + ImageColor.getrgb(fill_color)[:3])
+
+
+def rasterize(matrix: Matrix, box_size: int, backend: str = 'auto') -> bytes:
+    """
+    Ubah matrix module ke pixel (1 byte per pixel: 0 = background, 1 = module)
+
+    Args:
+        matrix: Matrix boolean dari QRCode.get_matrix() (sudah termasuk border)
+        box_size: Ukuran pixel per module
+        backend: 'numpy', 'python' atau 'auto' (numpy jika terpasang)
+
+    Returns:
+        Bytes pixel baris per baris, ukuran (len(matrix) * box_size) ^ 2
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f'Backend raster tidak valid: {backend} (pilih {", ".join(BACKENDS)})')
+    if backend == 'numpy' and numpy is None:
+        raise RuntimeError('Backend numpy butuh: pip install numpy')
+
+    if backend != 'python' and numpy is not None:
+        modules = numpy.asarray(matrix, dtype=numpy.uint8)
+        return modules.repeat(box_size, axis=0).repeat(box_size, axis=1).tobytes()
+
+    on, off = b'\x01' * box_size, b'\x00' * box_size
+    rows = {}
+    out = []
+    for row in matrix:
+        # Baris module yang sama (mis. border, pola finder) cukup dibuat sekali
+        key = tuple(row)
+        line = rows.get(key)
+        if line is None:
+            line = rows[key] = b''.join(on if dark else off for dark in row) * box_size
+        out.append(line)
+    return b''.join(out)
+
+
+def to_image(matrix: Matrix, box_size: int, fill_color='black', back_color='white',
+             backend: str = 'auto') -> Image.Image:
+    """Buat image palette (mode 'P', 2 warna) dari matrix module"""
+    size = len(matrix) * box_size
+    img = Image.frombytes('P', (size, size), rasterize(matrix, box_size, backend))
+    img.putpalette(_palette(fill_color, back_color))
+    return img
+
+
+def save_png(img: Image.Image) -> bytes:
+    """
+    Encode image ke PNG
+
+    Image palette 2 warna disimpan 1 bit per pixel (bukan 8), jadi data
+    yang di-compress 8x lebih kecil.
+    """
+    bio = BytesIO()
+    if img.mode == 'P':
+        img.save(bio, 'PNG', bits=1)
+    else:
+        img.save(bio, 'PNG')
+    return bio.getvalue()
+
+
+def to_png(matrix: Matrix, box_size: int, fill_color='black', back_color='white',
+           backend: str = 'auto') -> bytes:
+    """Render matrix module langsung ke PNG palette 1-bit"""
+    return save_png(to_image(matrix, box_size, fill_color, back_color, backend))
+
+
+def to_svg_path(matrix: Matrix) -> str:
+    """
+    Path SVG untuk semua module hitam (dalam satuan module)
+
+    Setiap deret module hitam dalam satu baris menjadi satu persegi
+    panjang 'M x y h w v 1 h -w z'.
+    """
+    parts = []
+    for y, row in enumerate(matrix):
+        x = 0
+        for dark, run in itertools.groupby(row):
+            width = sum(1 for _ in run)
+            if dark:
+                parts.append(f'M{x} {y}h{width}v1h-{width}z')
+            x += width
+    return ''.join(parts)
+
+
+def to_svg(matrix: Matrix, box_size: int, fill_color='black', back_color='white') -> str:
+    """
+    Render matrix module ke SVG
+
+    Args:
+        matrix: Matrix boolean (sudah termasuk border)
+        box_size: Ukuran pixel per module (untuk width/height SVG)
+        fill_color: Warna module
+        back_color: Warna background
+
+    Returns:
+        Dokumen SVG (string)
+    """
+    count = len(matrix)
+    size = count * box_size
+    fill = html.escape(str(fill_color), quote=True)
+    back = html.escape(str(back_color), quote=True)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+        f'viewBox="0 0 {count} {count}" shape-rendering="crispEdges">'
+        f'<rect width="{count}" height="{count}" fill="{back}"/>'
+        f'<path d="{to_svg_path(matrix)}" fill="{fill}"/>'
+        f'</svg>'
+    )
@@ -0,0 +1,19 @@
+"""
+Fixture bersama untuk test
+
+Jalankan dari root repo:
+    python -m pytest -q
+"""
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    """Path file SQLite baru per test (cache/pool per path tidak dibagi antar test)"""
+    return str(tmp_path / 'shortlink.db')
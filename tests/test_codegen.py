@@ -0,0 +1,116 @@
+"""
+Test permutasi short code dan CodeAllocator (database/codegen.py)
+"""
+import pytest
+
+from database import codegen
+from database.codegen import CodeAllocator, CodePermutation
+from database.pool import ConnectionPool
+
+KEY = bytes.fromhex('00112233445566778899aabbccddeeff')
+
+
+def make_pool(db_path: str, length: int = 2) -> ConnectionPool:
+    """Database dengan schema allocator, counter mulai dari panjang length"""
+    pool = ConnectionPool(db_path, max_size=4)
+    with pool.connection() as conn:
+        for statement in codegen.SCHEMA + codegen.FREE_RANGES_SCHEMA:
+            conn.execute(statement)
+        conn.execute('UPDATE code_sequence SET length = ?', (length,))
+        conn.commit()
+    return pool
+
+
+@pytest.mark.parametrize('length', [1, 2])
+def test_permutation_is_bijection(length):
+    permutation = CodePermutation(KEY, length)
+    permuted = [permutation.permute(value) for value in range(permutation.size)]
+
+    assert sorted(permuted) == list(range(permutation.size))
+    assert [permutation.unpermute(value) for value in permuted] == list(range(permutation.size))
+
+
+def test_cycle_walking_stays_in_range():
+    # 62 nilai di atas Feistel 6 bit (64): 2 nilai harus di-walk ulang
+    permutation = CodePermutation(KEY, 1)
+    assert 1 << (2 * permutation.half_bits) > permutation.size
+
+    walked = [value for value in range(permutation.size) if permutation._forward(value) >= permutation.size]
+    assert walked
+    for value in walked:
+        assert 0 <= permutation.permute(value) < permutation.size
+
+    with pytest.raises(ValueError):
+        permutation.permute(permutation.size)
+    with pytest.raises(ValueError):
+        permutation.permute(-1)
+
+
+def test_encode_decode_roundtrip():
+    permutation = CodePermutation(KEY, 2)
+    codes = {permutation.encode(value) for value in range(permutation.size)}
+
+    assert len(codes) == permutation.size
+    assert all(len(code) == 2 for code in codes)
+    assert all(permutation.decode(permutation.encode(value)) == value for value in range(0, permutation.size, 37))
+
+
+def test_permutation_depends_on_key():
+    other = bytes.fromhex('ffeeddccbbaa99887766554433221100')
+    values = range(100)
+    assert [CodePermutation(KEY, 3).permute(v) for v in values] != [CodePermutation(other, 3).permute(v) for v in values]
+
+
+def test_release_returns_unused_range_for_reuse(db_path):
+    pool = make_pool(db_path)
+    first = CodeAllocator(pool.connection, min_length=2, block_size=10)
+    used = first.next_codes(3)
+    first.release()
+
+    with pool.connection() as conn:
+        ranges = conn.execute('SELECT length, start_value, end_value FROM code_free_ranges').fetchall()
+    assert ranges == [(2, 3, 10)]
+    assert first.returned == 7
+
+    second = CodeAllocator(pool.connection, min_length=2, block_size=10)
+    reused = second.next_codes(7)
+    with pool.connection() as conn:
+        key = conn.execute('SELECT key FROM code_sequence').fetchone()[0]
+        assert conn.execute('SELECT COUNT(*) FROM code_free_ranges').fetchone()[0] == 0
+
+    assert second.reused_ranges == 1
+    assert reused == [second.permutation(key, 2).encode(value) for value in range(3, 10)]
+    assert not set(used) & set(reused)
+
+
+def test_two_allocators_never_share_codes(db_path):
+    pool = make_pool(db_path)
+    first = CodeAllocator(pool.connection, min_length=2, block_size=7)
+    second = CodeAllocator(pool.connection, min_length=2, block_size=5)
+
+    codes = []
+    for round_ in range(40):
+        codes.extend(first.next_codes(1 + round_ % 3))
+        codes.extend(second.next_codes(2))
+        if round_ % 10 == 9:
+            first.release()
+    first.release()
+    second.release()
+    codes.extend(first.next_codes(20))
+
+    assert len(codes) == len(set(codes))
+    assert first.leases + second.leases > 2
+
+
+def test_length_upgrade_after_code_space_exhausted(db_path):
+    pool = make_pool(db_path, length=1)
+    allocator = CodeAllocator(pool.connection, min_length=1, block_size=20)
+
+    codes = []
+    for _ in range(10):
+        codes.extend(allocator.next_codes(10))
+
+    assert len(codes) == len(set(codes))
+    assert allocator.length_upgrades == 1
+    # Block ke-4 (60..80) melewati 62: pindah ke panjang 2 dari awal
+    assert [len(code) for code in codes] == [1] * 60 + [2] * 40
@@ -0,0 +1,88 @@
+"""
+Test counter statistik yang dijaga trigger (database/counters.py)
+"""
+import pytest
+
+from database import counters
+from database.db_manager import DatabaseManager
+
+
+@pytest.fixture
+def db(db_path):
+    manager = DatabaseManager(db_path)
+    yield manager
+    manager.flush_clicks()
+    manager.release_code_block()
+    manager.pool.close_all()
+
+
+def assert_counters_match(db: DatabaseManager):
+    with db.connection() as conn:
+        result = counters.check(conn)
+        per_user = conn.execute('''
+            SELECT user_id, links, clicks FROM user_link_counts WHERE links > 0 ORDER BY user_id
+        ''').fetchall()
+        actual_per_user = conn.execute('''
+            SELECT created_by, COUNT(*), SUM(clicks) FROM short_links
+            WHERE is_active = 1 AND created_by IS NOT NULL
+            GROUP BY created_by ORDER BY created_by
+        ''').fetchall()
+
+    assert set(result) == set(counters.COUNTER_NAMES)
+    for name, values in result.items():
+        assert values['counter'] == values['actual'], name
+    assert per_user == actual_per_user
+
+
+def test_counters_follow_create_click_and_deactivate(db):
+    links = [db.create_short_link(f'https://example.com/{i}', user_id=str(i % 3)) for i in range(9)]
+    links.append(db.create_short_link('https://example.com/alias', custom_alias='my-alias', user_id='0'))
+    batch = db.create_short_links([
+        {'url': 'https://example.com/batch1', 'user_id': '3'},
+        {'url': 'https://example.com/batch2', 'alias': 'batch-alias', 'user_id': '3'},
+    ])
+    assert all(link['success'] for link in links + batch)
+    db.add_custom_domain('links.example.com', '1', 'user1')
+    assert_counters_match(db)
+
+    # Klik lewat queue (write_click_batch) dan langsung (increment_click)
+    for i, link in enumerate(links):
+        stored = db.get_link_by_code(link['short_code'])
+        for _ in range(i + 1):
+            db.record_click(stored, ip_address='127.0.0.1')
+    db.flush_clicks()
+    db.increment_click('my-alias')
+    db.increment_click(batch[1]['short_code'])
+    assert_counters_match(db)
+
+    # Nonaktifkan link (klik-nya ikut keluar dari counter) sampai user 3 tidak punya link aktif
+    assert db.delete_link(links[1]['short_code'], '1')
+    assert db.delete_link('my-alias', '0')
+    for link in batch:
+        assert db.delete_link(link['short_code'], '3')
+    assert not db.delete_link(links[2]['short_code'], 'someone-else')
+    assert_counters_match(db)
+
+    assert db.get_counters()['users'] == 3
+    stats = db.get_stats()
+    with db.connection() as conn:
+        assert stats['total_links'] == conn.execute('SELECT COUNT(*) FROM short_links WHERE is_active = 1').fetchone()[0]
+        assert stats['total_clicks'] == conn.execute(
+            'SELECT SUM(clicks) FROM short_links WHERE is_active = 1'
+        ).fetchone()[0]
+
+
+def test_reconcile_restores_drifted_counters(db):
+    for i in range(5):
+        db.create_short_link(f'https://example.com/{i}', user_id=str(i % 2))
+    with db.connection() as conn:
+        conn.execute("UPDATE stats_counters SET value = 999 WHERE name = 'links'")
+        conn.execute("UPDATE user_link_counts SET clicks = 42")
+        conn.commit()
+        assert counters.check(conn)['links'] == {'counter': 999, 'actual': 5}
+
+        result = counters.reconcile(conn)
+
+    assert result['before']['links'] == 999
+    assert result['after']['links'] == 5
+    assert_counters_match(db)
@@ -0,0 +1,60 @@
+"""
+Test error alias yang sudah dipakai (create_short_link / create_short_links)
+"""
+import pytest
+
+from database.db_manager import DatabaseManager
+
+
+@pytest.fixture
+def db(db_path):
+    manager = DatabaseManager(db_path)
+    yield manager
+    manager.flush_clicks()
+    manager.release_code_block()
+    manager.pool.close_all()
+
+
+def test_alias_clash_same_domain_and_other_domain(db):
+    assert db.create_short_link('https://example.com/a', custom_alias='promo', domain='a.example.com')['success']
+
+    same = db.create_short_link('https://example.com/b', custom_alias='promo', domain='a.example.com')
+    other = db.create_short_link('https://example.com/c', custom_alias='promo', domain='b.example.com')
+
+    assert same['error'] == 'Alias "promo" sudah digunakan untuk domain ini!'
+    assert other['error'] == 'Alias "promo" sudah digunakan di domain lain!'
+
+
+def test_batch_alias_clash_same_domain_and_other_domain(db):
+    assert db.create_short_link('https://example.com/a', custom_alias='promo', domain='a.example.com')['success']
+
+    results = db.create_short_links([
+        {'url': 'https://example.com/b', 'alias': 'promo', 'domain': 'a.example.com'},
+        {'url': 'https://example.com/c', 'alias': 'promo2', 'domain': 'b.example.com'},
+    ])
+    other = db.create_short_links([
+        {'url': 'https://example.com/d', 'alias': 'promo', 'domain': 'b.example.com'},
+        {'url': 'https://example.com/e'},
+    ])
+
+    assert results[0]['error'] == 'Alias "promo" sudah digunakan untuk domain ini!'
+    assert results[1]['success']
+    assert other[0]['error'] == 'Alias "promo" sudah digunakan di domain lain!'
+    assert other[1]['success']
+
+
+def test_row_fallback_reports_alias_scope(db):
+    assert db.create_short_link('https://example.com/a', custom_alias='promo', domain='a.example.com')['success']
+    entries = [
+        [0, 'promo', 'https://example.com/b', 'promo', 'a.example.com', None],
+        [1, 'promo', 'https://example.com/c', 'promo', 'b.example.com', None],
+        [2, 'fresh1', 'https://example.com/d', 'fresh1', 'b.example.com', None],
+    ]
+    results = [None] * len(entries)
+
+    with db.connection() as conn:
+        ids = db._insert_links_each(conn, entries, results)
+
+    assert results[0]['error'] == 'Alias "promo" sudah digunakan untuk domain ini!'
+    assert results[1]['error'] == 'Alias "promo" sudah digunakan di domain lain!'
+    assert results[2] is None and 'fresh1' in ids
@@ -0,0 +1,152 @@
+"""
+Test SchemaMigrator (database/migrations.py): upgrade database lama,
+backfill yang terputus lalu dilanjutkan, dan dry run
+"""
+import sqlite3
+
+import pytest
+
+from database import migrations
+from database.migrations import MIGRATIONS, SchemaMigrator
+
+LINKS = 250
+CLICKS_PER_LINK = 4
+LATEST = max(m.version for m in MIGRATIONS)
+
+
+class Interrupted(Exception):
+    """Simulasi proses mati di tengah backfill"""
+
+
+@pytest.fixture
+def baseline(db_path):
+    """Database dengan schema lama (sebelum schema_migrations) berisi link & klik"""
+    conn = sqlite3.connect(db_path)
+    for statement in MIGRATIONS[0].statements:
+        conn.execute(statement)
+    conn.executemany(
+        'INSERT INTO short_links (short_code, original_url, custom_alias, created_by) VALUES (?, ?, ?, ?)',
+        [
+            (f'code{i}', f'https://example.com/{i}', f'code{i}' if i % 5 == 0 else None, str(i % 7))
+            for i in range(LINKS)
+        ]
+    )
+    conn.executemany(
+        'INSERT INTO click_logs (short_code) VALUES (?)',
+        [(f'code{i}',) for i in range(LINKS) for _ in range(CLICKS_PER_LINK)]
+    )
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def interrupt_after(migration, batches: int, calls: list):
+    """Ganti backfill migrasi dengan versi yang gagal setelah beberapa batch"""
+    original = migration.backfill
+
+    def backfill(conn, last_key, batch_size):
+        calls.append(last_key)
+        if len(calls) > batches:
+            raise Interrupted()
+        return original(conn, last_key, batch_size)
+    return migration._replace(backfill=backfill)
+
+
+def assert_fully_migrated(conn):
+    assert SchemaMigrator(conn, verbose=False).current_version() == LATEST
+    assert SchemaMigrator(conn, verbose=False).pending() == []
+    assert SchemaMigrator(conn, verbose=False).pending_backfills() == []
+    assert conn.execute('SELECT COUNT(*) FROM schema_migrations').fetchone()[0] == len(MIGRATIONS)
+    assert conn.execute('SELECT COUNT(*) FROM short_links').fetchone()[0] == LINKS
+    assert conn.execute('SELECT COUNT(*) FROM link_keys').fetchone()[0] == LINKS
+    assert conn.execute('SELECT COUNT(*) FROM click_logs').fetchone()[0] == LINKS * CLICKS_PER_LINK
+    assert conn.execute('SELECT COUNT(*) FROM click_logs WHERE link_id IS NULL').fetchone()[0] == 0
+    assert conn.execute('''
+        SELECT COUNT(*) FROM click_logs c JOIN short_links s ON s.id = c.link_id
+        WHERE s.short_code != c.short_code
+    ''').fetchone()[0] == 0
+
+
+def test_migrate_baseline_schema(baseline):
+    applied = SchemaMigrator(baseline, batch_size=64, batch_pause=0, verbose=False).migrate()
+
+    assert [m.version for m in applied] == [m.version for m in MIGRATIONS]
+    assert_fully_migrated(baseline)
+    # Migrasi kedua kali tidak melakukan apa-apa
+    assert SchemaMigrator(baseline, verbose=False).migrate() == []
+
+
+def test_interrupted_backfill_resumes_from_cursor(baseline):
+    calls = []
+    link_keys = next(m for m in MIGRATIONS if m.name == 'link_keys')
+    interrupted = [interrupt_after(m, 2, calls) if m is link_keys else m for m in MIGRATIONS]
+
+    with pytest.raises(Interrupted):
+        SchemaMigrator(baseline, interrupted, batch_size=64, batch_pause=0, verbose=False).migrate()
+
+    # DDL dan versi sudah tercatat, dua batch pertama sudah di-commit
+    cursor = baseline.execute(
+        'SELECT backfill_cursor FROM schema_migrations WHERE version = ?', (link_keys.version,)
+    ).fetchone()[0]
+    assert cursor == calls[2] and cursor > 0
+    done = baseline.execute('SELECT COUNT(*) FROM link_keys').fetchone()[0]
+    assert 0 < done < LINKS
+    assert SchemaMigrator(baseline, verbose=False).current_version() == link_keys.version
+
+    resumed = []
+    migrator = SchemaMigrator(
+        baseline, [interrupt_after(m, LINKS, resumed) if m is link_keys else m for m in MIGRATIONS],
+        batch_size=64, batch_pause=0, verbose=False
+    )
+    assert [m.version for m in migrator.pending_backfills()] == [link_keys.version]
+    migrator.migrate()
+
+    # Dilanjutkan dari cursor, batch yang sudah di-commit tidak diulang
+    assert resumed[0] == cursor
+    assert_fully_migrated(baseline)
+
+
+def test_interrupted_click_backfill_resumes(baseline):
+    calls = []
+    click_ids = next(m for m in MIGRATIONS if m.name == 'click_logs_link_id')
+    interrupted = [interrupt_after(m, 3, calls) if m is click_ids else m for m in MIGRATIONS]
+
+    with pytest.raises(Interrupted):
+        SchemaMigrator(baseline, interrupted, batch_size=100, batch_pause=0, verbose=False).migrate()
+
+    assert baseline.execute('SELECT COUNT(*) FROM click_logs WHERE link_id IS NOT NULL').fetchone()[0] == 300
+
+    SchemaMigrator(baseline, batch_size=100, batch_pause=0, verbose=False).migrate()
+    assert_fully_migrated(baseline)
+
+
+def test_missing_version_is_pending(baseline):
+    SchemaMigrator(baseline, batch_pause=0, verbose=False).migrate()
+    baseline.execute('DELETE FROM schema_migrations WHERE version = 4')
+    baseline.commit()
+
+    migrator = SchemaMigrator(baseline, verbose=False)
+    assert migrator.current_version() == LATEST
+    assert [m.version for m in migrator.pending()] == [4]
+    migrator.migrate()
+    assert migrator.pending() == []
+
+
+def test_dry_run_does_not_change_database(baseline, capsys):
+    tables = lambda: sorted(
+        row[0] for row in baseline.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'index', 'trigger')")
+    )
+    migrator = SchemaMigrator(baseline, verbose=False)
+    migrator.current_version()  # schema_migrations dibuat di sini, bukan oleh dry_run
+    before = tables()
+
+    pending = migrator.dry_run()
+
+    assert [m.version for m in pending] == [m.version for m in MIGRATIONS]
+    assert tables() == before
+    assert migrator.current_version() == 0
+    assert 'link_id' not in {row[1] for row in baseline.execute('PRAGMA table_info(click_logs)')}
+    output = capsys.readouterr().out
+    assert 'Pending: 002 link_keys (+ batched backfill)' in output
+    for name, _, _ in migrations.HOT_QUERIES:
+        assert f'== {name}' in output
@@ -0,0 +1,480 @@
+"""
+ASGI Web Server untuk Short Link Redirect
+
+Alternatif untuk Flask development server (WEB_SERVER_MODE=asgi). Route
+sama dengan web/server.py; semua akses database dijalankan di thread pool
+supaya event loop tidak pernah menunggu SQLite.
+
+Run:
+    uvicorn web.asgi:app --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import functools
+import html
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from werkzeug.urls import iri_to_uri
+
+from config.config import Config
+from database import metrics
+from web.page_cache import PageCache
+from web.request_log import request_log
+from web.server import (
+    batch_limit_error, batch_summary, create_link_chunk, db, export_request, home_page, is_ndjson,
+    not_found_page, observe_request, parse_ndjson_line
+)
+
+# Thread pool untuk semua operasi database (ukuran sama dengan connection pool)
+_executor = ThreadPoolExecutor(max_workers=Config.DB_POOL_SIZE, thread_name_prefix='asgi-db')
+
+# Header CORS (sama dengan Flask-CORS default)
+_CORS_HEADERS = [(b'access-control-allow-origin', b'*')]
+
+
+async def run_db(func, *args, **kwargs):
+    """Jalankan fungsi database di thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+def _get_header(scope: Dict, name: bytes) -> str:
+    """Ambil satu header dari scope ASGI"""
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return ''
+
+
+def get_domain_from_scope(scope: Dict) -> str:
+    """Extract domain dari request (tanpa port)"""
+    return _get_header(scope, b'host').split(':')[0]
+
+
+async def _read_body(receive) -> bytes:
+    """Baca seluruh request body"""
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        more_body = message.get('more_body', False)
+    return b''.join(chunks)
+
+
+async def _send(send, status: int, body: bytes, content_type: str,
+                headers: Optional[List[Tuple[bytes, bytes]]] = None, head: bool = False):
+    """Kirim response lengkap"""
+    response_headers = [
+        (b'content-type', content_type.encode('latin-1')),
+        (b'content-length', str(len(body)).encode('latin-1')),
+    ] + _CORS_HEADERS + (headers or [])
+    await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+    await send({'type': 'http.response.body', 'body': b'' if head else body})
+
+
+async def _receive_lines(receive):
+    """Baca request body per baris (untuk NDJSON) tanpa menunggu body lengkap"""
+    buffer = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        buffer += message.get('body', b'')
+        more_body = message.get('more_body', False)
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+async def _send_page(scope, send, page: PageCache, status: int = 200, head: bool = False):
+    """Kirim response dari page cache (render di thread pool hanya jika TTL habis)"""
+    args = (status, _get_header(scope, b'accept-encoding'), _get_header(scope, b'if-none-match'))
+    if page.is_fresh():
+        status, body, headers = page.respond(*args)
+    else:
+        status, body, headers = await run_db(page.respond, *args)
+
+    response_headers = [(b'content-length', str(len(body)).encode('latin-1'))] + _CORS_HEADERS + [
+        (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers
+    ]
+    await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+    await send({'type': 'http.response.body', 'body': b'' if head else body})
+
+
+async def _send_json(send, data, status: int = 200, head: bool = False):
+    """Kirim response JSON"""
+    body = json.dumps(data, default=str).encode('utf-8')
+    await _send(send, status, body, 'application/json', head=head)
+
+
+# ---------------------------------------------------------------------------
+# Handler (dijalankan di thread pool)
+# ---------------------------------------------------------------------------
+
+def _resolve_redirect(short_code: str, domain: str, ip_address: str,
+                      user_agent: str, referer: str) -> Optional[Dict]:
+    """Cari link dan catat klik (satu kali pindah ke thread pool per redirect)"""
+    started = time.perf_counter()
+    link = db.find_link_for_host(short_code, domain)
+
+    if link:
+        db.record_click(
+            link,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            referer=referer
+        )
+        request_log.redirect(
+            domain, short_code, link['original_url'],
+            (time.perf_counter() - started) * 1000, ip=ip_address
+        )
+    else:
+        request_log.not_found(domain, short_code, (time.perf_counter() - started) * 1000, ip=ip_address)
+
+    return link
+
+
+def _cache_stats() -> Dict:
+    """Statistik cache redirect"""
+    return {
+        'db_pool': db.get_pool_stats(),
+        'db_checkpoint': db.tuning.stats(),
+        'click_queue': db.click_queue.stats(),
+        'link_cache': db.link_cache.stats(),
+        'negative_cache': db.negative_cache.stats(),
+        'code_filter': db.code_filter.stats(),
+        'pages': {
+            'home': home_page.stats(),
+            'not_found': not_found_page.stats()
+        },
+        'request_log': request_log.stats()
+    }
+
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+async def home(scope, receive, send, head=False):
+    """Homepage dengan stats"""
+    await _send_page(scope, send, home_page, head=head)
+
+
+async def redirect_link(scope, receive, send, short_code, head=False):
+    """Redirect short link ke URL asli"""
+    client = scope.get('client')
+    ip_address = _get_header(scope, b'x-forwarded-for') or (client[0] if client else '')
+
+    link = await run_db(
+        _resolve_redirect,
+        short_code,
+        get_domain_from_scope(scope),
+        ip_address,
+        _get_header(scope, b'user-agent'),
+        _get_header(scope, b'referer')
+    )
+
+    if link:
+        location = iri_to_uri(link['original_url'])
+        escaped = html.escape(location)
+        body = f'<a href="{escaped}">{escaped}</a>'.encode('utf-8')
+        await _send(
+            send, 302, body, 'text/html; charset=utf-8',
+            headers=[(b'location', location.encode('utf-8'))],
+            head=head
+        )
+    else:
+        await _send_page(scope, send, not_found_page, 404, head=head)
+
+
+async def health_check(scope, receive, send, head=False):
+    """Health check endpoint"""
+    await _send_json(send, {
+        'status': 'ok',
+        'service': 'shortlink',
+        'version': Config.BOT_VERSION
+    }, head=head)
+
+
+async def api_cache_stats(scope, receive, send, head=False):
+    """API endpoint untuk statistik cache redirect"""
+    await _send_json(send, await run_db(_cache_stats), head=head)
+
+
+async def metrics_endpoint(scope, receive, send, head=False):
+    """Metrics format Prometheus (per proses)"""
+    await _send(send, 200, metrics.REGISTRY.render().encode('utf-8'), metrics.CONTENT_TYPE, head=head)
+
+
+async def api_stats(scope, receive, send, head=False):
+    """API endpoint untuk stats"""
+    await _send_json(send, await run_db(db.get_stats), head=head)
+
+
+async def api_create_link(scope, receive, send, head=False):
+    """API endpoint untuk create link (request body sama dengan web/server.py)"""
+    try:
+        data = json.loads(await _read_body(receive) or b'null')
+    except ValueError:
+        data = None
+
+    if not isinstance(data, dict) or 'url' not in data:
+        await _send_json(send, {'success': False, 'error': 'URL required'}, 400)
+        return
+
+    result = await run_db(
+        db.create_short_link,
+        original_url=data['url'],
+        custom_alias=data.get('alias'),
+        domain=data.get('domain', 'default'),
+        user_id=data.get('user_id')
+    )
+
+    await _send_json(send, result, 201 if result['success'] else 400)
+
+
+async def _create_batch_ndjson(receive, send):
+    """Batch dari NDJSON: baca, tulis per chunk dan stream hasil per baris"""
+    await send({
+        'type': 'http.response.start', 'status': 200,
+        'headers': [(b'content-type', b'application/x-ndjson')] + _CORS_HEADERS
+    })
+
+    async def flush(chunk, start):
+        results = await run_db(create_link_chunk, chunk, start)
+        body = ''.join(json.dumps(result) + '\n' for result in results)
+        await send({'type': 'http.response.body', 'body': body.encode('utf-8'), 'more_body': True})
+
+    chunk, start = [], 0
+    tail = ''
+    async for line in _receive_lines(receive):
+        if not line.strip():
+            continue
+        if start + len(chunk) >= Config.BATCH_MAX_ITEMS:
+            tail = json.dumps(batch_limit_error(Config.BATCH_MAX_ITEMS)) + '\n'
+            break
+        chunk.append(parse_ndjson_line(line))
+        if len(chunk) >= Config.BATCH_CHUNK_SIZE:
+            await flush(chunk, start)
+            start += len(chunk)
+            chunk = []
+
+    if chunk:
+        await flush(chunk, start)
+    await send({'type': 'http.response.body', 'body': tail.encode('utf-8')})
+
+
+async def api_create_batch(scope, receive, send, head=False):
+    """API endpoint untuk create banyak link (format sama dengan web/server.py)"""
+    if is_ndjson(_get_header(scope, b'content-type')):
+        await _create_batch_ndjson(receive, send)
+        return
+
+    try:
+        data = json.loads(await _read_body(receive) or b'null')
+    except ValueError:
+        data = None
+
+    if not isinstance(data, list):
+        await _send_json(send, {'success': False, 'error': 'Body harus JSON array atau NDJSON'}, 400)
+        return
+    if len(data) > Config.BATCH_MAX_ITEMS:
+        await _send_json(send, {
+            'success': False,
+            'error': f'Maksimal {Config.BATCH_MAX_ITEMS} item per batch'
+        }, 413)
+        return
+
+    results = []
+    for start in range(0, len(data), Config.BATCH_CHUNK_SIZE):
+        chunk = data[start:start + Config.BATCH_CHUNK_SIZE]
+        results.extend(await run_db(create_link_chunk, chunk, start))
+    await _send_json(send, batch_summary(results))
+
+
+async def api_export(scope, receive, send, kind, head=False):
+    """Export links atau klik (streaming, chunk dibaca di thread pool)"""
+    query = {k: v[0] for k, v in parse_qs(scope.get('query_string', b'').decode('latin-1')).items()}
+    status, error, result = export_request(kind, query, _get_header(scope, b'authorization'))
+    if error:
+        await _send_json(send, error, status, head=head)
+        return
+
+    chunks, content_type, filename = result
+    await send({
+        'type': 'http.response.start', 'status': 200,
+        'headers': [
+            (b'content-type', content_type.encode('latin-1')),
+            (b'content-disposition', f'attachment; filename="{filename}"'.encode('latin-1')),
+        ] + _CORS_HEADERS
+    })
+    if not head:
+        while True:
+            part = await run_db(next, chunks, None)
+            if part is None:
+                break
+            await send({'type': 'http.response.body', 'body': part.encode('utf-8'), 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def api_get_link(scope, receive, send, short_code, head=False):
+    """Get link info by short code"""
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    domain = query.get('domain', ['default'])[0]
+    link = await run_db(db.get_link_by_code, short_code, domain)
+
+    if link:
+        await _send_json(send, link, head=head)
+    else:
+        await _send_json(send, {'error': 'Link not found'}, 404, head=head)
+
+
+# Route API: path -> (method, handler)
+_API_ROUTES = {
+    '/api/health': ('GET', health_check),
+    '/api/cache': ('GET', api_cache_stats),
+    '/api/stats': ('GET', api_stats),
+    '/api/create': ('POST', api_create_link),
+    '/api/create/batch': ('POST', api_create_batch),
+    '/metrics': ('GET', metrics_endpoint),
+}
+
+
+# ---------------------------------------------------------------------------
+# ASGI app
+# ---------------------------------------------------------------------------
+
+async def _lifespan(receive, send):
+    """Startup / shutdown"""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            # Tulis klik yang masih ada di queue
+            await run_db(db.flush_clicks)
+            await run_db(db.release_code_block)
+            _executor.shutdown(wait=False)
+            request_log.stop()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def _method_not_allowed(send, allowed: str):
+    await _send(
+        send, 405, b'Method Not Allowed', 'text/plain; charset=utf-8',
+        headers=[(b'allow', allowed.encode('latin-1'))]
+    )
+
+
+async def _preflight(scope, send, allowed: str):
+    """Response untuk OPTIONS (CORS preflight)"""
+    headers = [(b'allow', allowed.encode('latin-1'))]
+    requested = _get_header(scope, b'access-control-request-headers')
+    if requested:
+        headers.append((b'access-control-allow-headers', requested.encode('latin-1')))
+    headers.append((b'access-control-allow-methods', allowed.encode('latin-1')))
+    await _send(send, 200, b'', 'text/html; charset=utf-8', headers=headers)
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    method = scope['method']
+    path = scope['path']
+    head = method == 'HEAD'
+
+    # Label route sama dengan rule Flask
+    if path in _API_ROUTES:
+        route_method, handler = _API_ROUTES[path]
+        route, kwargs = path, {}
+    elif path.startswith('/api/link/') and path[10:] and '/' not in path[10:]:
+        route_method, handler = 'GET', api_get_link
+        route, kwargs = '/api/link/<short_code>', {'short_code': path[10:]}
+    elif path in ('/api/export/links', '/api/export/clicks'):
+        route_method, handler = 'GET', api_export
+        route, kwargs = '/api/export/<any(links, clicks):kind>', {'kind': path[12:]}
+    elif path == '/':
+        route_method, handler = 'GET', home
+        route, kwargs = '/', {}
+    else:
+        route_method, handler = 'GET', redirect_link
+        route, kwargs = '/<path:short_code>', {'short_code': path.lstrip('/')}
+
+    started = time.perf_counter()
+    status = 500
+
+    async def send_and_record(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        await send(message)
+
+    allowed = 'GET, HEAD, OPTIONS' if route_method == 'GET' else 'POST, OPTIONS'
+    try:
+        if method == 'OPTIONS':
+            await _preflight(scope, send_and_record, allowed)
+        elif method == route_method or (head and route_method == 'GET'):
+            try:
+                await handler(scope, receive, send_and_record, head=head, **kwargs)
+            except Exception:
+                # Error selalu dicatat (tanpa sampling), lalu ditangani uvicorn (500)
+                request_log.error('request_error', method=method, path=path, host=_get_header(scope, b'host'))
+                raise
+        else:
+            await _method_not_allowed(send_and_record, allowed)
+    finally:
+        observe_request(route, method, status, started)
+
+
+def run_asgi_server(host='0.0.0.0', port=5000, sock=None, on_ready: Optional[Callable[[], None]] = None):
+    """
+    Run ASGI server (uvicorn)
+
+    Args:
+        host: Host address
+        port: Port number
+        sock: Socket yang sudah listen (worker mode, dibagi antar proses)
+        on_ready: Dipanggil setelah lifespan startup selesai dan uvicorn
+            sudah menerima koneksi (sama seperti setelah make_server di
+            mode Flask). Tidak dipanggil jika startup gagal.
+    """
+    try:
+        import uvicorn
+    except ImportError:
+        raise RuntimeError("WEB_SERVER_MODE=asgi butuh uvicorn: pip install uvicorn")
+
+    class Server(uvicorn.Server):
+        async def startup(self, sockets=None):
+            await super().startup(sockets=sockets)
+            if self.started and not self.should_exit and on_ready is not None:
+                on_ready()
+
+    print("=" * 50)
+    print(f"🌐 Starting ASGI Web Server on {host}:{port}")
+    print("=" * 50)
+
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        lifespan='on',
+        access_log=False,
+        log_level='warning',
+        timeout_keep_alive=Config.WEB_KEEPALIVE_TIMEOUT,
+        backlog=Config.WEB_BACKLOG
+    )
+    Server(config).run(sockets=[sock] if sock is not None else None)
+
+if __name__ == '__main__':
+    run_asgi_server(host=Config.WEB_HOST, port=Config.WEB_PORT)
@@ -0,0 +1,195 @@
+"""
+Cache response HTML yang sudah di-render (homepage & 404)
+
+Body disimpan dalam bentuk siap kirim: identity, gzip dan brotli (jika
+module brotli ada), lengkap dengan ETag. Halaman di-render ulang hanya
+setelah TTL habis, bukan per request.
+"""
+import gzip
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli opsional
+    brotli = None
+
+CONTENT_TYPE = 'text/html; charset=utf-8'
+
+
+class RenderedPage(NamedTuple):
+    """Satu hasil render beserta varian terkompresi"""
+    bodies: Dict[str, bytes]  # encoding ('identity', 'gzip', 'br') -> body
+    etag: str
+    rendered_at: float
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Parse header Accept-Encoding menjadi {encoding: q}"""
+    encodings = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        encodings[name] = q
+    return encodings
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Cek header If-None-Match (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    bare = etag.strip('"')
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate.strip('"') == bare:
+            return True
+    return False
+
+
+class PageCache:
+    """
+    Halaman HTML yang di-render ulang paling sering sekali per TTL
+
+    Saat TTL habis, satu request me-render ulang sementara request lain
+    tetap dilayani dengan versi lama.
+    """
+
+    def __init__(self, render: Callable[[], str], ttl: Optional[float] = None,
+                 cache_control: str = 'no-cache', compress_min_size: int = 512):
+        """
+        Initialize page cache
+
+        Args:
+            render: Fungsi yang mengembalikan HTML
+            ttl: Umur hasil render (detik, None = render sekali)
+            cache_control: Nilai header Cache-Control
+            compress_min_size: Body lebih kecil dari ini tidak dikompres
+        """
+        self.render = render
+        self.ttl = ttl
+        self.cache_control = cache_control
+        self.compress_min_size = compress_min_size
+        self._page: Optional[RenderedPage] = None
+        self._lock = threading.Lock()
+
+        # Counters
+        self.renders = 0
+        self.hits = 0
+        self.not_modified = 0
+        self.render_errors = 0
+
+    def _build(self, html: str) -> RenderedPage:
+        """Encode + kompres hasil render"""
+        body = html.encode('utf-8')
+        digest = hashlib.blake2b(body, digest_size=10).hexdigest()
+        bodies = {'identity': body}
+        if len(body) >= self.compress_min_size:
+            bodies['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                bodies['br'] = brotli.compress(body, quality=11)
+        return RenderedPage(bodies=bodies, etag=f'"{digest}"', rendered_at=time.monotonic())
+
+    def is_fresh(self) -> bool:
+        """True jika hasil render masih berlaku (tidak perlu render)"""
+        page = self._page
+        return page is not None and (
+            self.ttl is None or time.monotonic() - page.rendered_at < self.ttl
+        )
+
+    def get(self) -> RenderedPage:
+        """Get hasil render (render ulang jika TTL habis)"""
+        page = self._page
+        if self.is_fresh():
+            self.hits += 1
+            return page
+
+        # Sudah ada versi lama: hanya satu thread yang render ulang
+        if not self._lock.acquire(blocking=page is None):
+            self.hits += 1
+            return page
+        try:
+            if self.is_fresh():
+                return self._page
+            try:
+                self._page = self._build(self.render())
+                self.renders += 1
+            except Exception as e:
+                self.render_errors += 1
+                if page is None:
+                    raise
+                print(f"⚠️  Page render failed, serving cached version: {e}")
+            return self._page
+        finally:
+            self._lock.release()
+
+    def invalidate(self):
+        """Paksa render ulang pada request berikutnya"""
+        self._page = None
+
+    def respond(self, status: int = 200, accept_encoding: str = '',
+                if_none_match: str = '') -> Tuple[int, bytes, List[Tuple[str, str]]]:
+        """
+        Buat response dari cache
+
+        Args:
+            status: Status code (304 hanya untuk 200)
+            accept_encoding: Header Accept-Encoding dari request
+            if_none_match: Header If-None-Match dari request
+
+        Returns:
+            Tuple (status, body, headers)
+        """
+        page = self.get()
+        headers = [
+            ('Cache-Control', self.cache_control),
+            ('Vary', 'Accept-Encoding'),
+        ]
+
+        encoding = 'identity'
+        if len(page.bodies) > 1:
+            accepted = parse_accept_encoding(accept_encoding)
+            for candidate in ('br', 'gzip'):
+                if candidate in page.bodies and accepted.get(candidate, 0) > 0:
+                    encoding = candidate
+                    break
+
+        # ETag berbeda per encoding (strong validator per representasi)
+        etag = page.etag if encoding == 'identity' else f'{page.etag[:-1]}-{encoding}"'
+        headers.append(('ETag', etag))
+
+        if status == 200 and etag_matches(if_none_match, etag):
+            self.not_modified += 1
+            return 304, b'', headers
+
+        headers.append(('Content-Type', CONTENT_TYPE))
+        if encoding != 'identity':
+            headers.append(('Content-Encoding', encoding))
+        return status, page.bodies[encoding], headers
+
+    def stats(self) -> Dict:
+        """Get statistik cache"""
+        page = self._page
+        return {
+            'ttl': self.ttl,
+            'renders': self.renders,
+            'hits': self.hits,
+            'not_modified': self.not_modified,
+            'render_errors': self.render_errors,
+            'sizes': {k: len(v) for k, v in page.bodies.items()} if page else {},
+            'age': round(time.monotonic() - page.rendered_at, 3) if page else None
+        }
@@ -0,0 +1,195 @@
+"""
+Structured request logging untuk web server
+
+Request handler hanya membuat LogRecord dan memasukkannya ke queue;
+format JSON dan write ke stdout/file dilakukan oleh thread background
+(QueueListener). Redirect sukses bisa di-sample, error selalu dicatat.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+from config.config import Config
+
+LOGGER_NAME = 'shortlink.web'
+
+
+class JsonFormatter(logging.Formatter):
+    """Format LogRecord sebagai satu baris JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created))
+                  + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'event': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler yang tidak pernah block
+
+    Jika queue penuh, record dibuang (dan dihitung) daripada menahan
+    request. Record tidak di-format di sini; formatting dilakukan listener.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RequestLog:
+    """Logger request web (redirect, 404, error) dengan sampling"""
+
+    def __init__(self, redirect_sample: float = 1.0, not_found_sample: float = 1.0,
+                 queue_size: int = 10000, log_file: str = '', level: str = 'INFO'):
+        """
+        Initialize request log
+
+        Args:
+            redirect_sample: Proporsi redirect sukses yang dicatat (0-1)
+            not_found_sample: Proporsi 404 yang dicatat (0-1)
+            queue_size: Kapasitas queue sebelum record dibuang
+            log_file: File output (kosong = stdout)
+            level: Level minimal
+        """
+        self.redirect_sample = redirect_sample
+        self.not_found_sample = not_found_sample
+        self.queue_size = queue_size
+        self.log_file = log_file
+
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.logger.setLevel(level.upper())
+        self.logger.propagate = False
+
+        self._handler: Optional[DroppingQueueHandler] = None
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._start_lock = threading.Lock()
+        self._atexit_registered = False
+
+        # Counters
+        self.logged = 0
+        self.sampled_out = 0
+
+    @classmethod
+    def from_config(cls) -> 'RequestLog':
+        """Buat request log dari Config / env"""
+        return cls(
+            redirect_sample=Config.WEB_LOG_REDIRECT_SAMPLE,
+            not_found_sample=Config.WEB_LOG_NOT_FOUND_SAMPLE,
+            queue_size=Config.WEB_LOG_QUEUE_SIZE,
+            log_file=Config.WEB_LOG_FILE,
+            level=Config.WEB_LOG_LEVEL
+        )
+
+    def start(self):
+        """Pasang queue handler dan start writer thread (idempotent)"""
+        if self._listener is not None:
+            return
+
+        with self._start_lock:
+            if self._listener is not None:
+                return
+
+            if self.log_file:
+                output = logging.FileHandler(self.log_file, encoding='utf-8')
+            else:
+                output = logging.StreamHandler(sys.stdout)
+            output.setFormatter(JsonFormatter())
+
+            if self._handler is not None:
+                self.logger.removeHandler(self._handler)
+            self._handler = DroppingQueueHandler(queue.Queue(maxsize=self.queue_size))
+            self.logger.addHandler(self._handler)
+
+            self._listener = logging.handlers.QueueListener(self._handler.queue, output)
+            self._listener.start()
+            if not self._atexit_registered:
+                atexit.register(self.stop)
+                self._atexit_registered = True
+
+    def stop(self):
+        """Tulis semua record yang tersisa lalu stop writer thread"""
+        listener = self._listener
+        if listener is not None:
+            self._listener = None
+            listener.stop()
+
+    def _reset_after_fork(self):
+        """Writer thread tidak ikut ke proses child; start ulang saat log berikutnya"""
+        self._listener = None
+        self._start_lock = threading.Lock()
+
+    def _emit(self, level: int, event: str, fields: Dict, exc_info=None):
+        if self._listener is None:
+            self.start()
+        self.logger.log(level, event, extra={'fields': fields}, exc_info=exc_info)
+        self.logged += 1
+
+    def redirect(self, domain: str, code: str, url: str, duration_ms: float, ip: Optional[str] = None):
+        """Catat redirect sukses (di-sample)"""
+        rate = self.redirect_sample
+        if rate < 1.0 and random.random() >= rate:
+            self.sampled_out += 1
+            return
+        self._emit(logging.INFO, 'redirect', {
+            'status': 302, 'domain': domain, 'code': code, 'url': url,
+            'ms': round(duration_ms, 3), 'ip': ip, 'sample': rate
+        })
+
+    def not_found(self, domain: str, code: str, duration_ms: float, ip: Optional[str] = None):
+        """Catat link tidak ditemukan (di-sample)"""
+        rate = self.not_found_sample
+        if rate < 1.0 and random.random() >= rate:
+            self.sampled_out += 1
+            return
+        self._emit(logging.INFO, 'not_found', {
+            'status': 404, 'domain': domain, 'code': code,
+            'ms': round(duration_ms, 3), 'ip': ip, 'sample': rate
+        })
+
+    def error(self, event: str, exc_info=True, **fields):
+        """Catat error (selalu, tanpa sampling)"""
+        self._emit(logging.ERROR, event, fields, exc_info=exc_info)
+
+    def stats(self) -> Dict:
+        """Get statistik logging"""
+        handler = self._handler
+        return {
+            'logged': self.logged,
+            'sampled_out': self.sampled_out,
+            'dropped': handler.dropped if handler else 0,
+            'queue_depth': handler.queue.qsize() if handler else 0,
+            'redirect_sample': self.redirect_sample,
+            'not_found_sample': self.not_found_sample
+        }
+
+
+request_log = RequestLog.from_config()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=request_log._reset_after_fork)
@@ -1,17 +1,145 @@
 """
 Flask Web Server untuk Short Link Redirect
 """
-from flask import Flask, redirect, request, jsonify, render_template_string
+from flask import Flask, Response, redirect, request, jsonify, got_request_exception, stream_with_context
 from flask_cors import CORS
+from database import export, metrics
 from database.db_manager import DatabaseManager
 from config.config import Config
+from web.page_cache import PageCache
+from web.request_log import request_log
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+import hmac
+import json
+import logging
 import os
+import time
 
 app = Flask(__name__)
 CORS(app)
 
+# Access log Werkzeug (sinkron, per request) diganti request_log
+logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
 # Initialize database
 db = DatabaseManager()
+db.load_code_filter()
+
+# Metrics HTTP (dipakai juga oleh web.asgi)
+HTTP_REQUESTS = metrics.REGISTRY.counter(
+    'shortlink_http_requests_total',
+    'Request HTTP per route, method dan status',
+    ('route', 'method', 'status')
+)
+HTTP_DURATION = metrics.REGISTRY.histogram(
+    'shortlink_http_request_duration_seconds',
+    'Latency request HTTP per route',
+    ('route',)
+)
+metrics.REGISTRY.add_collector(metrics.database_collector(db))
+
+# Method lain (verb sembarang dari client) digabung jadi 'other' supaya
+# jumlah series label tetap terbatas
+METRIC_METHODS = frozenset(('GET', 'HEAD', 'POST', 'OPTIONS'))
+
+def observe_request(route: str, method: str, status: int, started: float):
+    """Catat satu request ke metrics HTTP"""
+    if method not in METRIC_METHODS:
+        method = 'other'
+    HTTP_DURATION.labels(route).observe(time.perf_counter() - started)
+    HTTP_REQUESTS.labels(route, method, str(status)).inc()
+
+# Batch create (dipakai juga oleh web.asgi)
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+def is_ndjson(content_type: str) -> bool:
+    """Cek apakah body request berupa NDJSON (satu item JSON per baris)"""
+    return content_type.split(';')[0].strip().lower() in NDJSON_CONTENT_TYPES
+
+def parse_ndjson_line(line: bytes):
+    """Parse satu baris NDJSON (JSON rusak jadi None, ditolak saat validasi)"""
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+def create_link_chunk(items: List, start: int) -> List[Dict]:
+    """Create satu chunk link (satu transaksi), hasil diberi index item"""
+    return [{'index': start + i, **result} for i, result in enumerate(db.create_short_links(items))]
+
+def create_links_batch(items: Iterable) -> Iterator[Dict]:
+    """
+    Create link per chunk BATCH_CHUNK_SIZE, hasil per item di-yield berurutan
+    
+    Items dibaca secara streaming, jadi body NDJSON besar tidak perlu
+    dimuat seluruhnya ke memory. Berhenti dengan satu error jika jumlah
+    item melebihi BATCH_MAX_ITEMS.
+    """
+    chunk = []
+    start = 0
+    for item in items:
+        if start + len(chunk) >= Config.BATCH_MAX_ITEMS:
+            if chunk:
+                yield from create_link_chunk(chunk, start)
+            yield batch_limit_error(Config.BATCH_MAX_ITEMS)
+            return
+        chunk.append(item)
+        if len(chunk) >= Config.BATCH_CHUNK_SIZE:
+            yield from create_link_chunk(chunk, start)
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        yield from create_link_chunk(chunk, start)
+
+def batch_limit_error(index: int) -> Dict:
+    return {
+        'index': index,
+        'success': False,
+        'error': f'Maksimal {Config.BATCH_MAX_ITEMS} item per batch'
+    }
+
+def batch_summary(results: List[Dict]) -> Dict:
+    """Response body untuk batch dari JSON array"""
+    created = sum(1 for result in results if result['success'])
+    return {
+        'success': created == len(results),
+        'created': created,
+        'failed': len(results) - created,
+        'results': results
+    }
+
+# Export (dipakai juga oleh web.asgi)
+def export_request(kind: str, args: Mapping, authorization: str) -> Tuple[int, Optional[Dict], Optional[Tuple]]:
+    """
+    Validasi request export dan siapkan generator output
+    
+    Args:
+        kind: 'links' atau 'clicks'
+        args: Query string (format, user_id, domain, since, until)
+        authorization: Header Authorization
+        
+    Returns:
+        Tuple (status, error, None) jika ditolak, atau
+        (200, None, (chunks, content_type, filename))
+    """
+    if not Config.EXPORT_TOKEN:
+        return 404, {'error': 'Export tidak aktif (EXPORT_TOKEN belum di-set)'}, None
+    expected = f'Bearer {Config.EXPORT_TOKEN}'.encode('utf-8')
+    if not hmac.compare_digest(authorization.encode('utf-8'), expected):
+        return 401, {'error': 'Unauthorized'}, None
+    
+    fmt = args.get('format', 'csv')
+    if fmt not in export.FORMATS:
+        return 400, {'error': f'Format harus salah satu dari: {", ".join(export.FORMATS)}'}, None
+    try:
+        filters = export.make_filter(
+            args.get('user_id'), args.get('domain'), args.get('since'), args.get('until')
+        )
+    except ValueError as e:
+        return 400, {'error': str(e)}, None
+    
+    chunks = export.export(db, kind, fmt, filters, Config.EXPORT_CHUNK_SIZE)
+    return 200, None, (chunks, export.FORMATS[fmt], f'{kind}.{fmt}')
 
 # HTML Template untuk 404
 NOT_FOUND_TEMPLATE = """
@@ -242,6 +370,75 @@ HOME_TEMPLATE = """
 </html>
 """
 
+# Template di-compile sekali; hasil render di-cache (stats di-refresh per TTL)
+_home_template = app.jinja_env.from_string(HOME_TEMPLATE)
+_not_found_template = app.jinja_env.from_string(NOT_FOUND_TEMPLATE)
+
+home_page = PageCache(
+    lambda: _home_template.render(stats=db.get_stats(), version=Config.BOT_VERSION),
+    ttl=Config.HOME_CACHE_TTL,
+    cache_control=f'public, max-age={int(Config.HOME_CACHE_TTL)}'
+)
+# 404 tidak boleh di-cache proxy/CDN: kode yang baru dibuat harus langsung
+# bisa diakses, dan hanya negative cache di proses yang bisa di-invalidate
+not_found_page = PageCache(
+    _not_found_template.render,
+    cache_control='no-store'
+)
+
+def cached_response(page: PageCache, status: int = 200) -> Response:
+    """Response dari page cache (gzip/brotli, ETag, 304)"""
+    status, body, headers = page.respond(
+        status,
+        accept_encoding=request.headers.get('Accept-Encoding', ''),
+        if_none_match=request.headers.get('If-None-Match', '')
+    )
+    return Response(body, status=status, headers=headers)
+
+def log_request_exception(sender, exception, **extra):
+    """Unhandled exception selalu dicatat (tanpa sampling)"""
+    request_log.error(
+        'request_error',
+        exc_info=(type(exception), exception, exception.__traceback__),
+        method=request.method,
+        path=request.path,
+        host=request.host
+    )
+
+got_request_exception.connect(log_request_exception, app)
+
+@app.before_request
+def start_request_timer():
+    request.environ['shortlink.started'] = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = request.environ.get('shortlink.started')
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        observe_request(route, request.method, response.status_code, started)
+    return response
+
+def page_cache_metrics():
+    """Collector untuk page cache (homepage & 404)"""
+    pages = {'home': home_page.stats(), 'not_found': not_found_page.stats()}
+    return [
+        metrics.MetricFamily(
+            'shortlink_page_cache_hits_total', 'counter', 'Response halaman dari cache',
+            [('shortlink_page_cache_hits_total', {'page': name}, stats['hits']) for name, stats in pages.items()]
+        ),
+        metrics.MetricFamily(
+            'shortlink_page_cache_renders_total', 'counter', 'Render ulang halaman',
+            [('shortlink_page_cache_renders_total', {'page': name}, stats['renders']) for name, stats in pages.items()]
+        ),
+        metrics.MetricFamily(
+            'shortlink_request_log_dropped_total', 'counter', 'Record request log yang dibuang (queue penuh)',
+            [('shortlink_request_log_dropped_total', {}, request_log.stats()['dropped'])]
+        ),
+    ]
+
+metrics.REGISTRY.add_collector(page_cache_metrics)
+
 def get_domain_from_request():
     """Extract domain dari request"""
     host = request.host
@@ -252,12 +449,7 @@ def get_domain_from_request():
 @app.route('/')
 def home():
     """Homepage dengan stats"""
-    stats = db.get_stats()
-    return render_template_string(
-        HOME_TEMPLATE, 
-        stats=stats,
-        version=Config.BOT_VERSION
-    )
+    return cached_response(home_page)
 
 @app.route('/<path:short_code>')
 def redirect_link(short_code):
@@ -267,40 +459,38 @@ def redirect_link(short_code):
     Args:
         short_code: Short code atau custom alias
     """
+    started = time.perf_counter()
+    
     # Get domain dari request
     domain = get_domain_from_request()
+    ip_address = request.headers.get('X-Forwarded-For', request.remote_addr)
     
-    print(f"🔍 Redirect request: domain={domain}, code={short_code}")
-    
-    # Get link dari database
-    link = db.get_link_by_code(short_code, domain)
-    
-    if not link:
-        # Coba dengan default domain
-        print(f"   Trying with default domain...")
-        link = db.get_link_by_code(short_code, 'default')
+    # Get link dari cache / database (domain request, lalu default)
+    link = db.find_link_for_host(short_code, domain)
     
     if link:
-        print(f"✅ Link found: {link['original_url']}")
         # Log click dengan info
-        ip_address = request.headers.get('X-Forwarded-For', request.remote_addr)
         user_agent = request.headers.get('User-Agent', '')
         referer = request.headers.get('Referer', '')
         
-        db.increment_click(
-            short_code, 
-            link['domain'],
+        db.record_click(
+            link,
             ip_address=ip_address,
             user_agent=user_agent,
             referer=referer
         )
         
+        request_log.redirect(
+            domain, short_code, link['original_url'],
+            (time.perf_counter() - started) * 1000, ip=ip_address
+        )
+        
         # Redirect ke URL asli
         return redirect(link['original_url'], code=302)
     else:
         # Link tidak ditemukan
-        print(f"❌ Link not found: domain={domain}, code={short_code}")
-        return render_template_string(NOT_FOUND_TEMPLATE), 404
+        request_log.not_found(domain, short_code, (time.perf_counter() - started) * 1000, ip=ip_address)
+        return cached_response(not_found_page, 404)
 
 @app.route('/api/health')
 def health_check():
@@ -311,6 +501,28 @@ def health_check():
         'version': Config.BOT_VERSION
     })
 
+@app.route('/api/cache')
+def api_cache_stats():
+    """API endpoint untuk statistik cache redirect"""
+    return jsonify({
+        'db_pool': db.get_pool_stats(),
+        'db_checkpoint': db.tuning.stats(),
+        'click_queue': db.click_queue.stats(),
+        'link_cache': db.link_cache.stats(),
+        'negative_cache': db.negative_cache.stats(),
+        'code_filter': db.code_filter.stats(),
+        'pages': {
+            'home': home_page.stats(),
+            'not_found': not_found_page.stats()
+        },
+        'request_log': request_log.stats()
+    })
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Metrics format Prometheus (per proses)"""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.route('/api/stats')
 def api_stats():
     """API endpoint untuk stats"""
@@ -350,6 +562,58 @@ def api_create_link():
     else:
         return jsonify(result), 400
 
+@app.route('/api/create/batch', methods=['POST'])
+def api_create_batch():
+    """
+    API endpoint untuk create banyak link sekaligus
+    
+    Body berupa JSON array item /api/create:
+    [{"url": "https://a.com"}, {"url": "https://b.com", "alias": "b"}]
+    
+    atau NDJSON (Content-Type: application/x-ndjson), satu item per baris.
+    Response NDJSON juga di-stream satu hasil per baris, jadi body besar
+    diproses sambil dibaca. Setiap hasil punya "index" (urutan item) dan
+    "success" / "error" sendiri.
+    """
+    if is_ndjson(request.content_type or ''):
+        items = (parse_ndjson_line(line) for line in request.stream if line.strip())
+        lines = (json.dumps(result) + '\n' for result in create_links_batch(items))
+        return Response(stream_with_context(lines), content_type='application/x-ndjson')
+    
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        return jsonify({
+            'success': False,
+            'error': 'Body harus JSON array atau NDJSON'
+        }), 400
+    if len(data) > Config.BATCH_MAX_ITEMS:
+        return jsonify({
+            'success': False,
+            'error': f'Maksimal {Config.BATCH_MAX_ITEMS} item per batch'
+        }), 413
+    
+    return jsonify(batch_summary(list(create_links_batch(data))))
+
+@app.route('/api/export/<any(links, clicks):kind>')
+def api_export(kind):
+    """
+    Export links atau klik (streaming CSV / NDJSON, butuh EXPORT_TOKEN)
+    
+    Query string: format (csv|ndjson), user_id, domain, since, until
+    """
+    status, error, result = export_request(
+        kind, request.args, request.headers.get('Authorization', '')
+    )
+    if error:
+        return jsonify(error), status
+    
+    chunks, content_type, filename = result
+    return Response(
+        stream_with_context(chunks),
+        content_type=content_type,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
 @app.route('/api/link/<short_code>')
 def api_get_link(short_code):
     """
@@ -380,8 +644,12 @@ def run_server(host='0.0.0.0', port=5000, debug=False):
     app.run(host=host, port=port, debug=debug)
 
 if __name__ == '__main__':
-    run_server(
-        host=Config.WEB_SERVER_HOST,
-        port=Config.WEB_SERVER_PORT,
-        debug=True
-    )
+    if Config.WEB_SERVER_MODE == 'asgi':
+        from web.asgi import run_asgi_server
+        run_asgi_server(host=Config.WEB_HOST, port=Config.WEB_PORT)
+    else:
+        run_server(
+            host=Config.WEB_HOST,
+            port=Config.WEB_PORT,
+            debug=True
+        )